@@ -2,14 +2,25 @@ from agent.anki_client import AnkiClient
 from agent.dida365 import Dida365Agent
 from agent.doubao_online import DoubaoOnline
 from agent.eudic import Eudic
-from constants.yaml import ANKI_PUSH_ENDPOINT, DIDA365_PASSWORD, DIDA365_USERNAME, DOUBAO_WEBSERVER_ENDPOINT, EUDIC_API_KEY
+from constants.yaml import (
+    ANKI_PUSH_ENDPOINT,
+    DIDA365_PASSWORD,
+    DIDA365_SNAPSHOT_MAX_AGE_SECONDS,
+    DIDA365_USERNAME,
+    DOUBAO_WEBSERVER_ENDPOINT,
+    EUDIC_API_KEY,
+)
 from dida365_project.api.dida365 import Dida365 as Dida365Api
+from utils.attachment_index_db import AttachmentIndexStore
+from utils.enrichment_cache import EnrichmentCache
+from utils.eudic_state_db import EudicStateStore
 from utils.yaml_config_manager import YamlConfigManager
 
 
 class Agent:
     def __init__(self) -> None:
         self.config_manager = YamlConfigManager()
+        self.enrichment_cache = EnrichmentCache()
         self.dida = self.get_dida()
         self.doubao = self.get_doubao()
         self.eudic = self.get_eudic()
@@ -20,7 +31,18 @@ class Agent:
             Dida365Api(
                 username=self.config_manager.get_config(DIDA365_USERNAME),
                 password=self.config_manager.get_config(DIDA365_PASSWORD),
+                # 可选项：旧配置文件没有这一键时使用客户端默认值。
+                snapshot_max_age=self.config_manager.get_all_config().get(DIDA365_SNAPSHOT_MAX_AGE_SECONDS),
             ),
+            enrichment_cache=self.enrichment_cache,
+            attachment_index=AttachmentIndexStore(),
+        )
+
+    def revalidate_dida_session(self):
+        """常驻运行时复查滴答会话；会话文件被 --set-dida-t 更新后也会在这里生效。"""
+        self.dida.dida.ensure_authenticated(
+            self.config_manager.get_config(DIDA365_USERNAME),
+            self.config_manager.get_config(DIDA365_PASSWORD),
         )
 
     def get_doubao(self):
@@ -31,7 +53,10 @@ class Agent:
         return DoubaoOnline(endpoint=self.config_manager.get_config(DOUBAO_WEBSERVER_ENDPOINT))
 
     def get_eudic(self):
-        return Eudic(api_key=self.config_manager.get_config(EUDIC_API_KEY))
+        return Eudic(
+            api_key=self.config_manager.get_config(EUDIC_API_KEY),
+            state_store=EudicStateStore(),
+        )
 
     def substitute_new_doubao_agent(self):
         # self.doubao = Doubao(
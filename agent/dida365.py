@@ -1,5 +1,6 @@
 import io
 import re
+from pathlib import Path
 from time import sleep
 
 
@@ -10,24 +11,36 @@ from constants.dida365 import PROJECT_WORDS, VOCAB_BOOK_PROJECT_ID
 from constants.eudic import EUDIC_NOTE_IMAGES_PLACEHOLDER
 from constants.header import HEADER_CHROME_UA
 from dida365_project.api.dida365 import Dida365
+from dida365_project.api.write_batch import DidaWriteBatch
 from dida365_project.models.task import Task
 from dida365_project.models.upload_attachment import uploadAttachment
 from dida365_project.utils.dictvoice_util import get_dictvoice_bytes
-from dida365_project.utils.time_util import get_days_offset, get_today_arrow
+from dida365_project.utils.time_util import get_today_arrow
+from utils.attachment_index_db import AttachmentIndexStore, UploadedAttachment
+from utils.enrichment_cache import SOURCE_DICTVOICE, SOURCE_EXPLANATION_VIDEO, EnrichmentCache
+from utils.media_spool import MediaSpool, MediaTooLargeError
 from utils.phonetic_util import query_word_explanation_video
 
 
 MEDIA_DOWNLOAD_TIMEOUT = (5, 60)
+MEDIA_DOWNLOAD_CHUNK_BYTES = 256 * 1024
 
 
 class Dida365Agent:
-    def __init__(self, dida365_api: Dida365) -> None:
+    def __init__(
+        self,
+        dida365_api: Dida365,
+        enrichment_cache: EnrichmentCache | None = None,
+        attachment_index: AttachmentIndexStore | None = None,
+    ) -> None:
         self.dida = dida365_api
+        self.enrichment_cache = enrichment_cache
+        self.attachment_index = attachment_index
 
-    def find_task(self, task_title, if_reload_data=False):
+    def find_task(self, task_title, if_reload_data=False, max_age=None):
         if if_reload_data:
-            self.dida.get_latest_data()
-        tasks = [i for i in self.dida.active_tasks if i.title == task_title]
+            self.dida.get_latest_data(max_age=max_age)
+        tasks = self.dida.find_tasks_by_title(task_title)
         if len(tasks) != 1:
             raise UserWarning(f"Task with title[{task_title}] duplicated, count: {len(tasks)}")
         return tasks[0]
@@ -40,12 +53,13 @@ class Dida365Agent:
         tags: list | None = None,
         parent_id: str | None = None,
         note_image_files: list[tuple[str, io.BytesIO]] | None = None,
+        video_urls: tuple[str, ...] | None = None,
     ):
         note_image_files = note_image_files or []
         note_image_names = [filename.lower() for filename, _ in note_image_files]
         # 失败后的下一轮必须看到服务端已经创建的半成品任务，避免重复创建同名单词。
         self.dida.get_latest_data()
-        existing_tasks = [task for task in self.dida.active_tasks if task.title == title]
+        existing_tasks = self.dida.find_tasks_by_title(title)
         if existing_tasks:
             if len(existing_tasks) != 1:
                 raise UserWarning(f"Task with title[{title}] duplicated, count: {len(existing_tasks)}")
@@ -73,6 +87,7 @@ class Dida365Agent:
         self._gen_dictvoice_and_upload_to_task_and_rearrange_content(
             task,
             note_image_files=note_image_files,
+            video_urls=video_urls,
         )
         return self.find_task(title, if_reload_data=True)
 
@@ -111,7 +126,8 @@ class Dida365Agent:
         title,
         note_image_names: list[str] | None = None,
         expected_attachment_names: list[str] | None = None,
-    ):
+    ) -> Task:
+        """重排正文并返回确认过附件的任务。"""
         note_image_names = [name.lower() for name in (note_image_names or [])]
         expected_attachment_names = [
             name.lower()
@@ -136,7 +152,8 @@ class Dida365Agent:
         print("Begin to rearrange content to put dictvoice ahead.")
         task = None
         for attempt in range(3):
-            task = self.find_task(title, if_reload_data=True)
+            # 等待附件落库时每次都必须真正回读，不能命中共享快照。
+            task = self.find_task(title, if_reload_data=True, max_age=0)
             attachments_by_name = {
                 attachment.file_name.lower(): attachment
                 for attachment in task.attachments
@@ -187,6 +204,7 @@ class Dida365Agent:
                 raise
         else:
             print("Can't find attachments, content not rearranged.")
+        return task
 
     def update_task(self, task_dict):
         self.dida.post_task(Task.gen_update_data_payload(task_dict))
@@ -227,24 +245,48 @@ class Dida365Agent:
             active_tasks = [t for t in active_tasks if t.project_id == project_id]
         return active_tasks
 
-    def _get_task_attachments_bytes(self, word: str) -> list[tuple]:
-        """获取任务附件的字节数据（语音和视频）"""
+    def _get_task_attachments_bytes(
+        self,
+        word: str,
+        video_urls: tuple[str, ...] | None = None,
+        *,
+        media_spool: MediaSpool,
+    ) -> list[tuple[str, io.BytesIO | Path]]:
+        """获取任务附件（语音和视频）；video_urls 为 None 时自行查询百度。
+
+        语音体积很小，以字节流返回；视频流式写入 media_spool 并返回文件路径。
+        """
+
+        def download_video(url: str) -> tuple[str, Path] | None:
+            """下载视频到暂存目录并返回文件名和路径"""
+            # 从URL提取文件名
+            filename = url.split("/")[-1]
+            if not re.search(r"\.\w+$", filename):
+                filename += ".mp4"
 
-        def download_video(url: str) -> tuple[str, io.BytesIO] | None:
-            """下载视频并返回文件名和字节流"""
             max_retries = 3
             for attempt in range(max_retries):
                 try:
                     headers = {"User-Agent": HEADER_CHROME_UA}
-                    response = requests.get(url, headers=headers, timeout=MEDIA_DOWNLOAD_TIMEOUT)
-                    response.raise_for_status()
-
-                    # 从URL提取文件名
-                    filename = url.split("/")[-1]
-                    if not re.search(r"\.\w+$", filename):
-                        filename += ".mp4"
-
-                    return (filename, io.BytesIO(response.content))
+                    response = requests.get(
+                        url,
+                        headers=headers,
+                        timeout=MEDIA_DOWNLOAD_TIMEOUT,
+                        stream=True,
+                    )
+                    try:
+                        response.raise_for_status()
+                        path = media_spool.write_chunks(
+                            filename,
+                            response.iter_content(MEDIA_DOWNLOAD_CHUNK_BYTES),
+                        )
+                    finally:
+                        response.close()
+                    return (filename, path)
+                except MediaTooLargeError as e:
+                    # 超限与网络无关，重试也不会成功。
+                    print(f"下载视频失败 [URL: {url}]: {e}")
+                    return None
                 except Exception as e:
                     print(f"下载视频失败 [URL: {url}] (尝试 {attempt + 1}/{max_retries}): {e}")
                     if attempt < max_retries - 1:  # 不是最后一次尝试
@@ -256,7 +298,14 @@ class Dida365Agent:
 
         # 添加语音文件
         try:
-            voice_files = get_dictvoice_bytes(word)
+            if self.enrichment_cache is not None:
+                voice_files = self.enrichment_cache.get_or_create_media(
+                    word,
+                    SOURCE_DICTVOICE,
+                    lambda: get_dictvoice_bytes(word),
+                )
+            else:
+                voice_files = get_dictvoice_bytes(word)
         except requests.RequestException as error:
             # 部分罕见词会被词典语音接口以 5xx 拒绝；语音属于可选增强，
             # 不能因此阻断欧路 Note 图片等其他附件。
@@ -265,15 +314,30 @@ class Dida365Agent:
             result.extend(voice_files)
 
         # 添加视频文件
-        video_urls = query_word_explanation_video(word)
+        if self.enrichment_cache is not None:
+            cached_videos = self.enrichment_cache.get_media_paths(word, SOURCE_EXPLANATION_VIDEO)
+            if cached_videos is not None:
+                print(f"单词 '{word}' 的讲解视频命中本地缓存：{len(cached_videos)} 个")
+                result.extend(
+                    (filename, media_spool.add_file(filename, blob_path))
+                    for filename, blob_path in cached_videos
+                )
+                return result
+        if video_urls is None:
+            video_urls = query_word_explanation_video(word)
         if not video_urls:
             print(f"警告: 单词 '{word}' 无视频资源")
         else:
+            video_files = []
             for url in video_urls:
                 video_file = download_video(url)
                 if video_file:
                     print(f"✅ 视频下载成功: {video_file[0]}")
-                    result.append(video_file)
+                    video_files.append(video_file)
+            result.extend(video_files)
+            # 只缓存完整的一组视频，部分失败时下次仍重新下载缺失的部分。
+            if self.enrichment_cache is not None and len(video_files) == len(video_urls):
+                self.enrichment_cache.put_media(word, SOURCE_EXPLANATION_VIDEO, video_files)
 
         return result
 
@@ -281,29 +345,113 @@ class Dida365Agent:
         self,
         task: Task,
         note_image_files: list[tuple[str, io.BytesIO]] | None = None,
+        video_urls: tuple[str, ...] | None = None,
     ):
         # 欧路图片与既有语音/视频走同一个滴答附件接口；按文件名跳过已上传项，
         # 使“附件成功、正文更新失败”的任务可以在下一轮安全接续。
         note_image_files = note_image_files or []
-        file_bytes_objs = [*note_image_files, *self._get_task_attachments_bytes(task.title)]
-        existing_names = {attachment.file_name.lower() for attachment in task.attachments}
-        missing_files = [
-            file_bytes_obj
-            for file_bytes_obj in file_bytes_objs
-            if file_bytes_obj[0].lower() not in existing_names
-        ]
-        task.add_upload_attachment_post_payload_by_bytes(*missing_files)
-        if task.attachments_to_upload:
-            self.dida.upload_attachment(*task.attachments_to_upload)
-        self.rearrange_content_put_dictvoice_ahead(
-            task.title,
-            note_image_names=[filename for filename, _ in note_image_files],
-            expected_attachment_names=[filename for filename, _ in file_bytes_objs],
-        )
+        # 视频暂存在磁盘上，附件回读确认（或失败）后随目录一起删除。
+        with MediaSpool() as media_spool:
+            attachment_files = [
+                *note_image_files,
+                *self._get_task_attachments_bytes(
+                    task.title,
+                    video_urls=video_urls,
+                    media_spool=media_spool,
+                ),
+            ]
+            existing_names = {attachment.file_name.lower() for attachment in task.attachments}
+            for filename, file in attachment_files:
+                if filename.lower() in existing_names:
+                    continue
+                if isinstance(file, Path):
+                    task.add_upload_attachment_post_payload_by_path(str(file))
+                else:
+                    task.add_upload_attachment_post_payload_by_bytes((filename, file))
+            name_aliases = self._skip_already_uploaded_attachments(task)
+            if task.attachments_to_upload:
+                self.dida.upload_attachment(*task.attachments_to_upload)
+            verified_task = self.rearrange_content_put_dictvoice_ahead(
+                task.title,
+                note_image_names=[
+                    name_aliases.get(filename.lower(), filename)
+                    for filename, _ in note_image_files
+                ],
+                expected_attachment_names=[
+                    name_aliases.get(filename.lower(), filename)
+                    for filename, _ in attachment_files
+                ],
+            )
+            self._index_uploaded_attachments(verified_task, task.attachments_to_upload)
+
+    def _skip_already_uploaded_attachments(self, task: Task) -> dict[str, str]:
+        """移除内容已存在于任务上的待上传附件，返回“待上传名 -> 已有附件名”。
+
+        只有索引记录的附件仍在任务上有效时才跳过；附件被删除后照常重新上传。
+        """
+        if self.attachment_index is None or not task.attachments_to_upload:
+            return {}
+        uploaded = self.attachment_index.get_uploaded_attachments(task.id)
+        if not uploaded:
+            return {}
+        active_attachments = {attachment.id: attachment for attachment in task.attachments}
+        # 先按大小筛选，只有可能命中的候选才整份读取计算 SHA-256。
+        candidate_sizes = {
+            record.size_bytes
+            for record in uploaded.values()
+            if record.attachment_id in active_attachments
+        }
+        name_aliases = {}
+        saved_bytes = 0
+        for attachment in list(task.attachments_to_upload):
+            if attachment.size not in candidate_sizes:
+                continue
+            record = uploaded.get(attachment.sha256)
+            existing = active_attachments.get(record.attachment_id) if record else None
+            if existing is None:
+                continue
+            task.attachments_to_upload.discard(attachment)
+            name_aliases[attachment.file_name] = existing.file_name.lower()
+            saved_bytes += attachment.size
+            self.attachment_index.record_skipped_upload(task.id, attachment.sha256, attachment.size)
+        if name_aliases:
+            print(
+                f"任务 [{task.title}] 跳过 {len(name_aliases)} 个内容相同的已上传附件，"
+                f"节省 {saved_bytes} 字节"
+            )
+        return name_aliases
+
+    def _index_uploaded_attachments(self, task: Task, attachments: set[uploadAttachment]):
+        if self.attachment_index is None or not attachments:
+            return
+        attachments_by_name = {
+            attachment.file_name.lower(): attachment
+            for attachment in task.attachments
+        }
+        for attachment in attachments:
+            uploaded = attachments_by_name.get(attachment.file_name)
+            if uploaded is None:
+                continue
+            self.attachment_index.save_uploaded_attachment(
+                UploadedAttachment(
+                    task_id=task.id,
+                    sha256=attachment.sha256,
+                    file_name=uploaded.file_name,
+                    attachment_id=uploaded.id,
+                    path=uploaded.path,
+                    size_bytes=attachment.size,
+                )
+            )
+
+    def describe_upload_dedup_stats(self) -> str:
+        if self.attachment_index is None:
+            return "附件去重=未启用"
+        skipped, saved_bytes = self.attachment_index.get_saved_totals()
+        return f"附件去重跳过={skipped}，节省={saved_bytes / 1024 / 1024:.1f} MiB"
 
     def fix_pronunciation_missing(self):
         self.dida.get_latest_data()
-        active_task_in_vocab_book = [t for t in self.dida.active_tasks if t.project_id == VOCAB_BOOK_PROJECT_ID]
+        active_task_in_vocab_book = self.dida.find_tasks_by_project(VOCAB_BOOK_PROJECT_ID)
         for task in active_task_in_vocab_book:
             if not self.get_attachment_file_strings_from_task(task):
                 print(f'Found task which missing pronunciation: "{task.title}", begin to fix.')
@@ -311,19 +459,11 @@ class Dida365Agent:
                 print(f'"{task.title}"\'s missing problem has been fixed.')
 
     def _get_target_words_task(self, start_day_offset):
-        def condition(task: Task):
-            return (
-                task.repeat_flag
-                and task.start_date
-                and re.search(r".*FORGETTINGCURVE.*", task.repeat_flag)
-                and get_days_offset(task.start_date, get_today_arrow()) == start_day_offset
-            )
-
+        start_day = get_today_arrow().shift(days=start_day_offset).format("YYYY-MM-DD")
         tasks = filter(
             lambda task: re.search(r".*" + PROJECT_WORDS.decode("utf-8") + r"$", str(task.project_name)),
-            self.dida.active_tasks,
+            self.dida.find_forgetting_curve_tasks_by_start_day(start_day),
         )
-        tasks = filter(lambda task: condition(task), tasks)
         return list(tasks)
 
     def renew_overdue_task(self):
@@ -331,7 +471,11 @@ class Dida365Agent:
         for i in range(3):
             i = -(i + 1)
             overdue_tasks.extend(self._get_target_words_task(i))
-        for task in overdue_tasks:
-            print(f"Renew task[{task.title}], original start date: {task.start_date}")
-            task.change_start_date_to_today()
-            self.dida.post_task(Task.gen_update_data_payload(task.task_dict))
+        # 数百个逾期任务合并成少量 /batch/task 请求提交。
+        with DidaWriteBatch(self.dida) as batch:
+            for task in overdue_tasks:
+                print(f"Renew task[{task.title}], original start date: {task.start_date}")
+                task.change_start_date_to_today()
+                batch.update(task.task_dict)
+        if overdue_tasks:
+            print(f"Renewed {len(overdue_tasks)} tasks in {batch.request_count} requests.")
@@ -15,10 +15,13 @@ class DoubaoOnline:
         self.system_message = message
 
     def chat(self, user_message, system_message=None):
+        # 显式传入的系统提示直接用于本次请求，避免多线程共用客户端时被其他调用覆盖。
         if system_message:
             self.add_system_message(system_message)
+        else:
+            system_message = self.system_message
         Payload = {
-            PAYLOAD_SYSTEM_MESSAGE: self.system_message,
+            PAYLOAD_SYSTEM_MESSAGE: system_message,
             PAYLOAD_USER_MESSAGE: user_message,
         }
         res = requests.post(self.endpoint, json=Payload, timeout=DOUBAO_REQUEST_TIMEOUT)
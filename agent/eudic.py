@@ -1,14 +1,18 @@
 import hashlib
-import io
 import json
 import mimetypes
 import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import IO
 from urllib.parse import urlparse
 from zoneinfo import ZoneInfo
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from constants.eudic import (
     DEFAULT_VOCAB_BOOK_NAME,
@@ -22,6 +26,7 @@ from constants.eudic import (
 from constants.header import HEADER_AUTHORIZATION, HEADER_USER_AGENT
 from models.eudic_word import Word
 from utils.datetime_util import parse_eudic_api_time
+from utils.eudic_state_db import EudicPageCursor, EudicStateStore
 
 
 class EudicNoteFetchError(RuntimeError):
@@ -40,11 +45,30 @@ class EudicNoteImageDownloadError(RuntimeError):
     pass
 
 
+class EudicUnknownCategoryError(RuntimeError):
+    pass
+
+
 EUDIC_NOTE_META_PREFIX = "<!--meta files"
 EUDIC_NOTE_NBSP_PATTERN = re.compile(r"&(?:nbsp|#0*160|#x0*a0);", re.IGNORECASE)
 EUDIC_REQUEST_TIMEOUT = (5, 30)
 EUDIC_IMAGE_DOWNLOAD_TIMEOUT = (5, 60)
 EUDIC_IMAGE_MAX_BYTES = 50 * 1024 * 1024
+# 超过该大小的笔记图片转存到临时文件，限制图片较多时的内存峰值。
+EUDIC_IMAGE_SPOOL_MAX_BYTES = 2 * 1024 * 1024
+EUDIC_IMAGE_CHUNK_BYTES = 64 * 1024
+# 生词本接口的 page 上限为 50；并行探测和拉取尾页时的线程数。
+EUDIC_MAX_PAGE = 50
+EUDIC_PAGE_FETCH_WORKERS = 8
+# OpenAPI 与图片 CDN 各占一个主机连接池；建连失败对任何请求都可以安全重试，
+# 读取阶段失败（包括服务端已关闭的空闲长连接）只对幂等的 GET 重试一次。
+EUDIC_CONNECTION_POOLS = 4
+EUDIC_CONNECT_RETRIES = 2
+EUDIC_READ_RETRIES = 1
+EUDIC_RETRY_BACKOFF_FACTOR = 0.5
+# 默认生词本 ID 几乎不会变化；取页返回这些状态码时视为生词本 ID 失效。
+EUDIC_DEFAULT_BOOK_ID_TTL_SECONDS = 30 * 24 * 60 * 60
+EUDIC_UNKNOWN_CATEGORY_STATUS_CODES = (400, 404)
 
 
 @dataclass(frozen=True)
@@ -136,19 +160,60 @@ def normalize_eudic_note(note: str) -> str:
 
 
 class Eudic:
-    def __init__(self, api_key) -> None:
+    def __init__(self, api_key, state_store: EudicStateStore | None = None) -> None:
         self.api_key = api_key
+        # 可选：持久化最后一页游标，未提供时每次轮询都重新查找最后一页。
+        self.state_store = state_store
         self.headers = {
             HEADER_AUTHORIZATION: self.api_key,
             HEADER_USER_AGENT: "",  # 不带这一项会报错，值随便填，这里留空
         }
+        # 所有请求复用同一组 TCP/TLS 长连接，连接池大小与并行取页线程数一致。
+        self.adapter = HTTPAdapter(
+            pool_connections=EUDIC_CONNECTION_POOLS,
+            pool_maxsize=EUDIC_PAGE_FETCH_WORKERS,
+            max_retries=Retry(
+                total=EUDIC_CONNECT_RETRIES + EUDIC_READ_RETRIES,
+                connect=EUDIC_CONNECT_RETRIES,
+                read=EUDIC_READ_RETRIES,
+                status=0,
+                other=0,
+                allowed_methods=frozenset({"GET"}),
+                backoff_factor=EUDIC_RETRY_BACKOFF_FACTOR,
+                raise_on_status=False,
+            ),
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        # 分页、笔记等并行读请求共用一个有界线程池。
+        self._executor = ThreadPoolExecutor(
+            max_workers=EUDIC_PAGE_FETCH_WORKERS,
+            thread_name_prefix="eudic",
+        )
+
+    def describe_connection_stats(self) -> str:
+        """汇总连接池的请求数与新建连接数，二者之差即复用长连接的请求数。"""
+        requests_count = 0
+        connections_count = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requests_count += pool.num_requests
+            connections_count += pool.num_connections
+        return (
+            f"欧路请求={requests_count}，新建连接={connections_count}，"
+            f"复用={max(requests_count - connections_count, 0)}"
+        )
 
     def get_vocab_book(self):
         url = VOCAB_BOOK_BASE_URL
         params = {
             "language": "en",
         }
-        res = requests.get(
+        res = self.session.get(
             url,
             headers=self.headers,
             params=params,
@@ -161,11 +226,31 @@ class Eudic:
             raise
         return res.json()
 
-    def get_default_vocab_book_id(self):
+    @property
+    def _account_key(self) -> str:
+        # 只保存 API Key 的摘要，用来区分不同账号的缓存。
+        return hashlib.sha256(self.api_key.encode("utf-8")).hexdigest()[:16]
+
+    def get_default_vocab_book_id(self, refresh=False):
+        if self.state_store is not None and not refresh:
+            book_id = self.state_store.get_default_book_id(
+                self._account_key,
+                DEFAULT_VOCAB_BOOK_NAME,
+                EUDIC_DEFAULT_BOOK_ID_TTL_SECONDS,
+            )
+            if book_id is not None:
+                return book_id
         data = self.get_vocab_book()["data"]
         for book_info in data:
             if book_info[VOCAB_BOOK_NAME] == DEFAULT_VOCAB_BOOK_NAME:
-                return book_info[VOCAB_BOOK_ID]
+                book_id = book_info[VOCAB_BOOK_ID]
+                if self.state_store is not None:
+                    self.state_store.save_default_book_id(
+                        self._account_key,
+                        DEFAULT_VOCAB_BOOK_NAME,
+                        book_id,
+                    )
+                return book_id
         raise UserWarning(f"未找到默认生词本，请检查原始数据：{data}")
 
     def get_note_data(self, word: str) -> EudicNoteData | None:
@@ -174,7 +259,7 @@ class Eudic:
             "word": word,
         }
         try:
-            res = requests.get(
+            res = self.session.get(
                 GET_NOTE_URL,
                 headers=self.headers,
                 params=params,
@@ -208,6 +293,25 @@ class Eudic:
             return None
         return note_data
 
+    def get_notes_data(
+        self,
+        words: list[str],
+    ) -> dict[str, EudicNoteData | None | EudicNoteFetchError]:
+        """并行读取多个单词的笔记。
+
+        单个单词失败不影响其他单词：失败的单词在结果中对应 EudicNoteFetchError，
+        由调用方决定是否本轮跳过。
+        """
+
+        def fetch(word):
+            try:
+                return self.get_note_data(word)
+            except EudicNoteFetchError as error:
+                return error
+
+        unique_words = list(dict.fromkeys(words))
+        return dict(zip(unique_words, self._executor.map(fetch, unique_words)))
+
     def get_note(self, word: str) -> str | None:
         note_data = self.get_note_data(word)
         if note_data is None:
@@ -236,40 +340,77 @@ class Eudic:
         safe_id = re.sub(r"[^a-zA-Z0-9_-]", "", image.image_id)[:16] or "unknown"
         return f"eudic-note-{index:02d}-{safe_id}{extension}".lower()
 
-    def download_note_images(
-        self,
-        images: tuple[EudicNoteImage, ...],
-    ) -> list[tuple[str, io.BytesIO]]:
-        downloaded_images = []
-        for index, image in enumerate(images, start=1):
-            self._validate_note_image_url(image.url)
+    def _download_note_image(self, index: int, image: EudicNoteImage) -> tuple[str, IO[bytes]]:
+        """流式下载单张图片：先按响应头检查类型和大小，超过上限立即中止。"""
+        too_large_message = (
+            f"欧路笔记图片 [{image.image_id}] 超过 {EUDIC_IMAGE_MAX_BYTES // 1024 // 1024} MB 限制"
+        )
+        spool = tempfile.SpooledTemporaryFile(max_size=EUDIC_IMAGE_SPOOL_MAX_BYTES)
+        try:
             try:
-                response = requests.get(
+                response = self.session.get(
                     image.url,
                     headers=self.headers,
                     timeout=EUDIC_IMAGE_DOWNLOAD_TIMEOUT,
+                    stream=True,
                 )
-                response.raise_for_status()
+                try:
+                    response.raise_for_status()
+                    content_type = response.headers.get("content-type", "")
+                    if not content_type.lower().startswith("image/"):
+                        raise EudicNoteImageDownloadError(
+                            f"欧路笔记图片 [{image.image_id}] 返回了非图片内容：{content_type or '未知类型'}"
+                        )
+                    content_length = response.headers.get("content-length", "")
+                    if content_length.isdigit() and int(content_length) > EUDIC_IMAGE_MAX_BYTES:
+                        raise EudicNoteImageDownloadError(too_large_message)
+                    size = 0
+                    for chunk in response.iter_content(EUDIC_IMAGE_CHUNK_BYTES):
+                        size += len(chunk)
+                        if size > EUDIC_IMAGE_MAX_BYTES:
+                            raise EudicNoteImageDownloadError(too_large_message)
+                        spool.write(chunk)
+                finally:
+                    response.close()
             except requests.RequestException as error:
                 raise EudicNoteImageDownloadError(
                     f"下载欧路笔记图片 [{image.image_id}] 失败"
                 ) from error
-
-            content_type = response.headers.get("content-type", "")
-            if not content_type.lower().startswith("image/"):
-                raise EudicNoteImageDownloadError(
-                    f"欧路笔记图片 [{image.image_id}] 返回了非图片内容：{content_type or '未知类型'}"
-                )
-            if not response.content:
+            if size == 0:
                 raise EudicNoteImageDownloadError(
                     f"欧路笔记图片 [{image.image_id}] 内容为空"
                 )
-            if len(response.content) > EUDIC_IMAGE_MAX_BYTES:
-                raise EudicNoteImageDownloadError(
-                    f"欧路笔记图片 [{image.image_id}] 超过 {EUDIC_IMAGE_MAX_BYTES // 1024 // 1024} MB 限制"
-                )
-            filename = self._note_image_filename(image, content_type, index)
-            downloaded_images.append((filename, io.BytesIO(response.content)))
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        return self._note_image_filename(image, content_type, index), spool
+
+    def download_note_images(
+        self,
+        images: tuple[EudicNoteImage, ...],
+    ) -> list[tuple[str, IO[bytes]]]:
+        """并行下载笔记图片，按原顺序返回；较大的图片落到临时文件而不是常驻内存。
+
+        任意一张失败时关闭已下载的文件并抛出第一张失败图片的错误。
+        """
+        for image in images:
+            self._validate_note_image_url(image.url)
+        futures = [
+            self._executor.submit(self._download_note_image, index, image)
+            for index, image in enumerate(images, start=1)
+        ]
+        downloaded_images = []
+        first_error = None
+        for future in futures:
+            try:
+                downloaded_images.append(future.result())
+            except Exception as error:
+                first_error = first_error or error
+        if first_error is not None:
+            for _, file in downloaded_images:
+                file.close()
+            raise first_error
         return downloaded_images
 
     def get_word(self, word: str) -> dict | None:
@@ -278,7 +419,7 @@ class Eudic:
             "word": word,
         }
         try:
-            res = requests.get(
+            res = self.session.get(
                 WORD_URL,
                 headers=self.headers,
                 params=params,
@@ -307,7 +448,7 @@ class Eudic:
 
     def save_note(self, word: str, note: str) -> None:
         try:
-            res = requests.post(
+            res = self.session.post(
                 GET_NOTE_URL,
                 headers=self.headers,
                 json={
@@ -324,7 +465,7 @@ class Eudic:
 
     def add_word(self, word: str) -> None:
         try:
-            res = requests.post(
+            res = self.session.post(
                 WORD_URL,
                 headers=self.headers,
                 json={
@@ -351,7 +492,7 @@ class Eudic:
             "page": page,
             "page_size": page_size,
         }
-        res = requests.get(
+        res = self.session.get(
             url,
             headers=self.headers,
             params=params,
@@ -359,33 +500,131 @@ class Eudic:
         )
         try:
             res.raise_for_status()
-        except:
+        except requests.HTTPError as error:
             print(res.content)
+            if res.status_code in EUDIC_UNKNOWN_CATEGORY_STATUS_CODES:
+                raise EudicUnknownCategoryError(f"欧路生词本 [{vocab_book_id}] 不存在或无法访问") from error
             raise
         return res.json().get("data", [])
 
-    def _find_last_page(self, vocab_book_id: str, page_size: int = 100) -> int:
-        """二分查找最后一页（API限制最大page=50）"""
-        low, high = 0, 50
+    def _fetch_pages(
+        self,
+        vocab_book_id: str,
+        pages: list[int],
+        page_size: int,
+        fetched_pages: dict[int, list[dict]],
+    ) -> None:
+        """并行获取尚未取过的页面，结果写入 fetched_pages。"""
+        missing_pages = [page for page in pages if page not in fetched_pages]
+        results = self._executor.map(
+            lambda page: self._fetch_page(vocab_book_id, page, page_size),
+            missing_pages,
+        )
+        fetched_pages.update(zip(missing_pages, results))
+
+    def _find_last_page(
+        self,
+        vocab_book_id: str,
+        page_size: int = 100,
+        fetched_pages: dict[int, list[dict]] | None = None,
+    ) -> int:
+        """多路并行查找最后一页（API限制最大page=50）。
+
+        每轮在剩余区间内均匀探测最多 EUDIC_PAGE_FETCH_WORKERS 个页面，51 个候选页
+        两轮即可确定；探测到的页面数据写入 fetched_pages 供后续复用。
+        """
+        if fetched_pages is None:
+            fetched_pages = {}
+        low, high = 0, EUDIC_MAX_PAGE
         last_valid = -1
 
         while low <= high:
-            mid = (low + high) // 2
-            words = self._fetch_page(vocab_book_id, mid, page_size)
-            if words:
-                last_valid = mid
-                low = mid + 1
-            else:
-                high = mid - 1
+            candidate_count = high - low + 1
+            probe_count = min(EUDIC_PAGE_FETCH_WORKERS, candidate_count)
+            probes = sorted(
+                {
+                    low + (index + 1) * candidate_count // (probe_count + 1)
+                    for index in range(probe_count)
+                }
+                if probe_count < candidate_count
+                else range(low, high + 1)
+            )
+            self._fetch_pages(vocab_book_id, probes, page_size, fetched_pages)
+            for page in probes:
+                if fetched_pages[page]:
+                    last_valid = page
+                    low = page + 1
+                else:
+                    high = page - 1
+                    break
 
         return last_valid
 
+    def _check_page_cursor(
+        self,
+        cursor: EudicPageCursor,
+        page_size: int,
+        fetched_pages: dict[int, list[dict]],
+    ) -> bool:
+        """同时取游标页及其后一页：游标页非空、后一页为空且最新单词没有倒退时游标仍然有效。"""
+        if cursor.page_size != page_size or not 0 <= cursor.last_page <= EUDIC_MAX_PAGE:
+            return False
+        pages = [cursor.last_page]
+        if cursor.last_page < EUDIC_MAX_PAGE:
+            pages.append(cursor.last_page + 1)
+        self._fetch_pages(cursor.book_id, pages, page_size, fetched_pages)
+        words = fetched_pages[cursor.last_page]
+        if not words or any(fetched_pages[page] for page in pages[1:]):
+            return False
+        return self._parse_api_time(words[-1]["add_time"]) >= self._parse_api_time(cursor.newest_add_time)
+
+    def _locate_last_page(
+        self,
+        vocab_book_id: str,
+        page_size: int,
+        fetched_pages: dict[int, list[dict]],
+    ) -> int:
+        """优先用持久化游标定位最后一页，游标失效时再并行查找并更新游标。"""
+        cursor = self.state_store.get_page_cursor(vocab_book_id) if self.state_store else None
+        if cursor is not None and self._check_page_cursor(cursor, page_size, fetched_pages):
+            last_page = cursor.last_page
+        else:
+            last_page = self._find_last_page(vocab_book_id, page_size, fetched_pages)
+
+        if self.state_store is not None:
+            if last_page < 0:
+                self.state_store.delete_page_cursor(vocab_book_id)
+            else:
+                self.state_store.save_page_cursor(
+                    EudicPageCursor(
+                        book_id=vocab_book_id,
+                        last_page=last_page,
+                        page_size=page_size,
+                        newest_add_time=fetched_pages[last_page][-1]["add_time"],
+                    )
+                )
+        return last_page
+
     def get_words_in_book(self, vocab_book_id=None, days=1):
-        book_id = vocab_book_id or self.get_default_vocab_book_id()
+        if vocab_book_id:
+            return self._get_words_in_book(vocab_book_id, days)
+        book_id = self.get_default_vocab_book_id()
+        try:
+            return self._get_words_in_book(book_id, days)
+        except EudicUnknownCategoryError:
+            # 缓存的默认生词本可能已被删除或重建，重新查询一次；ID 未变化时说明是其他问题。
+            refreshed_book_id = self.get_default_vocab_book_id(refresh=True)
+            if refreshed_book_id == book_id:
+                raise
+            print(f"默认生词本 ID 已变化：{book_id} -> {refreshed_book_id}", flush=True)
+            return self._get_words_in_book(refreshed_book_id, days)
+
+    def _get_words_in_book(self, book_id, days):
         page_size = 100
+        fetched_pages: dict[int, list[dict]] = {}
 
-        # 1. 二分查找最后一页
-        last_page = self._find_last_page(book_id, page_size)
+        # 1. 定位最后一页：游标有效时只需一轮请求，否则并行查找
+        last_page = self._locate_last_page(book_id, page_size, fetched_pages)
         if last_page < 0:
             return []
 
@@ -393,21 +632,35 @@ class Eudic:
         now_beijing = datetime.now(ZoneInfo("Asia/Shanghai"))
         cutoff = now_beijing - timedelta(days=days)
 
-        # 3. 从后往前取页，直到遇到超时的页
+        # 3. 从后往前取页，直到遇到超时的页。最后一页已在查找时取得，
+        #    其余页按批并行获取；页内按加入时间升序，最早的单词超出范围时即可停止
         all_data = []
-        for page in range(last_page, -1, -1):
-            words = self._fetch_page(book_id, page, page_size)
-            if not words:
-                continue
-
-            # 该页最晚的单词（索引-1，页内升序）
-            latest_time = self._parse_api_time(words[-1]["add_time"])
-
-            # 如果这页最晚的都超出范围，前面更旧的页也不需要了
-            if latest_time < cutoff:
-                break
-
-            all_data.extend(words)
+        next_page = last_page
+        batch_size = 1
+        reached_cutoff = False
+        while next_page >= 0 and not reached_cutoff:
+            batch = list(range(next_page, max(next_page - batch_size, -1), -1))
+            self._fetch_pages(book_id, batch, page_size, fetched_pages)
+            next_page = batch[-1] - 1
+            batch_size = EUDIC_PAGE_FETCH_WORKERS
+            for page in batch:
+                words = fetched_pages[page]
+                if not words:
+                    continue
+
+                # 该页最晚的单词（索引-1，页内升序）
+                latest_time = self._parse_api_time(words[-1]["add_time"])
+
+                # 如果这页最晚的都超出范围，前面更旧的页也不需要了
+                if latest_time < cutoff:
+                    reached_cutoff = True
+                    break
+
+                all_data.extend(words)
+
+                if self._parse_api_time(words[0]["add_time"]) < cutoff:
+                    reached_cutoff = True
+                    break
 
         # 4. 转换为Word对象（精确过滤由调用方acquire_words处理）
         return [Word(w) for w in all_data]
@@ -10,5 +10,6 @@ DOUBAO_WEBSERVER_ENDPOINT = "doubao_webserver_endpoint"
 
 DIDA365_USERNAME = "dida365_username"
 DIDA365_PASSWORD = "dida365_password"
+DIDA365_SNAPSHOT_MAX_AGE_SECONDS = "dida365_snapshot_max_age_seconds"
 
 ANKI_PUSH_ENDPOINT = "anki_push_endpoint"
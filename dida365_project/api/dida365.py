@@ -2,8 +2,11 @@ import copy
 import json
 import os
 import sys
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
 from http.cookiejar import LoadError, MozillaCookieJar
@@ -14,6 +17,8 @@ import requests
 from ..models.project import Project
 from ..models.task import Task
 from ..models.upload_attachment import uploadAttachment
+from ..utils.multipart_util import StreamingMultipartFile
+from ..utils.time_util import get_prc_arrow
 
 
 class DidaLoginCooldownError(RuntimeError):
@@ -71,14 +76,44 @@ class Dida365:
     READ_REQUEST_TIMEOUT = (5, 30)
     WRITE_REQUEST_TIMEOUT = (5, 30)
     UPLOAD_REQUEST_TIMEOUT = (10, 120)
+    UPLOAD_MAX_WORKERS = 3
     WRITE_CONNECT_RETRY_ATTEMPTS = 3
     WRITE_CONNECT_RETRY_BASE_DELAY_SECONDS = 1
+    FULL_SYNC_INTERVAL_SECONDS = 6 * 60 * 60
+    SNAPSHOT_MAX_AGE_SECONDS = 5
 
-    def __init__(self, username, password, session_file=None, auth_state_file=None) -> None:
+    def __init__(
+        self,
+        username,
+        password,
+        session_file=None,
+        auth_state_file=None,
+        snapshot_max_age=None,
+    ) -> None:
+        self._initialize_sync_state(snapshot_max_age=snapshot_max_age)
         self._initialize_http(session_file=session_file, auth_state_file=auth_state_file)
         self.ensure_authenticated(username, password)
         self.get_latest_data()
 
+    def _initialize_sync_state(self, snapshot_max_age=None):
+        # 定时任务在多个线程中并发运行：同步请求彼此串行，任务存储只在合并增量
+        # 与按索引查询时互斥，读取方不必等待同步的网络往返。
+        self._sync_lock = threading.RLock()
+        self._store_lock = threading.RLock()
+        # 每次写操作递增；同步期间发生过写入时，同步结果不能标记为最新快照。
+        self._write_generation = 0
+        self._write_generation_lock = threading.Lock()
+        self.checkpoint = 0
+        self.last_full_sync_at = None
+        self.snapshot_max_age = (
+            self.SNAPSHOT_MAX_AGE_SECONDS if snapshot_max_age is None else snapshot_max_age
+        )
+        self.snapshot_synced_at = None
+        self.snapshot_cache_hits = 0
+        self.snapshot_cache_misses = 0
+        self._reset_task_store()
+        self._get_task()
+
     def _initialize_http(self, session_file=None, auth_state_file=None):
         self.session = requests.Session()
         self.session_file = Path(session_file) if session_file else self.DEFAULT_SESSION_FILE
@@ -306,17 +341,67 @@ class Dida365:
         if os.name != "nt":
             os.chmod(path, 0o600)
 
-    def get_latest_data(self):
-        self.get_data()
-        self.enrich_info()
-
-    def get_data(self):
-        url = self.base_url + "/batch/check/0"
-        r = self.session.get(url, headers=self.headers, timeout=self.READ_REQUEST_TIMEOUT)
-        r.raise_for_status()
-        self.data = json.loads(r.content)
-        self._get_projects()
-        self._get_task()
+    def get_latest_data(self, max_age=None):
+        """同一调度周期内的只读任务共享快照；写操作会立即使快照失效。"""
+        max_age = self.snapshot_max_age if max_age is None else max_age
+        with self._sync_lock:
+            if (
+                self.snapshot_synced_at is not None
+                and time.monotonic() - self.snapshot_synced_at < max_age
+            ):
+                self.snapshot_cache_hits += 1
+                return
+            self.snapshot_cache_misses += 1
+            generation = self._write_generation
+            self.get_data()
+            self.enrich_info()
+            with self._write_generation_lock:
+                if self._write_generation == generation:
+                    self.snapshot_synced_at = time.monotonic()
+
+    def invalidate_snapshot(self):
+        with self._write_generation_lock:
+            self._write_generation += 1
+            self.snapshot_synced_at = None
+
+    @contextmanager
+    def _snapshot_invalidating_write(self):
+        # 写请求即使失败也可能已经生效，因此在发出前就让快照失效；
+        # 写入完成后再失效一次，防止与写入重叠的同步把旧数据标记为最新。
+        self.invalidate_snapshot()
+        try:
+            yield
+        finally:
+            self.invalidate_snapshot()
+
+    def describe_snapshot_cache(self):
+        return f"滴答快照命中={self.snapshot_cache_hits}，未命中={self.snapshot_cache_misses}"
+
+    def get_data(self, full_sync=False):
+        """按检查点拉取增量；首次、强制或距上次全量过久时回退到 /batch/check/0。"""
+        with self._sync_lock:
+            if (
+                full_sync
+                or not self.checkpoint
+                or self.last_full_sync_at is None
+                or time.monotonic() - self.last_full_sync_at >= self.FULL_SYNC_INTERVAL_SECONDS
+            ):
+                checkpoint = 0
+            else:
+                checkpoint = self.checkpoint
+            url = self.base_url + f"/batch/check/{checkpoint}"
+            r = self.session.get(url, headers=self.headers, timeout=self.READ_REQUEST_TIMEOUT)
+            r.raise_for_status()
+            data = json.loads(r.content)
+            with self._store_lock:
+                self.data = data
+                if checkpoint == 0:
+                    self._reset_task_store()
+                    self.last_full_sync_at = time.monotonic()
+                self._merge_task_delta(data.get("syncTaskBean") or {}, is_full_snapshot=checkpoint == 0)
+                self._get_projects()
+                self._get_task()
+                self.checkpoint = data.get("checkPoint") or 0
 
     def search(self, keyword: str):
         url = self.base_url + "/search/all"
@@ -385,13 +470,14 @@ class Dida365:
         if reply_comment_id:
             payload["replyCommentId"] = reply_comment_id
         url = self.base_url + f"/project/{project_id}/task/{task_id}/comment"
-        response = self._request_write_with_connect_retry(
-            "POST",
-            url,
-            headers=self.headers,
-            data=json.dumps(payload),
-            timeout=self.WRITE_REQUEST_TIMEOUT,
-        )
+        with self._snapshot_invalidating_write():
+            response = self._request_write_with_connect_retry(
+                "POST",
+                url,
+                headers=self.headers,
+                data=json.dumps(payload),
+                timeout=self.WRITE_REQUEST_TIMEOUT,
+            )
         response.raise_for_status()
         return comment_id
 
@@ -399,33 +485,132 @@ class Dida365:
         # 删除不存在的评论也会返回 200，因此调用方可以安全重试；
         # 父评论删除不会级联，评论链仍需由叶子向根节点清理。
         url = self.base_url + f"/project/{project_id}/task/{task_id}/comment/{comment_id}"
-        response = self._request_write_with_connect_retry(
-            "DELETE",
-            url,
-            headers=self.headers,
-            timeout=self.WRITE_REQUEST_TIMEOUT,
-        )
+        with self._snapshot_invalidating_write():
+            response = self._request_write_with_connect_retry(
+                "DELETE",
+                url,
+                headers=self.headers,
+                timeout=self.WRITE_REQUEST_TIMEOUT,
+            )
         response.raise_for_status()
 
     def enrich_info(self):
         self._enrich_task_info()
 
     def _enrich_task_info(self):
-        project_id_name_mapping = {p.id: p.name for p in self.projects}
-        for task in self.active_tasks:
-            task.project_name = project_id_name_mapping.get(task.project_id)
+        with self._store_lock:
+            for task in self._task_objects.values():
+                task.project_name = self.project_names.get(task.project_id)
+
+    @property
+    def active_tasks(self):
+        with self._store_lock:
+            if self._active_tasks is None:
+                self._active_tasks = [self._materialize_task(task_id) for task_id in self.task_store]
+            return self._active_tasks
+
+    def find_task_by_id(self, task_id):
+        with self._store_lock:
+            if task_id not in self.task_store:
+                return None
+            return self._materialize_task(task_id)
+
+    def find_tasks_by_title(self, title):
+        with self._store_lock:
+            return self._materialize_tasks(self._title_index.get(title, ()))
+
+    def find_tasks_by_project(self, project_id):
+        with self._store_lock:
+            return self._materialize_tasks(self._project_index.get(project_id, ()))
+
+    def find_forgetting_curve_tasks_by_start_day(self, start_day):
+        """按北京时间的开始日期（YYYY-MM-DD）查找遗忘曲线重复任务。"""
+        with self._store_lock:
+            return self._materialize_tasks(self._forgetting_curve_day_index.get(start_day, ()))
+
+    def _reset_task_store(self):
+        self.task_store = {}
+        self._title_index = {}
+        self._project_index = {}
+        self._forgetting_curve_day_index = {}
+
+    def _merge_task_delta(self, sync_task_bean, is_full_snapshot=False):
+        for task_dict in sync_task_bean.get("update") or []:
+            task_id = task_dict.get(Task.ID)
+            if not task_id:
+                continue
+            self._remove_from_task_store(task_id)
+            # 全量快照只含未完成任务；增量中的完成、放弃或删除同样以 update 下发，
+            # 需要移出存储，才能与 /batch/check/0 的结果保持一致。
+            if is_full_snapshot or (
+                not task_dict.get("deleted") and task_dict.get(Task.STATUS) == Task.STATUS_ACTIVE
+            ):
+                self._add_to_task_store(task_id, task_dict)
+        for deleted in sync_task_bean.get("delete") or []:
+            task_id = deleted.get("taskId") if isinstance(deleted, dict) else deleted
+            self._remove_from_task_store(task_id)
+
+    def _task_index_keys(self, task_dict):
+        keys = [
+            (self._title_index, task_dict.get(Task.TITLE)),
+            (self._project_index, task_dict.get(Task.PROJECT_ID)),
+        ]
+        repeat_flag = task_dict.get(Task.REPEAT_FLAG)
+        start_date = task_dict.get(Task.START_DATE)
+        if repeat_flag and start_date and "FORGETTINGCURVE" in repeat_flag:
+            start_day = get_prc_arrow(start_date).format("YYYY-MM-DD")
+            keys.append((self._forgetting_curve_day_index, start_day))
+        return keys
+
+    def _add_to_task_store(self, task_id, task_dict):
+        self.task_store[task_id] = task_dict
+        # 索引值用 dict 充当有序集合，查询结果与 active_tasks 的顺序一致。
+        for index, key in self._task_index_keys(task_dict):
+            index.setdefault(key, {})[task_id] = None
+
+    def _remove_from_task_store(self, task_id):
+        task_dict = self.task_store.pop(task_id, None)
+        if task_dict is None:
+            return
+        for index, key in self._task_index_keys(task_dict):
+            task_ids = index.get(key)
+            if task_ids is not None:
+                task_ids.pop(task_id, None)
+                if not task_ids:
+                    del index[key]
 
     def _get_task(self):
-        tasks = self.data["syncTaskBean"]["update"]
-        self.active_tasks = [Task(i) for i in tasks]
+        # 每次同步开始新的一批 Task 对象；同一批次内按需创建并复用同一个对象，
+        # 使调用方在一轮处理中对任务的修改彼此可见。
+        self._task_objects = {}
+        self._active_tasks = None
+
+    def _materialize_task(self, task_id):
+        task = self._task_objects.get(task_id)
+        if task is None:
+            # 调用方会直接修改 task_dict，这里必须复制，避免污染增量存储。
+            task = Task(copy.deepcopy(self.task_store[task_id]))
+            task.project_name = self.project_names.get(task.project_id)
+            self._task_objects[task_id] = task
+        return task
+
+    def _materialize_tasks(self, task_ids):
+        return [self._materialize_task(task_id) for task_id in task_ids]
 
     def _get_projects(self):
-        projects = self.data["projectProfiles"]
-        self.projects = [Project(i) for i in projects]
+        projects = self.data.get("projectProfiles")
+        # 增量响应在项目未变化时可能不带项目列表，此时沿用上一次的结果。
+        if projects is not None or not hasattr(self, "projects"):
+            self.projects = [Project(i) for i in projects or []]
+            self.project_names = {p.id: p.name for p in self.projects}
 
     def _request_write_with_connect_retry(self, method, url, *, timeout, **kwargs):
         """只重试尚未建立连接的超时；响应阶段超时可能已经写入成功。"""
+        body = kwargs.get("data")
         for attempt in range(1, self.WRITE_CONNECT_RETRY_ATTEMPTS + 1):
+            if hasattr(body, "seek"):
+                # 流式请求体在每次尝试前回到开头，重试时发送的仍是完整内容。
+                body.seek(0)
             try:
                 return self.session.request(method, url, timeout=timeout, **kwargs)
             except requests.ConnectTimeout:
@@ -442,54 +627,78 @@ class Dida365:
     def post_task(self, payload):
         url = self.base_url + "/batch/task"
         data = json.dumps(payload)
-        r = self._request_write_with_connect_retry(
-            "POST",
-            url,
-            headers=self.headers,
-            data=data,
-            timeout=self.WRITE_REQUEST_TIMEOUT,
-        )
+        with self._snapshot_invalidating_write():
+            r = self._request_write_with_connect_retry(
+                "POST",
+                url,
+                headers=self.headers,
+                data=data,
+                timeout=self.WRITE_REQUEST_TIMEOUT,
+            )
         r.raise_for_status()
         return r.json() if r.content else None
 
     def adjust_task_parent(self, payload):
         url = self.base_url + "/batch/taskParent"
         data = json.dumps(payload)
-        r = self._request_write_with_connect_retry(
-            "POST",
-            url,
-            headers=self.headers,
-            data=data,
-            timeout=self.WRITE_REQUEST_TIMEOUT,
-        )
+        with self._snapshot_invalidating_write():
+            r = self._request_write_with_connect_retry(
+                "POST",
+                url,
+                headers=self.headers,
+                data=data,
+                timeout=self.WRITE_REQUEST_TIMEOUT,
+            )
         r.raise_for_status()
 
     def upload_attachment(self, *attachments: uploadAttachment):
-        for attachment in attachments:
-            # UUID 和文件内容在重试前固定，避免一次逻辑上传产生多个附件或空文件。
-            url = "https://api.dida365.com/api/v1/attachment/upload/{project_id}/{task_id}/{uuid}".format(
-                project_id=attachment.project_id, task_id=attachment.task_id, uuid=uuid.uuid1().hex
-            )
-            if getattr(attachment, "file_bytes", None) is not None:
-                source = attachment.file_bytes
-                original_position = source.tell()
-                source.seek(0)
-                file_content = source.read()
+        with self._snapshot_invalidating_write():
+            if len(attachments) <= 1:
+                for attachment in attachments:
+                    self._upload_single_attachment(attachment)
+                return
+            # 同一任务的多个附件并行上传；全部结束后再抛出第一个失败，避免留下未等待的上传。
+            with ThreadPoolExecutor(
+                max_workers=min(self.UPLOAD_MAX_WORKERS, len(attachments)),
+                thread_name_prefix="dida-upload",
+            ) as executor:
+                futures = [
+                    executor.submit(self._upload_single_attachment, attachment)
+                    for attachment in attachments
+                ]
+            for future in futures:
+                future.result()
+
+    @contextmanager
+    def _open_attachment_source(self, attachment: uploadAttachment):
+        if getattr(attachment, "file_bytes", None) is not None:
+            source = attachment.file_bytes
+            original_position = source.tell()
+            try:
+                yield source
+            finally:
                 source.seek(original_position)
-            elif getattr(attachment, "file_path", None) is not None:
-                with open(attachment.file_path, "rb") as file:
-                    file_content = file.read()
-            else:
-                raise UserWarning(f"Attachment without neither file bytes nor file path!")
-            files = [("file", (attachment.file_name, file_content, "application/octet-stream"))]
+        elif getattr(attachment, "file_path", None) is not None:
+            with open(attachment.file_path, "rb") as source:
+                yield source
+        else:
+            raise UserWarning(f"Attachment without neither file bytes nor file path!")
+
+    def _upload_single_attachment(self, attachment: uploadAttachment):
+        # UUID 和文件内容在重试前固定，避免一次逻辑上传产生多个附件或空文件。
+        url = "https://api.dida365.com/api/v1/attachment/upload/{project_id}/{task_id}/{uuid}".format(
+            project_id=attachment.project_id, task_id=attachment.task_id, uuid=uuid.uuid1().hex
+        )
+        with self._open_attachment_source(attachment) as source:
+            # 请求体按块从源文件读取，视频不会在内存中再复制一份。
+            body = StreamingMultipartFile("file", attachment.file_name, source)
             headers = copy.copy(self.headers)
-            headers.pop("content-type")
+            headers["content-type"] = body.content_type
             r = self._request_write_with_connect_retry(
                 "POST",
                 url,
                 headers=headers,
-                data={},
-                files=files,
+                data=body,
                 timeout=self.UPLOAD_REQUEST_TIMEOUT,
             )
             r.raise_for_status()
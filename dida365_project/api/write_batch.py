@@ -0,0 +1,134 @@
+from copy import deepcopy
+
+from ..models.task import Task
+
+
+class DidaBatchWriteError(RuntimeError):
+    def __init__(self, id2error: dict):
+        self.id2error = id2error
+        details = "，".join(f"{task_id}: {error}" for task_id, error in id2error.items())
+        super().__init__(f"滴答批量写入有 {len(id2error)} 个任务失败：{details}")
+
+
+class DidaWriteVerificationError(RuntimeError):
+    pass
+
+
+def _normalize_field(value):
+    # 滴答回读的正文可能把换行转换成 CRLF。
+    return value.replace("\r\n", "\n") if isinstance(value, str) else value
+
+
+def post_task_verified(
+    dida,
+    task_dict: dict,
+    *,
+    add=False,
+    verify_fields=(Task.TITLE, Task.CONTENT),
+) -> dict:
+    """写入单个任务并确认结果，返回写入后的任务字典。
+
+    只有写入前带着 etag、且响应的 ``id2etag`` 为本次写入返回了不同的 etag 时，
+    才直接视为写入成功，返回带新 etag 的 ``task_dict`` 副本。新增任务或写入前
+    没有 etag 时无从比较，总是回读任务并逐项比对 ``verify_fields``；
+    ``id2etag`` 缺失或未变化时同样回读。``id2error`` 中的错误以 DidaBatchWriteError 抛出。
+    """
+    task_id = task_dict[Task.ID]
+    if add:
+        payload = Task.gen_add_data_payload(task_dict)
+    else:
+        payload = Task.gen_update_data_payload(task_dict)
+    response = dida.post_task(payload) or {}
+    error = (response.get("id2error") or {}).get(task_id)
+    if error:
+        raise DidaBatchWriteError({task_id: error})
+
+    previous_etag = task_dict.get("etag")
+    written_etag = (response.get("id2etag") or {}).get(task_id)
+    if not add and previous_etag and written_etag and written_etag != previous_etag:
+        confirmed = deepcopy(task_dict)
+        confirmed["etag"] = written_etag
+        return confirmed
+
+    remote = dida.get_task(task_id)
+    if not remote or remote.get("deleted"):
+        raise DidaWriteVerificationError(f"任务 {task_id} 写入后未能回读")
+    for field in verify_fields:
+        if _normalize_field(remote.get(field)) != _normalize_field(task_dict.get(field)):
+            raise DidaWriteVerificationError(f"任务 {task_id} 写入后回读的 {field} 与预期不一致")
+    return remote
+
+
+class DidaWriteBatch:
+    """累积任务的新增/更新，按 chunk_size 合并成 /batch/task 请求。
+
+    同一任务多次写入只保留最后一次的内容。响应中 ``id2error`` 列出的任务会单独
+    重试一次，仍然失败的在 flush 结束时以 DidaBatchWriteError 抛出；成功写入的
+    etag 记录在 ``id2etag`` 中。作为上下文管理器使用时，退出时总会 flush：
+    代码块中途抛出异常时，已经排队的写入照常提交，再继续抛出原异常。
+    """
+
+    DEFAULT_CHUNK_SIZE = 50
+
+    def __init__(self, dida, chunk_size=DEFAULT_CHUNK_SIZE) -> None:
+        self.dida = dida
+        self.chunk_size = chunk_size
+        self._pending: dict[str, tuple[str, dict]] = {}
+        self.id2etag: dict[str, str] = {}
+        self.request_count = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    def add(self, task_dict: dict):
+        self._queue("add", task_dict)
+
+    def update(self, task_dict: dict):
+        self._queue("update", task_dict)
+
+    def _queue(self, action, task_dict):
+        task_id = task_dict[Task.ID]
+        previous = self._pending.get(task_id)
+        # 尚未提交的新增任务再次修改时仍按新增提交。
+        if previous is not None and previous[0] == "add":
+            action = "add"
+        self._pending[task_id] = (action, task_dict)
+
+    def _post(self, writes: list[tuple[str, dict]]) -> dict:
+        payload = Task._gen_post_task_payload()
+        for action, task_dict in writes:
+            payload[action].append(task_dict)
+        self.request_count += 1
+        response = self.dida.post_task(payload) or {}
+        self.id2etag.update(response.get("id2etag") or {})
+        return response.get("id2error") or {}
+
+    def flush(self):
+        writes = list(self._pending.values())
+        self._pending = {}
+        failed_writes = []
+        for start in range(0, len(writes), self.chunk_size):
+            chunk = writes[start : start + self.chunk_size]
+            id2error = self._post(chunk)
+            failed_writes.extend(
+                (action, task_dict)
+                for action, task_dict in chunk
+                if task_dict[Task.ID] in id2error
+            )
+
+        # 整批中个别任务被拒绝时逐个重试，避免一个坏任务拖累同批的其他任务。
+        remaining_errors = {}
+        for write in failed_writes:
+            task_id = write[1][Task.ID]
+            error = self._post([write]).get(task_id)
+            if error:
+                remaining_errors[task_id] = error
+        if remaining_errors:
+            raise DidaBatchWriteError(remaining_errors)
+        return self.id2etag
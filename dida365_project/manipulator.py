@@ -7,6 +7,7 @@ from pathlib import Path
 from time import sleep
 
 from .api.dida365 import Dida365
+from .api.write_batch import DidaWriteBatch
 from .exceptions.backlink_exceptions import TaskNotFoundException
 from .models.backlink import BackLink
 from .models.link import Link
@@ -32,15 +33,17 @@ class DidaManipulator:
         self.today_arrow = get_today_arrow()
 
     def build_backlink(self):
-        for task in [i for i in self.dida.active_tasks if i.project_id == "670946db840bf3f353ab7738"]:
+        # 同一目标任务可能被多个任务引用，批量写入只提交其最终内容。
+        with DidaWriteBatch(self.dida) as batch:
+            self._build_backlink(batch)
+
+    def _build_backlink(self, batch: DidaWriteBatch):
+        for task in self.dida.find_tasks_by_project("670946db840bf3f353ab7738"):
             normal_links = Link.dedup_link_with_wls(task._backlink_util.parse_normal_links())
             for normal_link in normal_links:
-                target_tasks = [i for i in self.dida.active_tasks if i.id == normal_link.link_task_id]
-                if len(target_tasks) == 0:
+                target_task = self.dida.find_task_by_id(normal_link.link_task_id)
+                if target_task is None:
                     raise TaskNotFoundException()
-                target_task = target_tasks[0]
-                if len(target_tasks) > 1:
-                    raise UserWarning(f"Task id duplicates, id: {normal_link.link_task_id}")
                 target_task_backlinks = target_task.backlinks
                 if len(target_task_backlinks) == 0:
                     if_add_section = True
@@ -64,17 +67,18 @@ class DidaManipulator:
                     content = re.sub(BackLinkUtil.SECTION_PATTERN, backlink_section_str, content)
                 if target_task.content != content:
                     target_task.update_content(content)
-                    self.dida.post_task(Task.gen_update_data_payload(target_task.task_dict))
+                    batch.update(target_task.task_dict)
                     print(f'{"Create" if if_add_section else "Update"} backlink: [{target_task.title}] <- [{task.title}]')
 
     def reset_all_backlinks(self):
         """Use with caution!!!"""
-        for task in [i for i in self.dida.active_tasks if i.project_id == "670946db840bf3f353ab7738"]:
-            if re.search(BackLinkUtil.SECTION_PATTERN, task.content):
-                content = re.sub(BackLinkUtil.SECTION_PATTERN, "", task.content)
-                task.update_content(content)
-                self.dida.post_task(Task.gen_update_data_payload(task.task_dict))
-                print(f"Reset backlink in task: {task.title}")
+        with DidaWriteBatch(self.dida) as batch:
+            for task in self.dida.find_tasks_by_project("670946db840bf3f353ab7738"):
+                if re.search(BackLinkUtil.SECTION_PATTERN, task.content):
+                    content = re.sub(BackLinkUtil.SECTION_PATTERN, "", task.content)
+                    task.update_content(content)
+                    batch.update(task.task_dict)
+                    print(f"Reset backlink in task: {task.title}")
 
     def _add_new_ebbinghaus_tasks(self, words):
         template_task = self.find_task("模板版本二")
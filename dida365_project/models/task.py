@@ -154,7 +154,7 @@ class Task:
         return payload
 
     def add_upload_attachment_post_payload_by_path(self, file_path):
-        self.attachments_to_upload.add(uploadAttachment(self, file_path == file_path))
+        self.attachments_to_upload.add(uploadAttachment(self, file_path=file_path))
 
     def add_upload_attachment_post_payload_by_bytes(self, *file_bytes_objs):
         for file_bytes_obj in file_bytes_objs:
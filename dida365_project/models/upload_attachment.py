@@ -1,6 +1,10 @@
+import hashlib
 import os
 
 
+DIGEST_CHUNK_BYTES = 256 * 1024
+
+
 class uploadAttachment:
     # 滴答使用 ![file] 渲染音频/普通附件，使用 ![image] 内联渲染图片。
     # 重排正文时必须同时识别两种引用，避免重试后残留或重复附件。
@@ -9,6 +13,8 @@ class uploadAttachment:
     def __init__(self, task, file_bytes_obj: tuple | None = None, file_path: str | None = None) -> None:
         self.task_id = task.id
         self.project_id = task.project_id
+        self._sha256 = None
+        self._size = None
         if file_bytes_obj:
             self.parse_file_bytes(file_bytes_obj)
         elif file_path:
@@ -16,18 +22,55 @@ class uploadAttachment:
 
     def __eq__(self, __o: object) -> bool:
         if isinstance(__o, uploadAttachment):
-            self_file_bytes = self.file_bytes if hasattr(self, "file_bytes") else ""
-            self_file_path = self.file_path if hasattr(self, "file_path") else ""
-            __o_file_bytes = __o.file_bytes if hasattr(__o, "file_bytes") else ""
-            __o_file_path = __o.file_path if hasattr(__o, "file_path") else ""
-            return str(self_file_bytes) + str(self_file_path) == str(__o_file_bytes) + str(__o_file_path)
+            return self._identity() == __o._identity()
         else:
             return False
 
     def __hash__(self) -> int:
-        self_file_bytes = self.file_bytes if hasattr(self, "file_bytes") else ""
-        self_file_path = self.file_path if hasattr(self, "file_path") else ""
-        return hash(str(self_file_bytes) + str(self_file_path))
+        # 按任务和文件名判等，不读取附件内容；内容哈希只在去重索引需要时再计算。
+        return hash(self._identity())
+
+    def _identity(self):
+        return (self.task_id, getattr(self, "file_name", None))
+
+    @property
+    def sha256(self) -> str:
+        if self._sha256 is None:
+            self._sha256 = self._compute_digest()
+        return self._sha256
+
+    @property
+    def size(self) -> int:
+        if self._size is None:
+            self._size = self._measure_size()
+        return self._size
+
+    def _measure_size(self) -> int:
+        if getattr(self, "file_bytes", None) is not None:
+            original_position = self.file_bytes.tell()
+            try:
+                return self.file_bytes.seek(0, os.SEEK_END)
+            finally:
+                self.file_bytes.seek(original_position)
+        if getattr(self, "file_path", None) is not None:
+            return os.path.getsize(self.file_path)
+        return 0
+
+    def _compute_digest(self) -> str:
+        digest = hashlib.sha256()
+        if getattr(self, "file_bytes", None) is not None:
+            original_position = self.file_bytes.tell()
+            self.file_bytes.seek(0)
+            try:
+                while chunk := self.file_bytes.read(DIGEST_CHUNK_BYTES):
+                    digest.update(chunk)
+            finally:
+                self.file_bytes.seek(original_position)
+        elif getattr(self, "file_path", None) is not None:
+            with open(self.file_path, "rb") as file:
+                while chunk := file.read(DIGEST_CHUNK_BYTES):
+                    digest.update(chunk)
+        return digest.hexdigest()
 
     def parse_file_bytes(self, file_bytes_obj):
         file_name, self.file_bytes = file_bytes_obj
@@ -36,4 +79,5 @@ class uploadAttachment:
 
     def parse_file_path(self, file_path):
         self.file_path = file_path
-        self.file_name = os.path.basename(file_path)
+        # 与字节流附件一致，统一使用小写文件名。
+        self.file_name = os.path.basename(file_path).lower()
@@ -0,0 +1,88 @@
+import io
+import uuid
+
+
+MULTIPART_READ_CHUNK_BYTES = 256 * 1024
+
+
+def _quote_multipart_param(value: str) -> str:
+    # 与 urllib3 的 HTML5 规则一致：文件名中的引号和换行使用百分号转义。
+    return value.translate({10: "%0A", 13: "%0D", 34: "%22"})
+
+
+class StreamingMultipartFile:
+    """只含一个文件字段的 multipart/form-data 请求体。
+
+    文件内容按需从源文件对象中分块读取，不在内存中拼出完整请求体；
+    requests 依据 ``len()`` 设置 Content-Length，并在重定向时通过 seek 回到开头。
+    """
+
+    def __init__(
+        self,
+        field_name: str,
+        file_name: str,
+        source,
+        content_type: str = "application/octet-stream",
+        boundary: str | None = None,
+    ) -> None:
+        self.boundary = boundary or uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self._source = source
+        self._source_size = source.seek(0, io.SEEK_END)
+        self._preamble = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{_quote_multipart_param(field_name)}"; '
+            f'filename="{_quote_multipart_param(file_name)}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        self._epilogue = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+        self._position = 0
+
+    def __len__(self):
+        return len(self._preamble) + self._source_size + len(self._epilogue)
+
+    def __iter__(self):
+        while chunk := self.read(MULTIPART_READ_CHUNK_BYTES):
+            yield chunk
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self)
+        self._position = min(max(offset, 0), len(self))
+        return self._position
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self) - self._position
+        parts = []
+        while size > 0 and self._position < len(self):
+            chunk = self._read_segment(size)
+            parts.append(chunk)
+            size -= len(chunk)
+            self._position += len(chunk)
+        return b"".join(parts)
+
+    def _read_segment(self, size):
+        file_start = len(self._preamble)
+        file_end = file_start + self._source_size
+        if self._position < file_start:
+            return self._preamble[self._position : self._position + size]
+        if self._position < file_end:
+            self._source.seek(self._position - file_start)
+            chunk = self._source.read(min(size, file_end - self._position))
+            if not chunk:
+                raise IOError("上传过程中附件源文件被截断")
+            return chunk
+        offset = self._position - file_end
+        return self._epilogue[offset : offset + size]
@@ -1,10 +1,16 @@
 import argparse
 import getpass
+import json
 import re
+import signal
 import sys
+import threading
 import time
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from urllib.parse import quote
 
@@ -32,14 +38,33 @@ from dida365_project.api.dida365 import DidaSignInError
 from dida365_project.models.task import Task
 from models.anki import UserQuery
 from sentence_practice import SentencePracticeService
+from utils.adaptive_poll import AdaptivePoller
+from utils.browser_pool import close_default_browser_pool, get_default_browser_pool
+from utils.enrichment_cache import (
+    SOURCE_ALL_PHONETIC,
+    SOURCE_BAIDU_WORD_PAGE,
+    SOURCE_DOUBAO_EXPLANATION,
+)
 from utils.markdown_to_html_util import markdown_to_html
-from utils.phonetic_util import get_all_phonetic
+from utils.phonetic_util import (
+    ALL_PHONETIC_EMPTY_RESULT,
+    BaiduWordPageResult,
+    close_phonetic_executor,
+    fetch_all_phonetic,
+    fetch_baidu_word_page,
+)
 from utils.datetime_util import parse_eudic_api_time
-from utils.word_his_db import add_word_to_his_set, if_exists_in_his_set
+from utils.word_his_db import add_word_to_his_set, filter_unseen
 from utils.yaml_config_manager import YamlConfigManager
 
 
 SCHEDULED_JOB_LAST_SUCCESS: dict[str, str] = {}
+SCHEDULER_TICK_SECONDS = 1
+# 每个定时任务各占一个线程，轮询任务不会排在耗时的单词导入之后。
+SCHEDULED_JOB_MAX_WORKERS = 6
+SCHEDULED_JOB_OVERRUN_SECONDS = 5 * 60
+# 常驻运行时定期回读滴答会话，会话失效则在进程内重新登录（仍受登录冷却保护）。
+DIDA_SESSION_REVALIDATE_MINUTES = 30
 PLAYER_NOTE_PREFIX_PATTERN = re.compile(r"^\*\*来源：\*\*[ \t]*《")
 GENERIC_NOTE_HEADING = "**生词语境：**"
 
@@ -68,17 +93,161 @@ def run_scheduled_job(name: str, job, *, log_success: bool = False):
     return result
 
 
-def log_scheduler_heartbeat():
+class ScheduledJobExecutor:
+    """在线程池中执行定时任务。
+
+    同名任务同一时间只运行一个实例，上一次仍在运行时直接跳过本次触发；调度循环
+    每轮调用 ``check_overruns``，运行时间超过 overrun_after 的任务记录一次超时。
+    任务失败后由 ``raise_if_failed`` 在调度线程中重新抛出，沿用“失败即退出、
+    交给 systemd 重启”的策略。
+    """
+
+    def __init__(self, max_workers=SCHEDULED_JOB_MAX_WORKERS, clock=time.monotonic) -> None:
+        self.clock = clock
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="scheduled-job",
+        )
+        self._lock = threading.Lock()
+        self._running: dict[str, tuple[float, float]] = {}
+        self._overrun_reported: set[str] = set()
+        self._failures: list[Exception] = []
+        self.skipped_counts: dict[str, int] = {}
+        self.overrun_counts: dict[str, int] = {}
+
+    def submit(self, name: str, job, overrun_after=SCHEDULED_JOB_OVERRUN_SECONDS) -> Future | None:
+        with self._lock:
+            running = self._running.get(name)
+            if running is not None:
+                started_at, running_overrun_after = running
+                self.skipped_counts[name] = self.skipped_counts.get(name, 0) + 1
+                self._report_overrun(name, started_at, running_overrun_after)
+                return None
+            self._running[name] = (self.clock(), overrun_after)
+            try:
+                return self._executor.submit(self._run, name, job)
+            except BaseException:
+                self._running.pop(name, None)
+                raise
+
+    def submit_scheduled_job(
+        self,
+        name: str,
+        job,
+        *,
+        log_success: bool = False,
+        overrun_after=SCHEDULED_JOB_OVERRUN_SECONDS,
+    ) -> Future | None:
+        return self.submit(
+            name,
+            partial(run_scheduled_job, name, job, log_success=log_success),
+            overrun_after=overrun_after,
+        )
+
+    def check_overruns(self):
+        """检查所有运行中的任务；不依赖同名任务再次触发，每天只跑一次的任务也能报告超时。"""
+        with self._lock:
+            for name, (started_at, overrun_after) in list(self._running.items()):
+                self._report_overrun(name, started_at, overrun_after)
+
+    def _report_overrun(self, name, started_at, overrun_after):
+        elapsed = self.clock() - started_at
+        if elapsed < overrun_after or name in self._overrun_reported:
+            return
+        self._overrun_reported.add(name)
+        self.overrun_counts[name] = self.overrun_counts.get(name, 0) + 1
+        print(
+            f"[调度任务超时] {name} 已运行 {elapsed:.0f} 秒，超过预期的 {overrun_after:g} 秒；"
+            "运行结束前跳过新的触发。",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    def _run(self, name, job):
+        # 在工作线程内完成登记清理，调用方拿到结果时任务已不再处于运行状态。
+        try:
+            return job()
+        except Exception as error:
+            with self._lock:
+                self._failures.append(error)
+            raise
+        finally:
+            with self._lock:
+                self._running.pop(name, None)
+                self._overrun_reported.discard(name)
+
+    def raise_if_failed(self):
+        with self._lock:
+            failure = self._failures[0] if self._failures else None
+        if failure is not None:
+            raise failure
+
+    def describe(self) -> str:
+        now = self.clock()
+        with self._lock:
+            running = [
+                f"{name}({now - started_at:.0f}秒)"
+                for name, (started_at, _) in sorted(self._running.items())
+            ]
+            overruns = [f"{name}×{count}" for name, count in sorted(self.overrun_counts.items())]
+        status = f"运行中={'、'.join(running) or '无'}"
+        if overruns:
+            status = f"{status}，超时={'、'.join(overruns)}"
+        return status
+
+    def shutdown(self):
+        """等待运行中的任务结束，尚未开始的任务直接取消。"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def log_scheduler_heartbeat(*status_providers):
     if SCHEDULED_JOB_LAST_SUCCESS:
         job_status = "；".join(
             f"{name}={completed_at}"
-            for name, completed_at in sorted(SCHEDULED_JOB_LAST_SUCCESS.items())
+            # 任务在工作线程中写入，这里先复制再遍历。
+            for name, completed_at in sorted(SCHEDULED_JOB_LAST_SUCCESS.copy().items())
         )
     else:
         job_status = "等待首次任务完成"
+    extra_status = "；".join(provider() for provider in status_providers)
+    if extra_status:
+        job_status = f"{job_status}；{extra_status}"
     print(f"[服务心跳] {job_status}", flush=True)
 
 
+def install_stop_signal_handlers(stop_event: threading.Event):
+    """SIGTERM/SIGINT 只设置停止标记，当前任务执行完后由调度循环正常退出。"""
+
+    def request_stop(signum, frame):
+        print(
+            f"[服务退出] 收到 {signal.Signals(signum).name}，当前任务结束后退出。",
+            flush=True,
+        )
+        stop_event.set()
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, request_stop)
+
+
+def run_scheduler_loop(
+    stop_event: threading.Event,
+    max_runtime=None,
+    clock=time.monotonic,
+    job_executor: ScheduledJobExecutor | None = None,
+) -> str:
+    """运行调度循环，直到收到停止信号或超过 max_runtime 秒；返回退出原因。"""
+    deadline = clock() + max_runtime if max_runtime is not None else None
+    while not stop_event.is_set():
+        if deadline is not None and clock() >= deadline:
+            return "max_runtime"
+        schedule.run_pending()
+        if job_executor is not None:
+            job_executor.check_overruns()
+            job_executor.raise_if_failed()
+        stop_event.wait(SCHEDULER_TICK_SECONDS)
+    return "signal"
+
+
 def format_note_for_task(note: str) -> str:
     normalized_note = note.replace("\r\n", "\n").replace("\r", "\n").strip()
     # 跨项目约定：字幕播放器用稳定的“**来源：**《”前缀标记已经排版的 Note。
@@ -338,9 +507,25 @@ def build_argument_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="安全导入并验证滴答清单 t 会话凭证；输入不回显，成功后立即退出",
     )
+    parser.add_argument(
+        "--max-runtime",
+        metavar="SECONDS",
+        type=positive_seconds,
+        help="定时调度最长运行秒数，到期后正常退出；默认常驻运行，直到收到 SIGTERM/SIGINT",
+    )
     return parser
 
 
+def positive_seconds(value: str) -> int:
+    try:
+        seconds = int(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError("必须是正整数秒数") from error
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError("必须是正整数秒数")
+    return seconds
+
+
 def resolve_note_argument(parser: argparse.ArgumentParser, args: argparse.Namespace) -> str | None:
     if (args.note is not None or args.note_file is not None or args.note_image) and not args.add_word:
         parser.error("--note、--note-file 和 --note-image 只能与 --add-word 一起使用")
@@ -368,77 +553,207 @@ def resolve_note_image_arguments(parser: argparse.ArgumentParser, args: argparse
     return image_paths
 
 
+# 百度视频地址可能带有时效，页面结果只在重试窗口内复用；视频本身另行按内容缓存。
+BAIDU_WORD_PAGE_CACHE_MAX_AGE_SECONDS = 24 * 60 * 60
+# 单词流水线：准备阶段（笔记图片下载）同时处理的单词数，以及加工阶段（豆包讲解、
+# 百度页面与音标）的线程数。发布到滴答依赖共享快照和模板任务，始终在调用线程逐个执行。
+WORD_PIPELINE_PREPARE_WORKERS = 3
+WORD_PIPELINE_ENRICH_WORKERS = 2 * WORD_PIPELINE_PREPARE_WORKERS
+
+
+def close_note_image_files(note_image_files):
+    # 较大的笔记图片落在临时文件中，发布结束或放弃后及时释放。
+    for _, file in note_image_files:
+        file.close()
+
+
+@dataclass(frozen=True)
+class PreparedWord:
+    word: object
+    content: str
+    note_image_files: list[tuple[str, object]]
+    video_urls: tuple[str, ...] | None
+
+
 class Bearer:
     def __init__(self) -> None:
         self.agent = Agent()
+        # 豆包讲解、音标等按单词缓存，失败重试的下一轮不必重新生成。
+        self.enrichment_cache = self.agent.enrichment_cache
         self.sentence_practice = SentencePracticeService(
             self.agent.dida,
             self.agent.doubao,
         )
+        # 百度音标与讲解视频共用的常驻浏览器；首次使用时才真正启动 Chromium。
+        self.browser_pool = get_default_browser_pool()
+
+    def close(self):
+        self.sentence_practice.close()
+        close_phonetic_executor()
+        close_default_browser_pool()
 
     def acquire_words(self, days: int, include_notes: bool = False):
         words = self.agent.eudic.get_words_in_book(days=days)
         words = [w for w in words if w.is_in_last_days_range(days)]
-        words = [w for w in words if not if_exists_in_his_set(w.word)]
+        unseen_words = set(filter_unseen([w.word for w in words]))
+        words = [w for w in words if w.word in unseen_words]
         if include_notes:
+            notes_data = self.agent.eudic.get_notes_data([word.word for word in words])
             words_with_notes = []
             for word in words:
-                try:
-                    note_data = self.agent.eudic.get_note_data(word.word)
-                    word.note = note_data.text if note_data is not None else None
-                    word.note_images = note_data.images if note_data is not None else ()
-                    words_with_notes.append(word)
-                except EudicNoteFetchError as error:
-                    print(f"{error}，本轮跳过，下一轮继续重试。", flush=True)
+                note_data = notes_data[word.word]
+                if isinstance(note_data, EudicNoteFetchError):
+                    print(f"{note_data}，本轮跳过，下一轮继续重试。", flush=True)
+                    continue
+                word.note = note_data.text if note_data is not None else None
+                word.note_images = note_data.images if note_data is not None else ()
+                words_with_notes.append(word)
             words = words_with_notes
         return list(words)
 
+    def _cached_text(self, word: str, source: str, factory, cacheable=bool):
+        if self.enrichment_cache is None:
+            return factory()
+        return self.enrichment_cache.get_or_create_text(word, source, factory, cacheable)
+
     def get_doubao_explanation_by_doubao(self, word: str):
-        self.agent.doubao.add_system_message(SYSTEM_WORD_TEACHER)
-        answer = self.agent.doubao.chat(USER_ASK_WORD.format(word=word))
-        return answer
+        def ask_doubao():
+            return self.agent.doubao.chat(
+                USER_ASK_WORD.format(word=word),
+                system_message=SYSTEM_WORD_TEACHER,
+            )
+
+        return self._cached_text(word, SOURCE_DOUBAO_EXPLANATION, ask_doubao)
+
+    def get_baidu_word_page(self, word: str) -> BaiduWordPageResult | None:
+        if self.enrichment_cache is not None:
+            cached = self.enrichment_cache.get_text(
+                word,
+                SOURCE_BAIDU_WORD_PAGE,
+                max_age=BAIDU_WORD_PAGE_CACHE_MAX_AGE_SECONDS,
+            )
+            if cached is not None:
+                data = json.loads(cached)
+                return BaiduWordPageResult(
+                    phonetic=data["phonetic"],
+                    video_urls=tuple(data["video_urls"]),
+                )
+        baidu_page = fetch_baidu_word_page(word)
+        if (
+            self.enrichment_cache is not None
+            and baidu_page is not None
+            and (baidu_page.phonetic or baidu_page.video_urls)
+        ):
+            self.enrichment_cache.put_text(
+                word,
+                SOURCE_BAIDU_WORD_PAGE,
+                json.dumps(asdict(baidu_page), ensure_ascii=False),
+            )
+        return baidu_page
+
+    def get_all_phonetic(self, word: str, baidu_page: BaiduWordPageResult | None = None) -> str:
+        # 百度页面读取失败或有来源超时时结果不完整，只使用不缓存，下次重新查询。
+        complete = baidu_page is not None
+
+        def fetch():
+            nonlocal complete
+            result, all_sources_completed = fetch_all_phonetic(
+                word, baidu_page=baidu_page or BaiduWordPageResult()
+            )
+            complete = complete and all_sources_completed
+            return result
+
+        return self._cached_text(
+            word,
+            SOURCE_ALL_PHONETIC,
+            fetch,
+            cacheable=lambda result: complete and result != ALL_PHONETIC_EMPTY_RESULT,
+        )
 
     def add_single_word(self, word: str, note: str | None = None):
         return publish_single_word(self.agent.eudic, word, note)
 
-    def bear_eudic_to_dida365(self):
-        """deprecated"""
-        words = self.acquire_words(7, include_notes=True)
-        if words:
-            print(f"添加单词本生词:{words}", flush=True)
-        for word in words:
-            try:
-                note_image_files = self.agent.eudic.download_note_images(word.note_images)
-            except EudicNoteImageDownloadError as error:
-                print(f"{error}，本轮跳过，下一轮继续重试。", flush=True)
-                continue
-            content = self.get_doubao_explanation_by_doubao(word.word)
+    def _get_phonetic_and_baidu_page(self, word: str):
+        # 音标和讲解视频来自同一个百度页面，只导航一次；读取失败时不再重复尝试
+        # 音标，视频则交给 add_task 自行查询，以保留失败后下一轮重试的语义。
+        baidu_page = self.get_baidu_word_page(word)
+        return self.get_all_phonetic(word, baidu_page=baidu_page), baidu_page
+
+    def _prepare_word(self, word, enrich_pool: ThreadPoolExecutor) -> PreparedWord:
+        """下载笔记图片，再并行生成豆包讲解和音标，拼好待发布的任务正文。"""
+        note_image_files = self.agent.eudic.download_note_images(word.note_images)
+        try:
+            explanation_future = enrich_pool.submit(self.get_doubao_explanation_by_doubao, word.word)
+            phonetic_future = enrich_pool.submit(self._get_phonetic_and_baidu_page, word.word)
+            content = explanation_future.result()
             content += "\n\n[通过web添加anki生词](" + f"{YamlConfigManager().get_config(ANKI_PUSH_ENDPOINT)}?word={quote(word.word)}" + ")"
-            content = compose_word_task_content(
-                get_all_phonetic(word.word),
+            phonetic, baidu_page = phonetic_future.result()
+        except BaseException:
+            close_note_image_files(note_image_files)
+            raise
+        return PreparedWord(
+            word=word,
+            content=compose_word_task_content(
+                phonetic,
                 word.note,
                 content,
                 note_image_count=len(note_image_files),
+            ),
+            note_image_files=note_image_files,
+            video_urls=baidu_page.video_urls if baidu_page is not None else None,
+        )
+
+    def _publish_prepared_word(self, prepared: PreparedWord):
+        word = prepared.word
+        sync_succeeded = False
+        try:
+            self.agent.dida.add_task(
+                word.word,
+                prepared.content,
+                note_image_files=prepared.note_image_files,
+                video_urls=prepared.video_urls,
             )
-            sync_succeeded = False
+        except:  # noqa: E722
+            traceback.print_exc()
+        else:
+            sync_succeeded = True
+        finally:
+            close_note_image_files(prepared.note_image_files)
+        # 图片任务只有在附件和正文引用都校验完成后才能进入历史；无图任务保留
+        # 旧行为，以免发音或视频附件的既有容错语义发生无关变化。
+        if sync_succeeded or not prepared.note_image_files:
             try:
-                self.agent.dida.add_task(
-                    word.word,
-                    content,
-                    note_image_files=note_image_files,
-                )
+                self.agent.dida.find_task(word.word, if_reload_data=True)
+                add_word_to_his_set(word.word)
             except:  # noqa: E722
-                traceback.print_exc()
-            else:
-                sync_succeeded = True
-            # 图片任务只有在附件和正文引用都校验完成后才能进入历史；无图任务保留
-            # 旧行为，以免发音或视频附件的既有容错语义发生无关变化。
-            if sync_succeeded or not note_image_files:
+                pass
+
+    def bear_eudic_to_dida365(self):
+        """deprecated"""
+        words = self.acquire_words(7, include_notes=True)
+        if words:
+            print(f"添加单词本生词:{words}", flush=True)
+        # 多个单词同时准备，先准备好的先发布；发布本身仍逐个进行。
+        with (
+            ThreadPoolExecutor(WORD_PIPELINE_PREPARE_WORKERS, thread_name_prefix="word-prepare") as prepare_pool,
+            ThreadPoolExecutor(WORD_PIPELINE_ENRICH_WORKERS, thread_name_prefix="word-enrich") as enrich_pool,
+        ):
+            futures = {
+                prepare_pool.submit(self._prepare_word, word, enrich_pool): word
+                for word in words
+            }
+            for future in as_completed(futures):
+                word = futures[future]
                 try:
-                    self.agent.dida.find_task(word.word, if_reload_data=True)
-                    add_word_to_his_set(word.word)
-                except:  # noqa: E722
-                    pass
+                    prepared = future.result()
+                except EudicNoteImageDownloadError as error:
+                    print(f"{error}，本轮跳过，下一轮继续重试。", flush=True)
+                    continue
+                except Exception:
+                    print(f"单词 [{word.word}] 准备失败，本轮跳过，下一轮继续重试。", file=sys.stderr, flush=True)
+                    traceback.print_exc()
+                    continue
+                self._publish_prepared_word(prepared)
 
     def bear_eudic_to_anki(self):
         words = self.acquire_words(7)
@@ -458,7 +773,7 @@ class Bearer:
         """deprecated"""
         self.agent.dida.dida.get_latest_data()
         task_with_question: list[tuple[Task, list[str]]] = []
-        for task in [t for t in self.agent.dida.dida.active_tasks if t.content and t.project_id == dida365_constants.VOCAB_BOOK_PROJECT_ID]:
+        for task in [t for t in self.agent.dida.dida.find_tasks_by_project(dida365_constants.VOCAB_BOOK_PROJECT_ID) if t.content]:
             questions = [
                 q for q in re.findall(dida365_constants.QUESTION_PREFIX + r"(.*?)" + dida365_constants.QUESTION_SUFFIX, task.content) if q
             ]
@@ -469,18 +784,17 @@ class Bearer:
         return task_with_question
 
     def answer_question_from_dida365(self):
-        """deprecated"""
-        for task, questions in self.search_questions_from_dida365():
+        """deprecated；返回本轮回答过问题的任务数，供自适应轮询判断是否活跃。"""
+        task_with_question = self.search_questions_from_dida365()
+        for task, questions in task_with_question:
             for question in questions:
-                self.agent.substitute_new_doubao_agent()
-                self.agent.doubao.add_system_message(
-                    "{}{}{}".format(
-                        re.sub(dida365_constants.QUESTION_PREFIX + r"(.*?)" + dida365_constants.QUESTION_SUFFIX, "", task.content),
-                        "-" * 30,
-                        USER_ASK_EXP,
-                    )
+                # 与单词导入任务并发运行时共用豆包客户端，系统提示必须随请求显式传入。
+                system_message = "{}{}{}".format(
+                    re.sub(dida365_constants.QUESTION_PREFIX + r"(.*?)" + dida365_constants.QUESTION_SUFFIX, "", task.content),
+                    "-" * 30,
+                    USER_ASK_EXP,
                 )
-                answer = self.agent.doubao.chat(question)
+                answer = self.agent.doubao.chat(question, system_message=system_message)
                 answer = answer.strip()
                 task.update_content(
                     task.content.replace(
@@ -489,6 +803,7 @@ class Bearer:
                     )
                 )
             self.agent.dida.update_task(task.task_dict)
+        return len(task_with_question)
 
     def search_and_answer_questions_from_anki(self):
         note_with_question: list[UserQuery] = self.agent.anki_client.search_user_query()
@@ -520,6 +835,9 @@ if __name__ == "__main__":
     note = resolve_note_argument(parser, args)
     note_image_paths = resolve_note_image_arguments(parser, args)
 
+    if args.max_runtime is not None and (args.set_dida_t or args.add_word):
+        parser.error("--max-runtime 只能用于定时调度模式")
+
     if args.set_dida_t:
         t_value = getpass.getpass("请输入滴答清单 t 会话凭证：")
         try:
@@ -557,38 +875,68 @@ if __name__ == "__main__":
         print(error)
         raise SystemExit(75) from error
 
+    job_executor = ScheduledJobExecutor()
     schedule.every(1).minutes.do(
-        run_scheduled_job,
+        job_executor.submit_scheduled_job,
         "同步欧路生词到滴答",
         b.bear_eudic_to_dida365,
         log_success=True,
+        overrun_after=60,
     )
-    schedule.every(10).seconds.do(
-        run_scheduled_job,
+    question_poller = AdaptivePoller(
         "检查并回答滴答问题",
-        b.answer_question_from_dida365,
+        partial(run_scheduled_job, "检查并回答滴答问题", b.answer_question_from_dida365),
     )
+    schedule.every(1).seconds.do(job_executor.submit, "检查并回答滴答问题", question_poller.run_if_due)
     schedule.every(1).day.at("00:01").do(
-        run_scheduled_job,
+        job_executor.submit_scheduled_job,
         "续期逾期单词任务",
         b.agent.dida.renew_overdue_task,
         log_success=True,
     )
     schedule.every(1).day.at("00:05").do(
-        run_scheduled_job,
+        job_executor.submit_scheduled_job,
         "生成每日单词组合造句任务",
         b.sentence_practice.generate_daily_task,
         log_success=True,
     )
-    schedule.every(10).seconds.do(
-        run_scheduled_job,
+    sentence_practice_poller = AdaptivePoller(
         "处理每日造句评论",
-        b.sentence_practice.poll_and_process,
+        partial(run_scheduled_job, "处理每日造句评论", b.sentence_practice.poll_and_process),
+        is_active=b.sentence_practice.has_recent_activity,
+    )
+    schedule.every(1).seconds.do(job_executor.submit, "处理每日造句评论", sentence_practice_poller.run_if_due)
+    schedule.every(1).minutes.do(
+        log_scheduler_heartbeat,
+        b.agent.dida.dida.describe_snapshot_cache,
+        b.agent.eudic.describe_connection_stats,
+        b.agent.dida.describe_upload_dedup_stats,
+        question_poller.describe,
+        sentence_practice_poller.describe,
+        job_executor.describe,
     )
-    schedule.every(1).minutes.do(log_scheduler_heartbeat)
+    schedule.every(DIDA_SESSION_REVALIDATE_MINUTES).minutes.do(
+        job_executor.submit_scheduled_job,
+        "校验滴答会话",
+        b.agent.revalidate_dida_session,
+    )
+    stop_event = threading.Event()
+    install_stop_signal_handlers(stop_event)
     print("[服务启动] 定时任务调度已开始。", flush=True)
 
-    for _ in range(3600):  # 只运行1小时
-        schedule.run_pending()
-        time.sleep(1)
-    print("[服务退出] 已达到一小时运行周期。", flush=True)
+    try:
+        exit_reason = run_scheduler_loop(
+            stop_event,
+            max_runtime=args.max_runtime,
+            job_executor=job_executor,
+        )
+    except (DidaLoginCooldownError, DidaSessionValidationError, DidaSignInError) as error:
+        print(error)
+        raise SystemExit(75) from error
+    finally:
+        job_executor.shutdown()
+        b.close()
+    if exit_reason == "max_runtime":
+        print(f"[服务退出] 已达到最长运行时间 {args.max_runtime} 秒。", flush=True)
+    else:
+        print("[服务退出] 已停止定时任务调度。", flush=True)
@@ -3,12 +3,18 @@ import json
 import random
 import re
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
 from constants.dida365 import VOCAB_BOOK_PROJECT_ID
 from constants.prompt import SYSTEM_SENTENCE_PRACTICE_REVIEWER
+from dida365_project.api.write_batch import (
+    DidaBatchWriteError,
+    DidaWriteVerificationError,
+    post_task_verified,
+)
 from dida365_project.models.task import Task
 from utils.sentence_practice_db import (
     COMMENT_ROLE_SOURCE,
@@ -36,6 +42,9 @@ PRACTICE_TIMEZONE = ZoneInfo("Asia/Shanghai")
 PRACTICE_TASK_TITLE_PREFIX = "每日单词组合造句"
 SYSTEM_MARKER_PATTERN = re.compile(r"\n?\[\[sentence-practice:clarification:[^\]]+\]\]\s*$")
 GROUP_HEADING_PATTERN = re.compile(r"^## 第 (\d+) 组\s*$", re.MULTILINE)
+# 在这段时间内更新过的未完成交互（例如刚发出的追问）让轮询保持高频。
+SENTENCE_PRACTICE_ACTIVE_WINDOW_SECONDS = 30 * 60
+COMMENT_FETCH_MAX_WORKERS = 8
 
 
 class SentencePracticeError(RuntimeError):
@@ -276,6 +285,33 @@ def append_review_to_body(content, interaction, comments, ai_result):
     return re.sub(r"\n{4,}", "\n\n\n", updated_content).strip()
 
 
+class TaskCommentCache:
+    """按 (任务 id, etag, commentCount) 缓存评论列表。
+
+    扫描时任务的 etag 与评论数未变化就复用上次的列表；本服务自己写评论后立即作废，
+    同一轮中的动作处理直接使用扫描时取到的列表。
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[tuple[str | None, int], list]] = {}
+
+    def get(self, task_id, etag, comment_count):
+        entry = self._entries.get(task_id)
+        if entry is None or entry[0] != (etag, comment_count):
+            return None
+        return deepcopy(entry[1])
+
+    def get_latest(self, task_id):
+        entry = self._entries.get(task_id)
+        return deepcopy(entry[1]) if entry is not None else None
+
+    def put(self, task_id, etag, comment_count, comments):
+        self._entries[task_id] = ((etag, comment_count), deepcopy(comments))
+
+    def invalidate(self, task_id):
+        self._entries.pop(task_id, None)
+
+
 class SentencePracticeService:
     def __init__(
         self,
@@ -289,6 +325,10 @@ class SentencePracticeService:
         self.doubao = doubao
         self.state = state_store or SentencePracticeStateStore()
         self.now_provider = now_provider or (lambda: datetime.now(PRACTICE_TIMEZONE))
+        self._last_poll_active = False
+        self.comment_cache = TaskCommentCache()
+        # 多个练习任务同时变化时并发拉取评论列表；线程池首次需要时创建，随服务关闭。
+        self._comment_fetch_executor = None
 
     def generate_daily_task(self):
         practice_date = self.now_provider().astimezone(PRACTICE_TIMEZONE).date().isoformat()
@@ -301,9 +341,7 @@ class SentencePracticeService:
         title = f"{PRACTICE_TASK_TITLE_PREFIX} · {practice_date}"
         existing = self.state.get_task_by_date(practice_date)
         if existing is None:
-            remote_matches = [
-                task for task in self.dida.active_tasks if task.title == title
-            ]
+            remote_matches = self.dida.find_tasks_by_title(title)
             if len(remote_matches) > 1:
                 raise SentencePracticeError(f"发现多个同名每日造句任务：{title}")
             task_id = remote_matches[0].id if remote_matches else uuid.uuid4().hex[:24]
@@ -345,12 +383,10 @@ class SentencePracticeService:
             "isAllDay": True,
             "timeZone": "Asia/Shanghai",
         }
-        self.dida.post_task(Task.gen_add_data_payload(task_dict))
-        verified = self.dida.get_task(existing["task_id"])
-        if not verified or verified.get("deleted"):
-            raise SentencePracticeError("每日造句任务创建后未能回读")
-        if verified.get("title") != existing["title"] or verified.get("content") != content:
-            raise SentencePracticeError("每日造句任务创建后的标题或正文与预期不一致")
+        try:
+            verified = post_task_verified(self.dida, task_dict, add=True)
+        except DidaWriteVerificationError as error:
+            raise SentencePracticeError(f"每日造句任务创建后校验失败：{error}") from error
         self.state.update_task_observation(
             existing["task_id"],
             status=TASK_STATUS_ACTIVE,
@@ -364,7 +400,7 @@ class SentencePracticeService:
         return self.state.get_task_by_id(existing["task_id"])
 
     def poll_and_process(self, max_actions=20):
-        self._scan_remote_comments()
+        changed_tasks = self._scan_remote_comments()
         processed = 0
         while processed < max_actions:
             interaction = self.state.claim_next_action()
@@ -380,8 +416,15 @@ class SentencePracticeService:
                     flush=True,
                 )
             processed += 1
+        self._last_poll_active = bool(changed_tasks or processed)
         return processed
 
+    def has_recent_activity(self) -> bool:
+        """上一轮发现新评论或处理过交互，或仍有近期未完成的交互时视为活跃。"""
+        return self._last_poll_active or bool(
+            self.state.count_open_interactions(SENTENCE_PRACTICE_ACTIVE_WINDOW_SECONDS)
+        )
+
     @staticmethod
     def _resume_status(claimed_status):
         return {
@@ -393,23 +436,25 @@ class SentencePracticeService:
 
     def _scan_remote_comments(self):
         # 一轮只同步一次任务列表，避免随着历史上仍未完成的每日练习增多，
-        # 每 10 秒为每个任务各发一次详情请求。仅在同步结果缺失时单独回读。
+        # 每次轮询为每个任务各发一次详情请求。仅在同步结果缺失时单独回读。
         self.dida.get_latest_data()
-        synchronized_tasks = {
-            task.id: deepcopy(task.task_dict) for task in self.dida.active_tasks
-        }
+        observations = []
+        changed_records = []
         for task_record in self.state.list_monitored_tasks():
-            remote = synchronized_tasks.get(task_record["task_id"])
-            if remote is None:
-                remote = self.dida.get_task(task_record["task_id"])
+            task_id = task_record["task_id"]
+            synchronized_task = self.dida.find_task_by_id(task_id)
+            if synchronized_task is not None:
+                remote = deepcopy(synchronized_task.task_dict)
+            else:
+                remote = self.dida.get_task(task_id)
             if remote is None:
+                self.comment_cache.invalidate(task_id)
                 if task_record["status"] != TASK_STATUS_CREATING:
-                    self.state.update_task_observation(
-                        task_record["task_id"], status=TASK_STATUS_DELETED
-                    )
+                    observations.append((task_id, {"status": TASK_STATUS_DELETED}))
                 continue
             if remote.get("deleted"):
-                self.state.update_task_observation(task_record["task_id"], status=TASK_STATUS_DELETED)
+                self.comment_cache.invalidate(task_id)
+                observations.append((task_id, {"status": TASK_STATUS_DELETED}))
                 continue
             is_active = remote.get("status") == Task.STATUS_ACTIVE
             status = TASK_STATUS_ACTIVE if is_active else TASK_STATUS_CLOSED
@@ -420,19 +465,66 @@ class SentencePracticeService:
                 or task_record["last_comment_count"] != comment_count
                 or task_record["last_etag"] != etag
             )
+            cached_comments = self.comment_cache.get(task_id, etag, comment_count)
+            if not is_active or cached_comments is None:
+                # 缓存与最新的 etag/评论数不符时不再供动作处理复用。
+                self.comment_cache.invalidate(task_id)
             if is_active and changed:
-                comments = self.dida.get_task_comments(
-                    task_record["project_id"], task_record["task_id"]
-                )
-                self.state.record_remote_comments(
-                    task_record["task_id"], task_record["project_id"], comments
-                )
-            self.state.update_task_observation(
-                task_record["task_id"],
-                status=status,
-                comment_count=comment_count,
-                etag=etag,
+                changed_records.append((task_record, etag, comment_count, cached_comments))
+            observations.append(
+                (task_id, {"status": status, "comment_count": comment_count, "etag": etag})
+            )
+
+        # 先取齐全部评论再落库；任一拉取失败时本轮不更新观察值，下一轮重新拉取。
+        fetched_comments = iter(
+            self._fetch_comment_lists(
+                [
+                    (task_record["project_id"], task_record["task_id"])
+                    for task_record, _, _, cached_comments in changed_records
+                    if cached_comments is None
+                ]
+            )
+        )
+        for task_record, etag, comment_count, cached_comments in changed_records:
+            comments = cached_comments if cached_comments is not None else next(fetched_comments)
+            self.state.record_remote_comments(
+                task_record["task_id"], task_record["project_id"], comments
             )
+            self.comment_cache.put(task_record["task_id"], etag, comment_count, comments)
+        for task_id, observation in observations:
+            self.state.update_task_observation(task_id, **observation)
+        return len(changed_records)
+
+    def _fetch_comment_lists(self, task_keys):
+        if len(task_keys) <= 1:
+            return [
+                self.dida.get_task_comments(project_id, task_id)
+                for project_id, task_id in task_keys
+            ]
+
+        if self._comment_fetch_executor is None:
+            self._comment_fetch_executor = ThreadPoolExecutor(
+                max_workers=COMMENT_FETCH_MAX_WORKERS,
+                thread_name_prefix="practice-comments",
+            )
+        return list(
+            self._comment_fetch_executor.map(
+                lambda task_key: self.dida.get_task_comments(*task_key),
+                task_keys,
+            )
+        )
+
+    def close(self):
+        if self._comment_fetch_executor is not None:
+            self._comment_fetch_executor.shutdown(wait=True)
+            self._comment_fetch_executor = None
+
+    def _get_task_comments(self, interaction):
+        """优先复用本轮扫描取到的评论列表。"""
+        comments = self.comment_cache.get_latest(interaction["task_id"])
+        if comments is not None:
+            return comments
+        return self.dida.get_task_comments(interaction["project_id"], interaction["task_id"])
 
     def _run_claimed_action(self, interaction):
         if interaction["status"] == INTERACTION_STATUS_PROCESSING:
@@ -446,9 +538,20 @@ class SentencePracticeService:
         else:
             raise SentencePracticeError(f"无法处理交互状态：{interaction['status']}")
 
+    def _get_current_task(self, task_record):
+        """本轮同步到的任务 etag 与最近一次确认的 etag 一致时直接复用，否则单独回读。"""
+        synchronized_task = self.dida.find_task_by_id(task_record["task_id"])
+        if (
+            synchronized_task is not None
+            and task_record["last_etag"]
+            and synchronized_task.task_dict.get("etag") == task_record["last_etag"]
+        ):
+            return deepcopy(synchronized_task.task_dict)
+        return self.dida.get_task(task_record["task_id"])
+
     def _ask_ai(self, interaction):
         task_record = self.state.get_task_by_id(interaction["task_id"])
-        remote = self.dida.get_task(interaction["task_id"])
+        remote = self._get_current_task(task_record)
         if not remote or remote.get("deleted"):
             raise SentencePracticeError("待处理的每日造句任务已经被删除")
         groups = json.loads(task_record["groups_json"])
@@ -505,10 +608,9 @@ class SentencePracticeService:
             if comment["role"] == COMMENT_ROLE_SYSTEM_CLARIFICATION
             and not comment["remote_deleted"]
         )
-        remote_comments = self.dida.get_task_comments(
-            interaction["project_id"], interaction["task_id"]
-        )
+        remote_comments = self._get_task_comments(interaction)
         if not any(comment.get("id") == clarification["comment_id"] for comment in remote_comments):
+            self.comment_cache.invalidate(interaction["task_id"])
             self.dida.create_task_comment(
                 interaction["project_id"],
                 interaction["task_id"],
@@ -542,24 +644,29 @@ class SentencePracticeService:
         if updated_content.replace("\r\n", "\n") != current_content.replace("\r\n", "\n"):
             update_dict = deepcopy(remote)
             update_dict[Task.CONTENT] = updated_content
-            response = self.dida.post_task(Task.gen_update_data_payload(update_dict))
-            if isinstance(response, dict):
-                error = (response.get("id2error") or {}).get(interaction["task_id"])
-                if error:
-                    raise SentencePracticeError(f"滴答拒绝正文更新：{error}")
-            verified = self.dida.get_task(interaction["task_id"])
-            verified_content = (verified or {}).get("content") or ""
-            if verified_content.replace("\r\n", "\n") != updated_content.replace("\r\n", "\n"):
-                raise SentencePracticeError("正文更新后回读内容不一致")
+            try:
+                verified = post_task_verified(
+                    self.dida, update_dict, verify_fields=(Task.CONTENT,)
+                )
+            except DidaBatchWriteError as error:
+                raise SentencePracticeError(
+                    f"滴答拒绝正文更新：{error.id2error[interaction['task_id']]}"
+                ) from error
+            except DidaWriteVerificationError as error:
+                raise SentencePracticeError(f"正文更新后校验失败：{error}") from error
+            # 记下本次写入的 etag，后续动作才能放心复用同步快照中的任务。
+            self.state.update_task_observation(
+                interaction["task_id"],
+                comment_count=verified.get("commentCount", remote.get("commentCount", 0)),
+                etag=verified.get("etag"),
+            )
         self.state.set_interaction_status(
             interaction["id"], INTERACTION_STATUS_BODY_APPLIED
         )
 
     def _delete_comments(self, interaction):
         comments = self.state.get_interaction_comments(interaction["id"])
-        remote_comments = self.dida.get_task_comments(
-            interaction["project_id"], interaction["task_id"]
-        )
+        remote_comments = self._get_task_comments(interaction)
         remote_ids = {comment.get("id") for comment in remote_comments}
         relevant_ids = {comment["comment_id"] for comment in comments}
         parent_by_id = {
@@ -581,6 +688,7 @@ class SentencePracticeService:
             key=lambda comment: (depth(comment["comment_id"]), comment["created_at"]),
             reverse=True,
         )
+        self.comment_cache.invalidate(interaction["task_id"])
         for comment in ordered_comments:
             comment_id = comment["comment_id"]
             if comment_id in remote_ids:
@@ -596,6 +704,8 @@ class SentencePracticeService:
         if relevant_ids & remaining_ids:
             raise SentencePracticeError("评论清理后仍有交互评论残留")
         self.state.set_interaction_status(interaction["id"], INTERACTION_STATUS_DONE)
+        # 删除评论会改变任务 etag，但评论接口不返回它；回读记下删除后的 etag，
+        # 下一轮扫描才不会把这次清理当成用户的新改动。
         task = self.dida.get_task(interaction["task_id"])
         if task:
             self.state.update_task_observation(
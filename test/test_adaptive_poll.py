@@ -0,0 +1,85 @@
+import unittest
+from unittest.mock import Mock
+
+from utils.adaptive_poll import AdaptivePoller
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class AdaptivePollerTest(unittest.TestCase):
+    def make_poller(self, job, **kwargs):
+        self.clock = FakeClock()
+        return AdaptivePoller(
+            "轮询",
+            job,
+            min_interval=5,
+            max_interval=40,
+            clock=self.clock,
+            **kwargs,
+        )
+
+    def run_until_next(self, poller):
+        self.clock.now += poller.interval
+        return poller.run_if_due()
+
+    def test_idle_polls_back_off_up_to_the_maximum(self):
+        job = Mock(return_value=0)
+        poller = self.make_poller(job)
+
+        poller.run_if_due()
+        intervals = [poller.interval]
+        for _ in range(4):
+            self.run_until_next(poller)
+            intervals.append(poller.interval)
+
+        self.assertEqual(intervals, [10, 20, 40, 40, 40])
+        self.assertEqual(poller.describe(), "轮询轮询间隔=40秒")
+
+    def test_activity_resets_the_interval(self):
+        job = Mock(side_effect=[0, 0, 1])
+        poller = self.make_poller(job)
+
+        poller.run_if_due()
+        self.run_until_next(poller)
+        self.assertEqual(poller.interval, 20)
+        self.run_until_next(poller)
+
+        self.assertEqual(poller.interval, 5)
+
+    def test_job_is_not_run_before_it_is_due(self):
+        job = Mock(return_value=0)
+        poller = self.make_poller(job)
+
+        poller.run_if_due()
+        self.clock.now += 9
+        poller.run_if_due()
+
+        job.assert_called_once()
+
+    def test_activity_probe_overrides_the_job_result(self):
+        poller = self.make_poller(Mock(return_value=0), is_active=Mock(return_value=True))
+
+        poller.run_if_due()
+
+        self.assertEqual(poller.interval, 5)
+
+    def test_failed_job_keeps_the_interval_and_waits(self):
+        job = Mock(side_effect=[RuntimeError("boom"), 0])
+        poller = self.make_poller(job)
+
+        with self.assertRaises(RuntimeError):
+            poller.run_if_due()
+        self.assertIsNone(poller.run_if_due())
+
+        self.assertEqual(poller.interval, 5)
+        job.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
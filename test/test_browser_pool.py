@@ -0,0 +1,181 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from utils.browser_pool import BrowserPool, BrowserPoolClosedError
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+        self.goto_urls = []
+        self.closed = False
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        self.goto_urls.append(url)
+
+    async def wait_for_load_state(self, state, timeout=None):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.pages = []
+        self.closed = False
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    def is_connected(self):
+        return not self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.launches = []
+        self.stopped = False
+        self.chromium = self
+
+    async def launch(self, headless=True):
+        browser = FakeBrowser()
+        self.launches.append(browser)
+        return browser
+
+    async def stop(self):
+        self.stopped = True
+
+
+class FakePlaywrightContext:
+    def __init__(self, playwright):
+        self.playwright = playwright
+
+    async def start(self):
+        return self.playwright
+
+
+class BrowserPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.playwright = FakePlaywright()
+        patcher = patch(
+            "utils.browser_pool.async_playwright",
+            return_value=FakePlaywrightContext(self.playwright),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_same_url_is_navigated_again_on_a_reused_page(self):
+        pool = BrowserPool(max_pages=2)
+        self.addCleanup(pool.close)
+
+        async def page_id(page):
+            return id(page)
+
+        first = pool.run("https://example.test/a", page_id)
+        second = pool.run("https://example.test/a", page_id, wait_until="networkidle")
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.playwright.launches), 1)
+        self.assertEqual(
+            self.playwright.launches[0].pages[0].goto_urls,
+            ["https://example.test/a", "https://example.test/a"],
+        )
+
+    def test_hung_handler_times_out_and_its_page_is_discarded(self):
+        pool = BrowserPool(max_pages=1)
+        self.addCleanup(pool.close)
+
+        async def hang(page):
+            await asyncio.sleep(5)
+
+        async def noop(page):
+            return None
+
+        with patch("utils.browser_pool.BROWSER_POOL_TASK_TIMEOUT_SECONDS", 0.1):
+            with self.assertRaises(TimeoutError):
+                pool.run("https://example.test/a", hang)
+            pool.run("https://example.test/b", noop)
+
+        pages = self.playwright.launches[0].pages
+        self.assertEqual(len(pages), 2)
+        self.assertTrue(pages[0].closed)
+
+    def test_time_spent_waiting_for_a_page_is_not_part_of_the_timeout(self):
+        pool = BrowserPool(max_pages=1)
+        self.addCleanup(pool.close)
+
+        async def slow(page):
+            await asyncio.sleep(0.2)
+            return "done"
+
+        with (
+            patch("utils.browser_pool.BROWSER_POOL_TASK_TIMEOUT_SECONDS", 0.3),
+            ThreadPoolExecutor(max_workers=2) as callers,
+        ):
+            futures = [
+                callers.submit(pool.run, f"https://example.test/{index}", slow)
+                for index in range(2)
+            ]
+            results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(results, ["done", "done"])
+
+    def test_page_is_recycled_after_max_uses(self):
+        pool = BrowserPool(max_pages=1, max_uses_per_page=2)
+        self.addCleanup(pool.close)
+
+        async def noop(page):
+            return None
+
+        for index in range(3):
+            pool.run(f"https://example.test/{index}", noop)
+
+        pages = self.playwright.launches[0].pages
+        self.assertEqual(len(pages), 2)
+        self.assertTrue(pages[0].closed)
+        self.assertFalse(pages[1].closed)
+
+    def test_failed_handler_discards_the_page(self):
+        pool = BrowserPool(max_pages=1)
+        self.addCleanup(pool.close)
+
+        async def fail(page):
+            raise ValueError("broken page")
+
+        async def noop(page):
+            return None
+
+        with self.assertRaises(ValueError):
+            pool.run("https://example.test/a", fail)
+        pool.run("https://example.test/a", noop)
+
+        pages = self.playwright.launches[0].pages
+        self.assertEqual(len(pages), 2)
+        self.assertTrue(pages[0].closed)
+        self.assertEqual(pages[1].goto_urls, ["https://example.test/a"])
+
+    def test_close_shuts_down_browser_and_rejects_new_work(self):
+        pool = BrowserPool()
+
+        async def noop(page):
+            return None
+
+        pool.run("https://example.test/a", noop)
+        pool.close()
+
+        self.assertTrue(self.playwright.launches[0].closed)
+        self.assertTrue(self.playwright.stopped)
+        with self.assertRaises(BrowserPoolClosedError):
+            pool.run("https://example.test/a", noop)
+
+
+if __name__ == "__main__":
+    unittest.main()
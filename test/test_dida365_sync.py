@@ -0,0 +1,273 @@
+import json
+import threading
+import unittest
+from unittest.mock import Mock
+
+from dida365_project.models.task import Task
+from test_network_resilience import make_dida_client
+
+
+def make_sync_response(checkpoint, update=None, delete=None, projects=None):
+    response = Mock()
+    payload = {
+        "checkPoint": checkpoint,
+        "syncTaskBean": {"update": update or [], "delete": delete or []},
+        "projectProfiles": projects,
+    }
+    response.content = json.dumps(payload).encode("utf-8")
+    return response
+
+
+def make_task(task_id, title, status=Task.STATUS_ACTIVE, **extra):
+    return {"id": task_id, "projectId": "project-1", "title": title, "status": status, **extra}
+
+
+class Dida365IncrementalSyncTest(unittest.TestCase):
+    def test_first_sync_is_full_and_later_syncs_request_deltas(self):
+        session = Mock()
+        session.get.side_effect = [
+            make_sync_response(100, [make_task("a", "alpha"), make_task("b", "beta")], projects=[]),
+            make_sync_response(200, [make_task("a", "alpha v2"), make_task("c", "gamma")]),
+        ]
+        client = make_dida_client(session)
+
+        client.get_data()
+        client.get_data()
+
+        urls = [call.args[0] for call in session.get.call_args_list]
+        self.assertTrue(urls[0].endswith("/batch/check/0"))
+        self.assertTrue(urls[1].endswith("/batch/check/100"))
+        self.assertEqual(client.checkpoint, 200)
+        self.assertEqual(
+            sorted(task.title for task in client.active_tasks),
+            ["alpha v2", "beta", "gamma"],
+        )
+
+    def test_delta_removes_deleted_and_completed_tasks(self):
+        session = Mock()
+        session.get.side_effect = [
+            make_sync_response(100, [make_task("a", "alpha"), make_task("b", "beta"), make_task("c", "gamma")], projects=[]),
+            make_sync_response(
+                200,
+                [make_task("b", "beta", status=Task.STATUS_COMPLETED)],
+                delete=[{"taskId": "a", "projectId": "project-1"}],
+            ),
+        ]
+        client = make_dida_client(session)
+
+        client.get_data()
+        client.get_data()
+
+        self.assertEqual([task.id for task in client.active_tasks], ["c"])
+
+    def test_delta_without_project_profiles_keeps_previous_projects(self):
+        session = Mock()
+        session.get.side_effect = [
+            make_sync_response(100, projects=[{"id": "project-1", "name": "背单词"}]),
+            make_sync_response(200),
+        ]
+        client = make_dida_client(session)
+
+        client.get_data()
+        client.get_data()
+
+        self.assertEqual([project.name for project in client.projects], ["背单词"])
+
+    def test_mutating_returned_tasks_does_not_touch_the_store(self):
+        session = Mock()
+        session.get.side_effect = [
+            make_sync_response(100, [make_task("a", "alpha")], projects=[]),
+            make_sync_response(200),
+        ]
+        client = make_dida_client(session)
+
+        client.get_data()
+        client.active_tasks[0].task_dict[Task.TITLE] = "mutated"
+        client.get_data()
+
+        self.assertEqual(client.active_tasks[0].task_dict[Task.TITLE], "alpha")
+
+    def test_clients_keep_separate_sync_state(self):
+        first_session = Mock()
+        first_session.get.return_value = make_sync_response(100, [make_task("a", "alpha")], projects=[])
+        first = make_dida_client(first_session)
+        second = make_dida_client(Mock())
+
+        first.get_data()
+
+        self.assertEqual(first.checkpoint, 100)
+        self.assertEqual(second.checkpoint, 0)
+        self.assertIsNone(second.find_task_by_id("a"))
+        self.assertIsNot(first._store_lock, second._store_lock)
+
+    def test_force_full_sync_resets_the_store(self):
+        session = Mock()
+        session.get.side_effect = [
+            make_sync_response(100, [make_task("a", "alpha")], projects=[]),
+            make_sync_response(300, [make_task("b", "beta")], projects=[]),
+        ]
+        client = make_dida_client(session)
+
+        client.get_data()
+        client.get_data(full_sync=True)
+
+        self.assertTrue(session.get.call_args.args[0].endswith("/batch/check/0"))
+        self.assertEqual([task.id for task in client.active_tasks], ["b"])
+
+
+class Dida365TaskIndexTest(unittest.TestCase):
+    def test_indexes_follow_incremental_updates(self):
+        session = Mock()
+        session.get.side_effect = [
+            make_sync_response(
+                100,
+                [
+                    make_task("a", "alpha"),
+                    make_task(
+                        "b",
+                        "beta",
+                        repeatFlag="RRULE:FREQ=DAILY;TT_TIMES=FORGETTINGCURVE",
+                        startDate="2026-08-16T16:00:00.000+0000",
+                    ),
+                ],
+                projects=[{"id": "project-1", "name": "背单词"}],
+            ),
+            make_sync_response(
+                200,
+                [
+                    make_task("a", "alpha renamed", projectId="project-2"),
+                    make_task(
+                        "b",
+                        "beta",
+                        repeatFlag="RRULE:FREQ=DAILY;TT_TIMES=FORGETTINGCURVE",
+                        startDate="2026-08-17T16:00:00.000+0000",
+                    ),
+                ],
+            ),
+        ]
+        client = make_dida_client(session)
+
+        client.get_data()
+        self.assertEqual([task.id for task in client.find_tasks_by_title("alpha")], ["a"])
+        self.assertEqual(
+            [task.id for task in client.find_forgetting_curve_tasks_by_start_day("2026-08-17")],
+            ["b"],
+        )
+
+        client.get_data()
+        self.assertEqual(client.find_tasks_by_title("alpha"), [])
+        self.assertEqual([task.id for task in client.find_tasks_by_project("project-2")], ["a"])
+        self.assertEqual(client.find_forgetting_curve_tasks_by_start_day("2026-08-17"), [])
+        self.assertEqual(
+            [task.id for task in client.find_forgetting_curve_tasks_by_start_day("2026-08-18")],
+            ["b"],
+        )
+        self.assertEqual(client.find_task_by_id("b").project_name, "背单词")
+
+    def test_lookups_share_task_objects_within_one_sync(self):
+        session = Mock()
+        session.get.side_effect = [
+            make_sync_response(100, [make_task("a", "alpha")], projects=[]),
+            make_sync_response(200),
+        ]
+        client = make_dida_client(session)
+
+        client.get_data()
+        task = client.find_task_by_id("a")
+        self.assertIs(client.find_tasks_by_title("alpha")[0], task)
+        self.assertIs(client.active_tasks[0], task)
+
+        client.get_data()
+        self.assertIsNot(client.find_task_by_id("a"), task)
+        self.assertIsNone(client.find_task_by_id("missing"))
+
+
+class Dida365SnapshotCacheTest(unittest.TestCase):
+    def make_client(self):
+        session = Mock()
+        session.get.side_effect = lambda *args, **kwargs: make_sync_response(100, projects=[])
+        session.request.return_value = Mock(content=b"")
+        return make_dida_client(session), session
+
+    def test_reads_within_max_age_share_one_snapshot(self):
+        client, session = self.make_client()
+
+        client.get_latest_data()
+        client.get_latest_data()
+        client.get_latest_data()
+
+        self.assertEqual(session.get.call_count, 1)
+        self.assertEqual((client.snapshot_cache_hits, client.snapshot_cache_misses), (2, 1))
+
+    def test_writes_invalidate_the_snapshot(self):
+        client, session = self.make_client()
+
+        client.get_latest_data()
+        client.post_task({"update": []})
+        client.get_latest_data()
+        client.adjust_task_parent([])
+        client.get_latest_data()
+
+        self.assertEqual(session.get.call_count, 3)
+        self.assertEqual(client.snapshot_cache_hits, 0)
+
+    def test_sync_overlapping_a_write_is_not_marked_fresh(self):
+        client, session = self.make_client()
+        sync_started = threading.Event()
+        write_finished = threading.Event()
+
+        def slow_sync(*args, **kwargs):
+            sync_started.set()
+            write_finished.wait(timeout=5)
+            return make_sync_response(100, projects=[])
+
+        session.get.side_effect = slow_sync
+        reader = threading.Thread(target=client.get_latest_data)
+        reader.start()
+        self.assertTrue(sync_started.wait(timeout=5))
+        client.post_task({"add": []})
+        write_finished.set()
+        reader.join(timeout=5)
+
+        session.get.side_effect = lambda *args, **kwargs: make_sync_response(200)
+        client.get_latest_data()
+
+        self.assertEqual(session.get.call_count, 2)
+        self.assertEqual(client.snapshot_cache_hits, 0)
+
+    def test_lookups_do_not_wait_for_the_sync_request(self):
+        client, session = self.make_client()
+        client.get_latest_data()
+        sync_started = threading.Event()
+        release_sync = threading.Event()
+        self.addCleanup(release_sync.set)
+
+        def slow_sync(*args, **kwargs):
+            sync_started.set()
+            release_sync.wait(timeout=5)
+            return make_sync_response(200)
+
+        session.get.side_effect = slow_sync
+        syncer = threading.Thread(target=client.get_latest_data, kwargs={"max_age": 0})
+        syncer.start()
+        self.assertTrue(sync_started.wait(timeout=5))
+        lookup = threading.Thread(target=client.find_task_by_id, args=("a",))
+        lookup.start()
+        lookup.join(timeout=1)
+
+        self.assertFalse(lookup.is_alive())
+        release_sync.set()
+        syncer.join(timeout=5)
+
+    def test_zero_max_age_forces_a_fresh_sync(self):
+        client, session = self.make_client()
+
+        client.get_latest_data()
+        client.get_latest_data(max_age=0)
+
+        self.assertEqual(session.get.call_count, 2)
+        self.assertIn("未命中=2", client.describe_snapshot_cache())
+
+
+if __name__ == "__main__":
+    unittest.main()
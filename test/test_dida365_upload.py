@@ -0,0 +1,246 @@
+import io
+import tempfile
+import threading
+import unittest
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import requests
+
+from agent.dida365 import Dida365Agent
+from dida365_project.api.dida365 import Dida365
+from dida365_project.models.task import Task
+from dida365_project.models.upload_attachment import uploadAttachment
+from dida365_project.utils.multipart_util import StreamingMultipartFile
+from test_network_resilience import make_dida_client
+from utils.attachment_index_db import AttachmentIndexStore
+
+
+class RecordingHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    received = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["content-length"]))
+        self.received.append((self.headers["content-type"], body))
+        self.send_response(200)
+        self.send_header("content-length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StreamingMultipartFileTest(unittest.TestCase):
+    def test_chunked_reads_match_a_single_read(self):
+        source = io.BytesIO(b"0123456789" * 1000)
+        body = StreamingMultipartFile("file", 'a "quoted".mp4', source)
+
+        whole = body.read()
+        body.seek(0)
+        pieces = []
+        while chunk := body.read(7):
+            pieces.append(chunk)
+
+        self.assertEqual(b"".join(pieces), whole)
+        self.assertEqual(len(whole), len(body))
+        self.assertIn(b'filename="a %22quoted%22.mp4"', whole)
+
+    def test_server_receives_a_standard_multipart_upload(self):
+        RecordingHandler.received = []
+        server = ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        content = bytes(range(256)) * 4096
+        body = StreamingMultipartFile("file", "video.mp4", io.BytesIO(content))
+
+        requests.post(
+            f"http://127.0.0.1:{server.server_address[1]}/upload",
+            data=body,
+            headers={"content-type": body.content_type},
+            timeout=10,
+        ).raise_for_status()
+
+        content_type, raw_body = RecordingHandler.received[0]
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode("ascii") + raw_body
+        )
+        part = next(message.iter_parts())
+        self.assertEqual(part.get_filename(), "video.mp4")
+        self.assertEqual(part.get_param("name", header="content-disposition"), "file")
+        self.assertEqual(part.get_content(), content)
+
+
+class ConcurrentAttachmentUploadTest(unittest.TestCase):
+    def make_attachments(self, count):
+        task = SimpleNamespace(id="task-id", project_id="project-id")
+        return [
+            uploadAttachment(task, file_bytes_obj=(f"file-{index}.mp3", io.BytesIO(b"audio")))
+            for index in range(count)
+        ]
+
+    def test_attachments_of_one_task_upload_in_parallel(self):
+        attachments = self.make_attachments(Dida365.UPLOAD_MAX_WORKERS)
+        barrier = threading.Barrier(len(attachments), timeout=5)
+        session = Mock()
+
+        def request(method, url, **kwargs):
+            barrier.wait()
+            return Mock()
+
+        session.request.side_effect = request
+        client = make_dida_client(session)
+
+        client.upload_attachment(*attachments)
+
+        self.assertEqual(session.request.call_count, len(attachments))
+        self.assertEqual(
+            len({call.args[1] for call in session.request.call_args_list}),
+            len(attachments),
+        )
+
+    def test_failed_upload_is_raised_after_the_others_finish(self):
+        attachments = self.make_attachments(4)
+        session = Mock()
+        failed_response = Mock()
+        failed_response.raise_for_status.side_effect = requests.HTTPError("quota")
+
+        def request(method, url, **kwargs):
+            body = kwargs["data"].read()
+            return failed_response if b"file-1.mp3" in body else Mock()
+
+        session.request.side_effect = request
+        client = make_dida_client(session)
+
+        with self.assertRaises(requests.HTTPError):
+            client.upload_attachment(*attachments)
+
+        self.assertEqual(session.request.call_count, 4)
+
+
+class UploadAttachmentIdentityTest(unittest.TestCase):
+    def test_identity_follows_the_file_name_not_the_stream_object(self):
+        task = SimpleNamespace(id="task-id", project_id="project-id")
+        source = io.BytesIO(b"audio")
+        source.seek(3)
+        first = uploadAttachment(task, file_bytes_obj=("US.mp3", source))
+        same = uploadAttachment(task, file_bytes_obj=("us.mp3", io.BytesIO(b"audio")))
+        other = uploadAttachment(task, file_bytes_obj=("uk.mp3", io.BytesIO(b"audio")))
+
+        self.assertEqual(first, same)
+        self.assertEqual(len({first, same, other}), 2)
+        self.assertEqual(first.size, 5)
+        self.assertEqual(first.sha256, same.sha256)
+        self.assertEqual(source.tell(), 3)
+
+    def test_set_insertion_and_size_do_not_read_the_content(self):
+        task = SimpleNamespace(id="task-id", project_id="project-id")
+        attachment = uploadAttachment(task, file_bytes_obj=("us.mp3", io.BytesIO(b"audio")))
+
+        with patch.object(uploadAttachment, "_compute_digest") as compute_digest:
+            {attachment}
+            self.assertEqual(attachment.size, 5)
+
+        compute_digest.assert_not_called()
+
+
+def make_task_with_attachments(*attachments):
+    return Task(
+        {
+            "id": "task-1",
+            "projectId": "project-1",
+            "title": "hello",
+            "content": "body",
+            "status": Task.STATUS_ACTIVE,
+            "attachments": list(attachments),
+        }
+    )
+
+
+class AttachmentDedupTest(unittest.TestCase):
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.index = AttachmentIndexStore(Path(temporary_directory.name) / "runtime_state.sqlite3")
+
+    def run_upload(self, task, verified_task, files):
+        dida = Mock()
+        agent = Dida365Agent(dida, attachment_index=self.index)
+        agent._get_task_attachments_bytes = Mock(return_value=files)
+        agent.rearrange_content_put_dictvoice_ahead = Mock(return_value=verified_task)
+        agent._gen_dictvoice_and_upload_to_task_and_rearrange_content(task)
+        return dida, agent
+
+    def test_retry_skips_bytes_already_uploaded_under_another_name(self):
+        uploaded = {"id": "att-1", "fileName": "video.mp4", "path": "p/video.mp4"}
+        dida, _ = self.run_upload(
+            make_task_with_attachments(),
+            make_task_with_attachments(uploaded),
+            [("video.mp4", io.BytesIO(b"video"))],
+        )
+        dida.upload_attachment.assert_called_once()
+
+        dida, agent = self.run_upload(
+            make_task_with_attachments(uploaded),
+            make_task_with_attachments(uploaded),
+            [("video.mp4?v=2", io.BytesIO(b"video"))],
+        )
+
+        dida.upload_attachment.assert_not_called()
+        self.assertEqual(
+            agent.rearrange_content_put_dictvoice_ahead.call_args.kwargs["expected_attachment_names"],
+            ["video.mp4"],
+        )
+        self.assertEqual(self.index.get_saved_totals(), (1, 5))
+        self.assertIn("附件去重跳过=1", agent.describe_upload_dedup_stats())
+
+    def test_deleted_attachment_is_uploaded_again(self):
+        uploaded = {"id": "att-1", "fileName": "us.mp3"}
+        self.run_upload(
+            make_task_with_attachments(),
+            make_task_with_attachments(uploaded),
+            [("us.mp3", io.BytesIO(b"audio"))],
+        )
+
+        dida, _ = self.run_upload(
+            make_task_with_attachments({"id": "att-1", "fileName": "us.mp3", "status": 1}),
+            make_task_with_attachments(uploaded),
+            [("us.mp3", io.BytesIO(b"audio"))],
+        )
+
+        dida.upload_attachment.assert_called_once()
+        self.assertEqual(self.index.get_saved_totals(), (0, 0))
+
+    def test_content_is_hashed_only_for_candidates_matching_an_indexed_size(self):
+        uploaded = {"id": "att-1", "fileName": "us.mp3"}
+        self.run_upload(
+            make_task_with_attachments(),
+            make_task_with_attachments(uploaded),
+            [("us.mp3", io.BytesIO(b"audio"))],
+        )
+
+        with patch.object(
+            uploadAttachment, "_compute_digest", autospec=True, return_value="digest"
+        ) as compute_digest:
+            self.run_upload(
+                make_task_with_attachments(uploaded),
+                make_task_with_attachments(uploaded),
+                [
+                    ("us.mp3", io.BytesIO(b"audio")),
+                    ("video.mp4", io.BytesIO(b"a longer video")),
+                    ("uk.mp3", io.BytesIO(b"AUDIO")),
+                ],
+            )
+
+        hashed_names = [call.args[0].file_name for call in compute_digest.call_args_list]
+        # us.mp3 已按名称跳过，video.mp4 大小不匹配；只有 uk.mp3 需要计算哈希。
+        self.assertEqual(hashed_names, ["uk.mp3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+from agent.dida365 import Dida365Agent
+from dida365_project.api.write_batch import (
+    DidaBatchWriteError,
+    DidaWriteBatch,
+    DidaWriteVerificationError,
+    post_task_verified,
+)
+
+
+def make_task_dict(task_id, title="word"):
+    return {"id": task_id, "title": title}
+
+
+class RecordingDida:
+    def __init__(self, rejected=None):
+        # rejected: {task_id: 连续拒绝次数}
+        self.rejected = dict(rejected or {})
+        self.payloads = []
+
+    def post_task(self, payload):
+        self.payloads.append(payload)
+        id2error = {}
+        id2etag = {}
+        for task_dict in payload["add"] + payload["update"]:
+            task_id = task_dict["id"]
+            if self.rejected.get(task_id):
+                self.rejected[task_id] -= 1
+                id2error[task_id] = "TASK_NOT_FOUND"
+            else:
+                id2etag[task_id] = f"etag-{task_id}"
+        return {"id2etag": id2etag, "id2error": id2error}
+
+
+class DidaWriteBatchTest(unittest.TestCase):
+    def test_updates_are_posted_in_chunks(self):
+        dida = RecordingDida()
+
+        with DidaWriteBatch(dida, chunk_size=2) as batch:
+            for index in range(5):
+                batch.update(make_task_dict(f"t{index}"))
+
+        self.assertEqual([len(payload["update"]) for payload in dida.payloads], [2, 2, 1])
+        self.assertEqual(len(batch.id2etag), 5)
+
+    def test_repeated_writes_keep_the_latest_dict_and_the_add_action(self):
+        dida = RecordingDida()
+        batch = DidaWriteBatch(dida)
+
+        batch.add(make_task_dict("t1", "old"))
+        batch.update(make_task_dict("t1", "new"))
+        batch.flush()
+
+        self.assertEqual(dida.payloads[0]["add"], [make_task_dict("t1", "new")])
+        self.assertEqual(dida.payloads[0]["update"], [])
+
+    def test_rejected_task_is_retried_on_its_own(self):
+        dida = RecordingDida(rejected={"t1": 1})
+
+        with DidaWriteBatch(dida) as batch:
+            for index in range(3):
+                batch.update(make_task_dict(f"t{index}"))
+
+        self.assertEqual(len(dida.payloads), 2)
+        self.assertEqual(dida.payloads[1]["update"], [make_task_dict("t1")])
+        self.assertEqual(batch.id2etag["t1"], "etag-t1")
+
+    def test_persistent_failures_are_raised_after_the_flush(self):
+        dida = RecordingDida(rejected={"t1": 2})
+        batch = DidaWriteBatch(dida)
+        batch.update(make_task_dict("t0"))
+        batch.update(make_task_dict("t1"))
+
+        with self.assertRaises(DidaBatchWriteError) as raised:
+            batch.flush()
+
+        self.assertEqual(raised.exception.id2error, {"t1": "TASK_NOT_FOUND"})
+        self.assertIn("t0", batch.id2etag)
+        self.assertEqual(len(batch), 0)
+
+    def test_queued_writes_are_flushed_when_the_block_raises(self):
+        dida = RecordingDida()
+
+        with self.assertRaises(LookupError):
+            with DidaWriteBatch(dida) as batch:
+                batch.update(make_task_dict("t0"))
+                raise LookupError("missing link target")
+
+        self.assertEqual(dida.payloads[0]["update"], [make_task_dict("t0")])
+        self.assertEqual(len(batch), 0)
+
+
+class PostTaskVerifiedTest(unittest.TestCase):
+    def test_new_etag_confirms_the_write_without_reading_back(self):
+        dida = RecordingDida()
+        dida.get_task = Mock()
+
+        confirmed = post_task_verified(dida, {"id": "t1", "title": "word", "etag": "old"})
+
+        self.assertEqual(confirmed, {"id": "t1", "title": "word", "etag": "etag-t1"})
+        self.assertEqual(dida.payloads[0]["update"][0]["etag"], "old")
+        dida.get_task.assert_not_called()
+
+    def test_unchanged_etag_falls_back_to_a_read_back(self):
+        dida = RecordingDida()
+        dida.get_task = Mock(return_value={"id": "t1", "title": "word", "content": "a\r\nb"})
+
+        confirmed = post_task_verified(
+            dida, {"id": "t1", "title": "word", "content": "a\nb", "etag": "etag-t1"}
+        )
+
+        self.assertEqual(confirmed["content"], "a\r\nb")
+        dida.get_task.assert_called_once_with("t1")
+
+    def test_writes_without_a_prior_etag_are_always_read_back(self):
+        for add in (True, False):
+            with self.subTest(add=add):
+                dida = RecordingDida()
+                dida.get_task = Mock(return_value={"id": "t1", "title": "other", "etag": "etag-t1"})
+
+                # 响应里有 etag 也不能证明写入的是这份内容，必须回读比对。
+                with self.assertRaises(DidaWriteVerificationError):
+                    post_task_verified(dida, {"id": "t1", "title": "word"}, add=add)
+                dida.get_task.assert_called_once_with("t1")
+
+    def test_read_back_mismatch_and_rejection_are_raised(self):
+        dida = Mock()
+        dida.post_task.return_value = None
+        dida.get_task.return_value = {"id": "t1", "title": "other"}
+        with self.assertRaises(DidaWriteVerificationError):
+            post_task_verified(dida, {"id": "t1", "title": "word"}, add=True)
+
+        with self.assertRaises(DidaBatchWriteError) as raised:
+            post_task_verified(RecordingDida(rejected={"t1": 1}), {"id": "t1", "title": "word"})
+        self.assertEqual(raised.exception.id2error, {"t1": "TASK_NOT_FOUND"})
+
+
+class RenewOverdueTaskTest(unittest.TestCase):
+    def test_overdue_tasks_are_renewed_in_one_request(self):
+        tasks = [
+            SimpleNamespace(
+                title=f"word{index}",
+                start_date="2026-08-01",
+                task_dict=make_task_dict(f"t{index}"),
+                change_start_date_to_today=Mock(),
+            )
+            for index in range(3)
+        ]
+        dida = RecordingDida()
+        agent = Dida365Agent(dida)
+        agent._get_target_words_task = Mock(side_effect=[tasks[:2], tasks[2:], []])
+
+        with patch("builtins.print"):
+            agent.renew_overdue_task()
+
+        self.assertEqual(len(dida.payloads), 1)
+        self.assertEqual([task["id"] for task in dida.payloads[0]["update"]], ["t0", "t1", "t2"])
+        for task in tasks:
+            task.change_start_date_to_today.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
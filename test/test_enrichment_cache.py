@@ -0,0 +1,228 @@
+import io
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from agent.dida365 import Dida365Agent
+from main import Bearer
+from utils.enrichment_cache import (
+    SOURCE_ALL_PHONETIC,
+    SOURCE_DICTVOICE,
+    SOURCE_DOUBAO_EXPLANATION,
+    SOURCE_EXPLANATION_VIDEO,
+    EnrichmentCache,
+)
+from utils.media_spool import MediaSpool
+from utils.phonetic_util import BaiduWordPageResult
+
+
+class EnrichmentCacheTest(unittest.TestCase):
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.root = Path(temporary_directory.name)
+
+    def make_cache(self, **kwargs):
+        return EnrichmentCache(
+            db_path=self.root / "runtime_state.sqlite3",
+            media_dir=self.root / "media",
+            **kwargs,
+        )
+
+    def test_text_factory_runs_once_and_skips_uncacheable_results(self):
+        cache = self.make_cache()
+        factory = Mock(return_value="讲解")
+
+        self.assertEqual(cache.get_or_create_text("hello", SOURCE_DOUBAO_EXPLANATION, factory), "讲解")
+        self.assertEqual(cache.get_or_create_text("hello", SOURCE_DOUBAO_EXPLANATION, factory), "讲解")
+        factory.assert_called_once()
+
+        failed = Mock(return_value="")
+        cache.get_or_create_text("world", SOURCE_DOUBAO_EXPLANATION, failed)
+        cache.get_or_create_text("world", SOURCE_DOUBAO_EXPLANATION, failed)
+        self.assertEqual(failed.call_count, 2)
+
+    def test_media_round_trip_shares_identical_blobs(self):
+        cache = self.make_cache()
+        source = io.BytesIO(b"audio")
+        source.seek(2)
+
+        cache.put_media("hello", SOURCE_DICTVOICE, [("us.mp3", source)])
+        cache.put_media("hullo", SOURCE_DICTVOICE, [("us.mp3", io.BytesIO(b"audio"))])
+        files = cache.get_media("hello", SOURCE_DICTVOICE)
+
+        self.assertEqual(source.tell(), 2)
+        self.assertEqual([(name, data.read()) for name, data in files], [("us.mp3", b"audio")])
+        self.assertEqual(len(list((self.root / "media").glob("*/*"))), 1)
+
+    def test_expired_entries_are_misses(self):
+        cache = self.make_cache(ttl_seconds=60)
+        cache.put_text("hello", SOURCE_DOUBAO_EXPLANATION, "讲解")
+
+        with patch("utils.enrichment_cache.time.time", return_value=time.time() + 120):
+            self.assertIsNone(cache.get_text("hello", SOURCE_DOUBAO_EXPLANATION))
+        self.assertIsNone(cache.get_text("hello", SOURCE_DOUBAO_EXPLANATION))
+
+    def test_size_limit_evicts_least_recently_used_and_deletes_blobs(self):
+        cache = self.make_cache(max_bytes=10)
+        now = time.time()
+        with patch("utils.enrichment_cache.time.time", return_value=now):
+            cache.put_media("old", SOURCE_EXPLANATION_VIDEO, [("a.mp4", io.BytesIO(b"123456"))])
+        with patch("utils.enrichment_cache.time.time", return_value=now + 1):
+            cache.put_media("mid", SOURCE_EXPLANATION_VIDEO, [("b.mp4", io.BytesIO(b"abcd"))])
+        with patch("utils.enrichment_cache.time.time", return_value=now + 2):
+            cache.get_media("old", SOURCE_EXPLANATION_VIDEO)
+        # 宽限期过后才会删除失去引用的媒体文件。
+        with patch("utils.enrichment_cache.time.time", return_value=now + 3600):
+            cache.put_media("new", SOURCE_EXPLANATION_VIDEO, [("c.mp4", io.BytesIO(b"xyz"))])
+
+        self.assertIsNone(cache.get_media("mid", SOURCE_EXPLANATION_VIDEO))
+        self.assertIsNotNone(cache.get_media("old", SOURCE_EXPLANATION_VIDEO))
+        self.assertIsNotNone(cache.get_media("new", SOURCE_EXPLANATION_VIDEO))
+        self.assertEqual(len(list((self.root / "media").glob("*/*"))), 2)
+
+    def test_missing_blob_is_treated_as_a_miss(self):
+        cache = self.make_cache()
+        cache.put_media("hello", SOURCE_DICTVOICE, [("us.mp3", io.BytesIO(b"audio"))])
+        for blob_path in (self.root / "media").glob("*/*"):
+            blob_path.unlink()
+
+        self.assertIsNone(cache.get_media("hello", SOURCE_DICTVOICE))
+
+
+    def test_phonetics_are_cached_only_when_every_source_completed(self):
+        bearer = Bearer.__new__(Bearer)
+        bearer.enrichment_cache = self.make_cache()
+        baidu_page = BaiduWordPageResult(phonetic="ˈhel", video_urls=())
+
+        with patch(
+            "main.fetch_all_phonetic",
+            side_effect=[("百度词典: /ˈhel/", False), ("百度词典: /ˈhel/", True)],
+        ) as fetch:
+            bearer.get_all_phonetic("hello", baidu_page=baidu_page)
+            self.assertIsNone(bearer.enrichment_cache.get_text("hello", SOURCE_ALL_PHONETIC))
+            bearer.get_all_phonetic("hello", baidu_page=baidu_page)
+            bearer.get_all_phonetic("hello", baidu_page=baidu_page)
+
+        self.assertEqual(fetch.call_count, 2)
+        self.assertEqual(
+            bearer.enrichment_cache.get_text("hello", SOURCE_ALL_PHONETIC), "百度词典: /ˈhel/"
+        )
+
+    def test_phonetics_are_not_cached_when_the_baidu_page_failed(self):
+        bearer = Bearer.__new__(Bearer)
+        bearer.enrichment_cache = self.make_cache()
+
+        with patch("main.fetch_all_phonetic", return_value=("必应词典: /ˈhel/", True)):
+            bearer.get_all_phonetic("hello", baidu_page=None)
+
+        self.assertIsNone(bearer.enrichment_cache.get_text("hello", SOURCE_ALL_PHONETIC))
+
+
+def read_attachment(file):
+    return file.read_bytes() if isinstance(file, Path) else file.read()
+
+
+class DidaAttachmentCacheTest(unittest.TestCase):
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        root = Path(temporary_directory.name)
+        self.cache = EnrichmentCache(
+            db_path=root / "runtime_state.sqlite3",
+            media_dir=root / "media",
+        )
+        self.spool = MediaSpool()
+        self.addCleanup(self.spool.cleanup)
+
+    def test_retry_reuses_cached_voice_and_complete_video_set(self):
+        agent = Dida365Agent(Mock(), enrichment_cache=self.cache)
+        response = Mock()
+        response.iter_content.return_value = [b"vid", b"eo"]
+
+        with (
+            patch(
+                "agent.dida365.get_dictvoice_bytes",
+                return_value=[("us.mp3", io.BytesIO(b"audio"))],
+            ) as get_voice,
+            patch(
+                "agent.dida365.query_word_explanation_video",
+                return_value=["https://example.test/video.mp4"],
+            ) as query_video,
+            patch("agent.dida365.requests.get", return_value=response) as request_get,
+        ):
+            first = agent._get_task_attachments_bytes("hello", media_spool=self.spool)
+            second = agent._get_task_attachments_bytes("hello", media_spool=self.spool)
+
+        self.assertEqual([name for name, _ in first], ["us.mp3", "video.mp4"])
+        self.assertEqual(
+            [(name, read_attachment(data)) for name, data in second],
+            [("us.mp3", b"audio"), ("video.mp4", b"video")],
+        )
+        self.assertEqual(second[1][1].parent, self.spool.path)
+        get_voice.assert_called_once()
+        query_video.assert_called_once()
+        request_get.assert_called_once()
+
+    def test_partial_video_download_is_not_cached(self):
+        agent = Dida365Agent(Mock(), enrichment_cache=self.cache)
+        response = Mock()
+        response.iter_content.return_value = [b"vid", b"eo"]
+
+        with (
+            patch("agent.dida365.get_dictvoice_bytes", return_value=[]),
+            patch("agent.dida365.sleep"),
+            patch(
+                "agent.dida365.requests.get",
+                side_effect=[response, *[RuntimeError("broken")] * 3],
+            ),
+        ):
+            files = agent._get_task_attachments_bytes(
+                "hello",
+                video_urls=("https://example.test/a.mp4", "https://example.test/b.mp4"),
+                media_spool=self.spool,
+            )
+
+        self.assertEqual([name for name, _ in files], ["a.mp4"])
+        self.assertIsNone(self.cache.get_media("hello", SOURCE_EXPLANATION_VIDEO))
+
+    def test_oversized_video_is_skipped_without_retry(self):
+        agent = Dida365Agent(Mock(), enrichment_cache=self.cache)
+        spool = MediaSpool(max_bytes=4)
+        self.addCleanup(spool.cleanup)
+        response = Mock()
+        response.iter_content.return_value = [b"vid", b"eo"]
+
+        with (
+            patch("agent.dida365.get_dictvoice_bytes", return_value=[]),
+            patch("agent.dida365.requests.get", return_value=response) as request_get,
+        ):
+            files = agent._get_task_attachments_bytes(
+                "hello",
+                video_urls=("https://example.test/a.mp4",),
+                media_spool=spool,
+            )
+
+        self.assertEqual(files, [])
+        request_get.assert_called_once()
+        response.close.assert_called_once()
+        self.assertEqual(list(spool.path.iterdir()), [])
+
+
+class MediaSpoolTest(unittest.TestCase):
+    def test_directory_is_removed_on_exit(self):
+        with MediaSpool() as spool:
+            path = spool.write_chunks("a.mp4", [b"12", b"34"])
+            self.assertEqual(path.read_bytes(), b"1234")
+
+        self.assertFalse(spool.path.exists())
+
+    def test_file_names_cannot_escape_the_spool(self):
+        with MediaSpool() as spool, self.assertRaises(ValueError):
+            spool.write_chunks("../a.mp4", [b"1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
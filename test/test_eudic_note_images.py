@@ -1,6 +1,7 @@
 import io
 import json
 import re
+import threading
 import unittest
 from types import SimpleNamespace
 from unittest.mock import Mock, patch
@@ -10,6 +11,8 @@ import requests
 from agent.dida365 import Dida365Agent
 from agent.eudic import (
     EUDIC_IMAGE_DOWNLOAD_TIMEOUT,
+    EUDIC_IMAGE_MAX_BYTES,
+    EUDIC_IMAGE_SPOOL_MAX_BYTES,
     Eudic,
     EudicNoteImage,
     EudicNoteImageDownloadError,
@@ -18,7 +21,7 @@ from agent.eudic import (
 from constants.eudic import EUDIC_NOTE_IMAGES_PLACEHOLDER
 from dida365_project.models.attachment import Attachment
 from dida365_project.models.upload_attachment import uploadAttachment
-from main import Bearer, compose_word_task_content
+from main import WORD_PIPELINE_PREPARE_WORKERS, Bearer, compose_word_task_content
 
 
 def build_raw_note(text="Image context", images=None):
@@ -139,7 +142,7 @@ class EudicNoteImageParsingTest(unittest.TestCase):
             "data": {"note": build_raw_note(images=[{"id": "image-1", "type": "image"}])}
         }
 
-        with patch("agent.eudic.requests.get", return_value=response):
+        with patch("agent.eudic.requests.Session.get", return_value=response):
             with self.assertRaisesRegex(RuntimeError, "图片元数据异常"):
                 Eudic("NIS test").get_note_data("hello")
 
@@ -149,7 +152,7 @@ class EudicNoteImageDownloadTest(unittest.TestCase):
         response = Mock()
         response.raise_for_status.return_value = None
         response.headers = {"content-type": "image/jpeg; charset=binary"}
-        response.content = b"\xff\xd8\xffimage"
+        response.iter_content.return_value = [b"\xff\xd8\xff", b"image"]
         image = EudicNoteImage(
             image_id="ABC-123",
             url="https://fs-gateway.frdic.com/image.jpg",
@@ -157,18 +160,87 @@ class EudicNoteImageDownloadTest(unittest.TestCase):
         )
         eudic = Eudic("NIS test")
 
-        with patch("agent.eudic.requests.get", return_value=response) as request_get:
+        with patch("agent.eudic.requests.Session.get", return_value=response) as request_get:
             downloaded = eudic.download_note_images((image,))
 
         self.assertEqual(downloaded[0][0], "eudic-note-01-abc-123.jpg")
-        self.assertEqual(downloaded[0][1].getvalue(), response.content)
+        self.assertEqual(downloaded[0][1].read(), b"\xff\xd8\xffimage")
         self.assertEqual(request_get.call_args.kwargs["headers"], eudic.headers)
         self.assertEqual(request_get.call_args.kwargs["timeout"], EUDIC_IMAGE_DOWNLOAD_TIMEOUT)
+        self.assertTrue(request_get.call_args.kwargs["stream"])
+        response.close.assert_called_once()
+
+    def test_download_rejects_a_declared_oversize_image_before_reading(self):
+        image = EudicNoteImage("image-1", "https://fs-gateway.frdic.com/image.jpg")
+        response = Mock()
+        response.raise_for_status.return_value = None
+        response.headers = {
+            "content-type": "image/png",
+            "content-length": str(EUDIC_IMAGE_MAX_BYTES + 1),
+        }
+
+        with patch("agent.eudic.requests.Session.get", return_value=response):
+            with self.assertRaisesRegex(EudicNoteImageDownloadError, "MB 限制"):
+                Eudic("NIS test").download_note_images((image,))
+
+        response.iter_content.assert_not_called()
+        response.close.assert_called_once()
+
+    def test_download_stops_streaming_once_the_cap_is_crossed(self):
+        image = EudicNoteImage("image-1", "https://fs-gateway.frdic.com/image.jpg")
+        chunk = b"x" * (EUDIC_IMAGE_MAX_BYTES // 2)
+        consumed = []
+
+        def chunks(chunk_size):
+            for _ in range(10):
+                consumed.append(chunk)
+                yield chunk
+
+        response = Mock()
+        response.raise_for_status.return_value = None
+        response.headers = {"content-type": "image/png"}
+        response.iter_content.side_effect = chunks
+
+        with patch("agent.eudic.requests.Session.get", return_value=response):
+            with self.assertRaisesRegex(EudicNoteImageDownloadError, "MB 限制"):
+                Eudic("NIS test").download_note_images((image,))
+
+        self.assertEqual(len(consumed), 3)
+
+    def test_large_images_spill_to_disk_and_keep_their_order(self):
+        images = (
+            EudicNoteImage("large", "https://fs-gateway.frdic.com/large.png"),
+            EudicNoteImage("small", "https://fs-gateway.frdic.com/small.png"),
+        )
+        payloads = {
+            images[0].url: b"L" * (EUDIC_IMAGE_SPOOL_MAX_BYTES + 1),
+            images[1].url: b"small",
+        }
+
+        def get(url, **kwargs):
+            response = Mock()
+            response.raise_for_status.return_value = None
+            response.headers = {"content-type": "image/png"}
+            response.iter_content.return_value = [payloads[url]]
+            return response
+
+        with patch("agent.eudic.requests.Session.get", side_effect=get):
+            downloaded = Eudic("NIS test").download_note_images(images)
+
+        self.assertEqual(
+            [name for name, _ in downloaded],
+            ["eudic-note-01-large.png", "eudic-note-02-small.png"],
+        )
+        self.assertTrue(downloaded[0][1]._rolled)
+        self.assertFalse(downloaded[1][1]._rolled)
+        self.assertEqual(downloaded[0][1].read(), payloads[images[0].url])
+        for _, file in downloaded:
+            file.close()
 
     def test_download_rejects_a_non_eudic_url_before_request(self):
         image = EudicNoteImage("image-1", "https://attacker.example/image.jpg")
 
-        with patch("agent.eudic.requests.get") as request_get:
+        with patch("agent.eudic.requests.Session.get") as request_get:
             with self.assertRaisesRegex(EudicNoteImageDownloadError, "非欧路"):
                 Eudic("NIS test").download_note_images((image,))
 
@@ -181,14 +253,14 @@ class EudicNoteImageDownloadTest(unittest.TestCase):
         response.headers = {"content-type": "text/html"}
         response.content = b"error"
 
-        with patch("agent.eudic.requests.get", return_value=response):
+        with patch("agent.eudic.requests.Session.get", return_value=response):
             with self.assertRaisesRegex(EudicNoteImageDownloadError, "非图片"):
                 Eudic("NIS test").download_note_images((image,))
 
     def test_download_wraps_network_failures(self):
         image = EudicNoteImage("image-1", "https://fs-gateway.frdic.com/image.jpg")
 
-        with patch("agent.eudic.requests.get", side_effect=requests.Timeout("timeout")):
+        with patch("agent.eudic.requests.Session.get", side_effect=requests.Timeout("timeout")):
             with self.assertRaisesRegex(EudicNoteImageDownloadError, "下载欧路笔记图片"):
                 Eudic("NIS test").download_note_images((image,))
 
@@ -197,7 +269,7 @@ class DidaNoteImagePlacementTest(unittest.TestCase):
     def test_add_task_resumes_a_partial_note_image_task(self):
         task = FakeTask("hello", f"context\n{EUDIC_NOTE_IMAGES_PLACEHOLDER}")
         dida = Mock()
-        dida.active_tasks = [task]
+        dida.find_tasks_by_title.return_value = [task]
         agent = Dida365Agent(dida)
         agent.find_task = Mock(return_value=task)
         agent._gen_dictvoice_and_upload_to_task_and_rearrange_content = Mock()
@@ -210,6 +282,7 @@ class DidaNoteImagePlacementTest(unittest.TestCase):
         agent._gen_dictvoice_and_upload_to_task_and_rearrange_content.assert_called_once_with(
             task,
             note_image_files=image_files,
+            video_urls=None,
         )
 
     def test_add_task_accepts_a_fully_verified_previous_attempt(self):
@@ -219,7 +292,7 @@ class DidaNoteImagePlacementTest(unittest.TestCase):
         )
         task = FakeTask("hello", image.content_file_string, attachments=[image])
         dida = Mock()
-        dida.active_tasks = [task]
+        dida.find_tasks_by_title.return_value = [task]
         agent = Dida365Agent(dida)
         agent._gen_dictvoice_and_upload_to_task_and_rearrange_content = Mock()
 
@@ -330,6 +403,7 @@ class NoteImageSyncFlowTest(unittest.TestCase):
         dida = Mock()
         bearer = Bearer.__new__(Bearer)
         bearer.agent = SimpleNamespace(eudic=eudic, dida=dida)
+        bearer.enrichment_cache = None
         bearer.acquire_words = Mock(return_value=[word])
         bearer.get_doubao_explanation_by_doubao = Mock()
 
@@ -348,11 +422,13 @@ class NoteImageSyncFlowTest(unittest.TestCase):
         dida.add_task.side_effect = RuntimeError("upload failed")
         bearer = Bearer.__new__(Bearer)
         bearer.agent = SimpleNamespace(eudic=eudic, dida=dida)
+        bearer.enrichment_cache = None
         bearer.acquire_words = Mock(return_value=[word])
         bearer.get_doubao_explanation_by_doubao = Mock(return_value="explanation")
 
         with (
-            patch("main.get_all_phonetic", return_value="phonetic"),
+            patch("main.fetch_baidu_word_page", return_value=None),
+            patch("main.fetch_all_phonetic", return_value=("phonetic", True)),
             patch("main.YamlConfigManager") as config_manager,
             patch("main.add_word_to_his_set") as add_to_history,
             patch("main.traceback.print_exc"),
@@ -362,6 +438,78 @@ class NoteImageSyncFlowTest(unittest.TestCase):
 
         add_to_history.assert_not_called()
 
+    def test_enrichment_failure_only_skips_that_word(self):
+        words = [
+            SimpleNamespace(word="broken", note=None, note_images=()),
+            SimpleNamespace(word="hello", note=None, note_images=()),
+        ]
+        eudic = Mock()
+        eudic.download_note_images.return_value = []
+        dida = Mock()
+        bearer = Bearer.__new__(Bearer)
+        bearer.agent = SimpleNamespace(eudic=eudic, dida=dida)
+        bearer.enrichment_cache = None
+        bearer.acquire_words = Mock(return_value=words)
+
+        def explain(word):
+            if word == "broken":
+                raise RuntimeError("doubao unavailable")
+            return "explanation"
+
+        bearer.get_doubao_explanation_by_doubao = Mock(side_effect=explain)
+
+        with (
+            patch("main.fetch_baidu_word_page", return_value=None),
+            patch("main.fetch_all_phonetic", return_value=("phonetic", True)),
+            patch("main.YamlConfigManager") as config_manager,
+            patch("main.add_word_to_his_set") as add_to_history,
+            patch("main.traceback.print_exc"),
+            patch("builtins.print"),
+        ):
+            config_manager.return_value.get_config.return_value = "http://example.test"
+            bearer.bear_eudic_to_dida365()
+
+        dida.add_task.assert_called_once()
+        self.assertEqual(dida.add_task.call_args.args[0], "hello")
+        self.assertTrue(dida.add_task.call_args.args[1].startswith("phonetic"))
+        add_to_history.assert_called_once_with("hello")
+
+    def test_words_are_prepared_concurrently(self):
+        words = [
+            SimpleNamespace(word=f"word{index}", note=None, note_images=())
+            for index in range(WORD_PIPELINE_PREPARE_WORKERS)
+        ]
+        eudic = Mock()
+        eudic.download_note_images.return_value = []
+        dida = Mock()
+        bearer = Bearer.__new__(Bearer)
+        bearer.agent = SimpleNamespace(eudic=eudic, dida=dida)
+        bearer.enrichment_cache = None
+        bearer.acquire_words = Mock(return_value=words)
+        # 每个单词的讲解都要等到所有单词同时进入加工阶段才能返回。
+        barrier = threading.Barrier(len(words), timeout=5)
+
+        def explain(word):
+            barrier.wait()
+            return "explanation"
+
+        bearer.get_doubao_explanation_by_doubao = Mock(side_effect=explain)
+
+        with (
+            patch("main.fetch_baidu_word_page", return_value=None),
+            patch("main.fetch_all_phonetic", return_value=("phonetic", True)),
+            patch("main.YamlConfigManager") as config_manager,
+            patch("main.add_word_to_his_set"),
+            patch("builtins.print"),
+        ):
+            config_manager.return_value.get_config.return_value = "http://example.test"
+            bearer.bear_eudic_to_dida365()
+
+        self.assertEqual(
+            sorted(call.args[0] for call in dida.add_task.call_args_list),
+            [word.word for word in words],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
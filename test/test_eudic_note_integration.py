@@ -1,4 +1,5 @@
 import json
+import threading
 import unittest
 from types import SimpleNamespace
 from unittest.mock import Mock, patch
@@ -8,6 +9,7 @@ import requests
 from agent.eudic import (
     EUDIC_REQUEST_TIMEOUT,
     Eudic,
+    EudicNoteData,
     EudicNoteFetchError,
     normalize_eudic_note,
     strip_eudic_note_metadata,
@@ -26,7 +28,7 @@ class EudicNoteIntegrationTest(unittest.TestCase):
             }
         }
 
-        with patch("agent.eudic.requests.get", return_value=response) as request_get:
+        with patch("agent.eudic.requests.Session.get", return_value=response) as request_get:
             note = Eudic("NIS test").get_note("hello")
 
         self.assertEqual(note, "**来源：**《Demo》\n\n> **hello** world")
@@ -52,7 +54,7 @@ class EudicNoteIntegrationTest(unittest.TestCase):
             }
         }
 
-        with patch("agent.eudic.requests.get", return_value=response):
+        with patch("agent.eudic.requests.Session.get", return_value=response):
             cleaned_note = Eudic("NIS test").get_note("hello")
 
         self.assertEqual(cleaned_note, note)
@@ -78,7 +80,7 @@ class EudicNoteIntegrationTest(unittest.TestCase):
             }
         }
 
-        with patch("agent.eudic.requests.get", return_value=response):
+        with patch("agent.eudic.requests.Session.get", return_value=response):
             note = Eudic("NIS test").get_note("schizophrenia")
 
         self.assertEqual(note, "The Backrooms but Clark has schizophrenia")
@@ -125,19 +127,19 @@ class EudicNoteIntegrationTest(unittest.TestCase):
             }
         }
 
-        with patch("agent.eudic.requests.get", return_value=response):
+        with patch("agent.eudic.requests.Session.get", return_value=response):
             self.assertIsNone(Eudic("NIS test").get_note("legacy"))
 
     def test_get_note_treats_not_found_as_no_note(self):
         response = Mock(status_code=404)
 
-        with patch("agent.eudic.requests.get", return_value=response):
+        with patch("agent.eudic.requests.Session.get", return_value=response):
             self.assertIsNone(Eudic("NIS test").get_note("missing"))
 
         response.raise_for_status.assert_not_called()
 
     def test_get_note_wraps_request_failures(self):
-        with patch("agent.eudic.requests.get", side_effect=requests.Timeout("timed out")):
+        with patch("agent.eudic.requests.Session.get", side_effect=requests.Timeout("timed out")):
             with self.assertRaises(EudicNoteFetchError):
                 Eudic("NIS test").get_note("hello")
 
@@ -146,10 +148,41 @@ class EudicNoteIntegrationTest(unittest.TestCase):
         response.raise_for_status.return_value = None
         response.json.return_value = []
 
-        with patch("agent.eudic.requests.get", return_value=response):
+        with patch("agent.eudic.requests.Session.get", return_value=response):
             with self.assertRaises(EudicNoteFetchError):
                 Eudic("NIS test").get_note("hello")
 
+    def test_get_notes_data_isolates_failures_per_word(self):
+        eudic = Eudic("NIS test")
+
+        def get_note_data(word):
+            if word == "broken":
+                raise EudicNoteFetchError("temporary failure")
+            return None if word == "plain" else EudicNoteData(text=f"note for {word}")
+
+        with patch.object(eudic, "get_note_data", side_effect=get_note_data) as fetch_note:
+            notes = eudic.get_notes_data(["hello", "broken", "plain", "hello"])
+
+        self.assertEqual(list(notes), ["hello", "broken", "plain"])
+        self.assertEqual(notes["hello"].text, "note for hello")
+        self.assertIsInstance(notes["broken"], EudicNoteFetchError)
+        self.assertIsNone(notes["plain"])
+        self.assertEqual(fetch_note.call_count, 3)
+
+    def test_get_notes_data_fetches_concurrently(self):
+        eudic = Eudic("NIS test")
+        words = ["alpha", "beta", "gamma"]
+        barrier = threading.Barrier(len(words), timeout=5)
+
+        def get_note_data(word):
+            barrier.wait()
+            return EudicNoteData(text=word)
+
+        with patch.object(eudic, "get_note_data", side_effect=get_note_data):
+            notes = eudic.get_notes_data(words)
+
+        self.assertEqual({word: note.text for word, note in notes.items()}, dict(zip(words, words)))
+
     def test_acquire_words_skips_note_failures_without_marking_the_word(self):
         word = SimpleNamespace(
             word="hello",
@@ -158,15 +191,15 @@ class EudicNoteIntegrationTest(unittest.TestCase):
         )
         eudic = Mock()
         eudic.get_words_in_book.return_value = [word]
-        eudic.get_note_data.side_effect = EudicNoteFetchError("temporary failure")
+        eudic.get_notes_data.return_value = {"hello": EudicNoteFetchError("temporary failure")}
         bearer = Bearer.__new__(Bearer)
         bearer.agent = SimpleNamespace(eudic=eudic)
 
-        with patch("main.if_exists_in_his_set", return_value=False):
+        with patch("main.filter_unseen", side_effect=lambda words: list(words)):
             result = bearer.acquire_words(7, include_notes=True)
 
         self.assertEqual(result, [])
-        eudic.get_note_data.assert_called_once_with("hello")
+        eudic.get_notes_data.assert_called_once_with(["hello"])
 
     def test_compose_task_content_hides_player_source_filename(self):
         content = compose_word_task_content(
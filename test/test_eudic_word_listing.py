@@ -1,7 +1,40 @@
+import tempfile
+import threading
 import unittest
+from datetime import datetime, timedelta
 from unittest.mock import patch
+from zoneinfo import ZoneInfo
 
-from agent.eudic import Eudic
+from agent.eudic import EUDIC_MAX_PAGE, Eudic, EudicUnknownCategoryError
+from constants.eudic import DEFAULT_VOCAB_BOOK_NAME
+from utils.eudic_state_db import EudicPageCursor, EudicStateStore
+
+
+def make_book(page_count, page_size=3, newest=None, step=timedelta(hours=1)):
+    """按页内升序生成生词本，最后一页最后一个单词最新；时间按欧路的 UTC-8 格式书写。"""
+    newest = newest or datetime.now(ZoneInfo("Etc/GMT+8"))
+    total = page_count * page_size
+    words = [
+        {
+            "word": f"word{index}",
+            "exp": "",
+            "add_time": (newest - step * (total - 1 - index)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        for index in range(total)
+    ]
+    return [words[page * page_size : (page + 1) * page_size] for page in range(page_count)]
+
+
+class FakePagedBook:
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested_pages = []
+        self.lock = threading.Lock()
+
+    def fetch_page(self, vocab_book_id, page, page_size):
+        with self.lock:
+            self.requested_pages.append(page)
+        return self.pages[page] if page < len(self.pages) else []
 
 
 class EudicWordListingTest(unittest.TestCase):
@@ -26,6 +59,169 @@ class EudicWordListingTest(unittest.TestCase):
 
         self.assertEqual([word.word for word in words], ["hello"])
 
+    def test_find_last_page_needs_two_probe_rounds(self):
+        for page_count in range(EUDIC_MAX_PAGE + 2):
+            with self.subTest(page_count=page_count):
+                eudic = Eudic("NIS test")
+                book = FakePagedBook([[{"word": "w"}]] * page_count)
+                fetched_pages = {}
+
+                with (
+                    patch.object(eudic, "_fetch_page", side_effect=book.fetch_page),
+                    patch.object(eudic, "_fetch_pages", wraps=eudic._fetch_pages) as fetch_pages,
+                ):
+                    last_page = eudic._find_last_page("book-id", 100, fetched_pages)
+
+                self.assertEqual(last_page, min(page_count, EUDIC_MAX_PAGE + 1) - 1)
+                self.assertLessEqual(fetch_pages.call_count, 2)
+                self.assertEqual(len(book.requested_pages), len(set(book.requested_pages)))
+
+    def test_recent_words_only_need_the_already_probed_last_page(self):
+        eudic = Eudic("NIS test")
+        book = FakePagedBook(make_book(10, page_size=3, step=timedelta(days=1)))
+
+        with patch.object(eudic, "_fetch_page", side_effect=book.fetch_page):
+            words = eudic.get_words_in_book(vocab_book_id="book-id", days=2)
+
+        self.assertEqual([word.word for word in words], ["word27", "word28", "word29"])
+        self.assertEqual(len(book.requested_pages), len(set(book.requested_pages)))
+
+    def test_tail_pages_are_collected_newest_first_until_the_cutoff(self):
+        eudic = Eudic("NIS test")
+        book = FakePagedBook(make_book(30, page_size=2, step=timedelta(hours=3)))
+
+        with patch.object(eudic, "_fetch_page", side_effect=book.fetch_page):
+            words = eudic.get_words_in_book(vocab_book_id="book-id", days=3)
+
+        # 每 3 小时一个单词：3 天内的单词位于第 18～29 页，第 17 页已整页越界。
+        expected_pages = range(29, 17, -1)
+        self.assertEqual(
+            [word.word for word in words],
+            [f"word{index}" for page in expected_pages for index in (2 * page, 2 * page + 1)],
+        )
+        self.assertNotIn(0, book.requested_pages)
+
+
+
+class EudicPageCursorTest(unittest.TestCase):
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.store = EudicStateStore(f"{temporary_directory.name}/runtime_state.sqlite3")
+
+    def poll(self, book):
+        eudic = Eudic("NIS test", state_store=self.store)
+        book.requested_pages.clear()
+        with patch.object(eudic, "_fetch_page", side_effect=book.fetch_page):
+            return eudic.get_words_in_book(vocab_book_id="book-id", days=1)
+
+    def test_steady_state_poll_only_checks_the_cursor_page_and_its_successor(self):
+        book = FakePagedBook(make_book(12, page_size=3, step=timedelta(days=1)))
+
+        self.poll(book)
+        cursor = self.store.get_page_cursor("book-id")
+        words = self.poll(book)
+
+        self.assertEqual(cursor.last_page, 11)
+        self.assertEqual(cursor.newest_add_time, book.pages[11][-1]["add_time"])
+        self.assertEqual(sorted(book.requested_pages), [11, 12])
+        self.assertEqual([word.word for word in words], ["word33", "word34", "word35"])
+
+    def test_cursor_falls_back_to_search_after_the_book_grows_a_page(self):
+        book = FakePagedBook(make_book(12, page_size=3, step=timedelta(days=1)))
+        self.poll(book)
+        book.pages = make_book(13, page_size=3, step=timedelta(days=1))
+
+        self.poll(book)
+
+        self.assertGreater(len(book.requested_pages), 2)
+        self.assertEqual(self.store.get_page_cursor("book-id").last_page, 12)
+
+    def test_cursor_with_newer_add_time_than_the_page_is_invalid(self):
+        book = FakePagedBook(make_book(12, page_size=3, step=timedelta(days=1)))
+        self.store.save_page_cursor(
+            EudicPageCursor(
+                book_id="book-id",
+                last_page=11,
+                page_size=100,
+                newest_add_time="2999-01-01T00:00:00Z",
+            )
+        )
+
+        self.poll(book)
+
+        self.assertGreater(len(book.requested_pages), 2)
+        self.assertEqual(
+            self.store.get_page_cursor("book-id").newest_add_time,
+            book.pages[11][-1]["add_time"],
+        )
+
+    def test_empty_book_clears_the_cursor(self):
+        self.store.save_page_cursor(
+            EudicPageCursor(book_id="book-id", last_page=3, page_size=100, newest_add_time="2026-01-01T00:00:00Z")
+        )
+
+        self.assertEqual(self.poll(FakePagedBook([])), [])
+        self.assertIsNone(self.store.get_page_cursor("book-id"))
+
+
+
+class EudicDefaultBookIdTest(unittest.TestCase):
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        self.store = EudicStateStore(f"{temporary_directory.name}/runtime_state.sqlite3")
+
+    @staticmethod
+    def book_list(book_id):
+        return {"data": [{"name": DEFAULT_VOCAB_BOOK_NAME, "id": book_id}]}
+
+    def test_default_book_id_is_resolved_once_across_clients(self):
+        book = FakePagedBook(make_book(1))
+
+        for _ in range(2):
+            eudic = Eudic("NIS test", state_store=self.store)
+            with (
+                patch.object(eudic, "get_vocab_book", return_value=self.book_list("book-id")) as get_vocab_book,
+                patch.object(eudic, "_fetch_page", side_effect=book.fetch_page),
+            ):
+                eudic.get_words_in_book(days=1)
+
+        get_vocab_book.assert_not_called()
+
+    def test_unknown_category_refreshes_the_cached_book_id(self):
+        eudic = Eudic("NIS test", state_store=self.store)
+        book = FakePagedBook(make_book(1))
+        self.store.save_default_book_id(eudic._account_key, DEFAULT_VOCAB_BOOK_NAME, "deleted-book")
+
+        def fetch_page(vocab_book_id, page, page_size):
+            if vocab_book_id == "deleted-book":
+                raise EudicUnknownCategoryError("unknown category")
+            return book.fetch_page(vocab_book_id, page, page_size)
+
+        with (
+            patch.object(eudic, "get_vocab_book", return_value=self.book_list("new-book")),
+            patch.object(eudic, "_fetch_page", side_effect=fetch_page),
+            patch("builtins.print"),
+        ):
+            words = eudic.get_words_in_book(days=1)
+
+        self.assertEqual(len(words), 3)
+        self.assertEqual(
+            self.store.get_default_book_id(eudic._account_key, DEFAULT_VOCAB_BOOK_NAME, 60),
+            "new-book",
+        )
+
+    def test_unknown_category_with_an_unchanged_id_is_raised(self):
+        eudic = Eudic("NIS test", state_store=self.store)
+
+        with (
+            patch.object(eudic, "get_vocab_book", return_value=self.book_list("book-id")),
+            patch.object(eudic, "_fetch_page", side_effect=EudicUnknownCategoryError("unknown")),
+            self.assertRaises(EudicUnknownCategoryError),
+        ):
+            eudic.get_words_in_book(days=1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -23,7 +23,7 @@ class EudicWriteClientTest(unittest.TestCase):
         response.raise_for_status.return_value = None
         response.json.return_value = {"word": "hello", "exp": ""}
 
-        with patch("agent.eudic.requests.get", return_value=response) as request_get:
+        with patch("agent.eudic.requests.Session.get", return_value=response) as request_get:
             result = Eudic("NIS test").get_word("hello")
 
         self.assertEqual(result, {"word": "hello", "exp": ""})
@@ -37,13 +37,13 @@ class EudicWriteClientTest(unittest.TestCase):
         empty_response.json.return_value = {"data": []}
         missing_response = Mock(status_code=404)
 
-        with patch("agent.eudic.requests.get", side_effect=[empty_response, missing_response]):
+        with patch("agent.eudic.requests.Session.get", side_effect=[empty_response, missing_response]):
             eudic = Eudic("NIS test")
             self.assertIsNone(eudic.get_word("missing"))
             self.assertIsNone(eudic.get_word("missing"))
 
     def test_get_word_wraps_request_failures(self):
-        with patch("agent.eudic.requests.get", side_effect=requests.Timeout("timed out")):
+        with patch("agent.eudic.requests.Session.get", side_effect=requests.Timeout("timed out")):
             with self.assertRaises(EudicWordFetchError):
                 Eudic("NIS test").get_word("hello")
 
@@ -52,7 +52,7 @@ class EudicWriteClientTest(unittest.TestCase):
         response.raise_for_status.return_value = None
         note = "first line\nsecond line"
 
-        with patch("agent.eudic.requests.post", return_value=response) as request_post:
+        with patch("agent.eudic.requests.Session.post", return_value=response) as request_post:
             Eudic("NIS test").save_note("hello", note)
 
         self.assertEqual(request_post.call_args.args[0], GET_NOTE_URL)
@@ -66,14 +66,14 @@ class EudicWriteClientTest(unittest.TestCase):
         response = Mock()
         response.raise_for_status.return_value = None
 
-        with patch("agent.eudic.requests.post", return_value=response) as request_post:
+        with patch("agent.eudic.requests.Session.post", return_value=response) as request_post:
             Eudic("NIS test").add_word("hello")
 
         self.assertEqual(request_post.call_args.args[0], WORD_URL)
         self.assertEqual(request_post.call_args.kwargs["json"], {"language": "en", "word": "hello"})
 
     def test_write_failures_are_not_retried_inside_the_client(self):
-        with patch("agent.eudic.requests.post", side_effect=requests.ReadTimeout("uncertain")) as request_post:
+        with patch("agent.eudic.requests.Session.post", side_effect=requests.ReadTimeout("uncertain")) as request_post:
             with self.assertRaises(EudicWriteError):
                 Eudic("NIS test").add_word("hello")
 
@@ -262,6 +262,14 @@ class ManualNoteArgumentTest(unittest.TestCase):
         with self.assertRaises(SystemExit):
             resolve_note_argument(parser, args)
 
+    def test_max_runtime_must_be_positive_seconds(self):
+        parser = build_argument_parser()
+
+        self.assertEqual(parser.parse_args(["--max-runtime", "3600"]).max_runtime, 3600)
+        self.assertIsNone(parser.parse_args([]).max_runtime)
+        with patch("sys.stderr"), self.assertRaises(SystemExit):
+            parser.parse_args(["--max-runtime", "0"])
+
     def test_note_and_note_file_are_mutually_exclusive(self):
         parser = build_argument_parser()
 
@@ -1,7 +1,10 @@
 import io
 import json
+import signal
 import sys
+import threading
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
@@ -9,15 +12,24 @@ import requests
 
 from agent.dida365 import Dida365Agent, MEDIA_DOWNLOAD_TIMEOUT
 from agent.doubao_online import DOUBAO_REQUEST_TIMEOUT, DoubaoOnline
-from agent.eudic import EUDIC_REQUEST_TIMEOUT, Eudic
+from agent.eudic import EUDIC_CONNECT_RETRIES, EUDIC_REQUEST_TIMEOUT, Eudic
 from dida365_project.api.dida365 import Dida365
 from dida365_project.models.upload_attachment import uploadAttachment
 from dida365_project.utils.dictvoice_util import DICTVOICE_REQUEST_TIMEOUT, request_dictvoice
-from main import SCHEDULED_JOB_LAST_SUCCESS, log_scheduler_heartbeat, run_scheduled_job
+from main import (
+    SCHEDULED_JOB_LAST_SUCCESS,
+    ScheduledJobExecutor,
+    install_stop_signal_handlers,
+    log_scheduler_heartbeat,
+    run_scheduled_job,
+    run_scheduler_loop,
+)
+from utils.media_spool import MediaSpool
 
 
 def make_dida_client(session=None):
     client = Dida365.__new__(Dida365)
+    client._initialize_sync_state()
     client.session = session or Mock()
     client.base_url = "https://api.dida365.test/api/v2"
     client.headers = {"content-type": "application/json"}
@@ -95,7 +107,15 @@ class DidaNetworkResilienceTest(unittest.TestCase):
     def test_attachment_retry_reuses_upload_id_and_complete_bytes(self):
         session = Mock()
         response = Mock()
-        session.request.side_effect = [requests.ConnectTimeout("connect"), response]
+        sent_bodies = []
+
+        def request(method, url, **kwargs):
+            sent_bodies.append(kwargs["data"].read())
+            if len(sent_bodies) == 1:
+                raise requests.ConnectTimeout("connect")
+            return response
+
+        session.request.side_effect = request
         client = make_dida_client(session)
         task = SimpleNamespace(id="task-id", project_id="project-id")
         source = io.BytesIO(b"complete audio bytes")
@@ -116,27 +136,61 @@ class DidaNetworkResilienceTest(unittest.TestCase):
         self.assertTrue(request_urls[0].endswith("/stable-upload-id"))
         for call in session.request.call_args_list:
             self.assertEqual(call.kwargs["timeout"], Dida365.UPLOAD_REQUEST_TIMEOUT)
-            self.assertEqual(
-                call.kwargs["files"][0][1][1],
-                b"complete audio bytes",
-            )
+        for body in sent_bodies:
+            self.assertIn(b"\r\n\r\ncomplete audio bytes\r\n", body)
+        self.assertEqual(source.tell(), 0)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"data": []}'
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class EudicConnectionPoolTest(unittest.TestCase):
+    def test_sequential_calls_reuse_one_keep_alive_connection(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        eudic = Eudic("NIS test")
+        self.addCleanup(eudic.session.close)
+        url = f"http://127.0.0.1:{server.server_address[1]}/words"
+
+        for _ in range(3):
+            eudic.session.get(url, timeout=EUDIC_REQUEST_TIMEOUT).raise_for_status()
+
+        self.assertEqual(eudic.describe_connection_stats(), "欧路请求=3，新建连接=1，复用=2")
+
+    def test_only_reads_are_retried_after_the_request_was_sent(self):
+        retry = Eudic("NIS test").adapter.max_retries
+
+        self.assertEqual(retry.allowed_methods, frozenset({"GET"}))
+        self.assertEqual(retry.connect, EUDIC_CONNECT_RETRIES)
+        self.assertEqual(retry.status, 0)
 
 
 class ExternalRequestTimeoutTest(unittest.TestCase):
     def test_eudic_list_and_page_requests_use_the_eudic_timeout(self):
         response = Mock()
-        response.json.side_effect = [
-            {"data": []},
-            {"data": []},
-        ]
+        response.json.return_value = {"data": []}
+        eudic = Eudic("NIS test")
 
-        with patch("agent.eudic.requests.get", return_value=response) as request_get:
-            eudic = Eudic("NIS test")
+        with patch.object(eudic.session, "get", return_value=response) as session_get:
             eudic.get_vocab_book()
             eudic._fetch_page("book-id", 0, 100)
 
-        self.assertEqual(request_get.call_count, 2)
-        for call in request_get.call_args_list:
+        self.assertEqual(session_get.call_count, 2)
+        for call in session_get.call_args_list:
             self.assertEqual(call.kwargs["timeout"], EUDIC_REQUEST_TIMEOUT)
 
     def test_doubao_request_uses_the_long_generation_timeout(self):
@@ -162,8 +216,10 @@ class ExternalRequestTimeoutTest(unittest.TestCase):
 
     def test_video_download_uses_the_media_timeout(self):
         response = Mock()
-        response.content = b"video"
+        response.iter_content.return_value = [b"video"]
         agent = Dida365Agent(Mock())
+        spool = MediaSpool()
+        self.addCleanup(spool.cleanup)
 
         with (
             patch("agent.dida365.get_dictvoice_bytes", return_value=[]),
@@ -173,10 +229,33 @@ class ExternalRequestTimeoutTest(unittest.TestCase):
             ),
             patch("agent.dida365.requests.get", return_value=response) as request_get,
         ):
-            files = agent._get_task_attachments_bytes("hello")
+            files = agent._get_task_attachments_bytes("hello", media_spool=spool)
 
         self.assertEqual(files[0][0], "video.mp4")
+        self.assertEqual(files[0][1].read_bytes(), b"video")
         self.assertEqual(request_get.call_args.kwargs["timeout"], MEDIA_DOWNLOAD_TIMEOUT)
+        self.assertTrue(request_get.call_args.kwargs["stream"])
+
+    def test_prefetched_video_urls_skip_the_baidu_query(self):
+        response = Mock()
+        response.iter_content.return_value = [b"video"]
+        agent = Dida365Agent(Mock())
+        spool = MediaSpool()
+        self.addCleanup(spool.cleanup)
+
+        with (
+            patch("agent.dida365.get_dictvoice_bytes", return_value=[]),
+            patch("agent.dida365.query_word_explanation_video") as query_video,
+            patch("agent.dida365.requests.get", return_value=response),
+        ):
+            files = agent._get_task_attachments_bytes(
+                "hello",
+                video_urls=("https://example.test/video.mp4",),
+                media_spool=spool,
+            )
+
+        self.assertEqual(files[0][0], "video.mp4")
+        query_video.assert_not_called()
 
     def test_voice_failure_does_not_block_other_attachments(self):
         agent = Dida365Agent(Mock())
@@ -188,7 +267,8 @@ class ExternalRequestTimeoutTest(unittest.TestCase):
             ),
             patch("agent.dida365.query_word_explanation_video", return_value=[]),
         ):
-            self.assertEqual(agent._get_task_attachments_bytes("rare-word"), [])
+            with MediaSpool() as spool:
+                self.assertEqual(agent._get_task_attachments_bytes("rare-word", media_spool=spool), [])
 
 
 class ScheduledJobLoggingTest(unittest.TestCase):
@@ -224,5 +304,134 @@ class ScheduledJobLoggingTest(unittest.TestCase):
         self.assertTrue(output.call_args.kwargs["flush"])
 
 
+class SchedulerLoopTest(unittest.TestCase):
+    def test_loop_exits_after_max_runtime(self):
+        now = [0.0]
+        stop_event = Mock()
+        stop_event.is_set.return_value = False
+        stop_event.wait.side_effect = lambda seconds: now.__setitem__(0, now[0] + seconds)
+
+        with patch("main.schedule.run_pending") as run_pending:
+            reason = run_scheduler_loop(stop_event, max_runtime=3, clock=lambda: now[0])
+
+        self.assertEqual(reason, "max_runtime")
+        self.assertEqual(run_pending.call_count, 3)
+
+    def test_sigterm_stops_the_loop_after_the_current_tick(self):
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            self.addCleanup(signal.signal, signum, signal.getsignal(signum))
+        stop_event = threading.Event()
+        with patch("builtins.print"):
+            install_stop_signal_handlers(stop_event)
+
+        def run_pending():
+            signal.raise_signal(signal.SIGTERM)
+
+        with patch("builtins.print"), patch("main.schedule.run_pending", side_effect=run_pending) as pending:
+            reason = run_scheduler_loop(stop_event)
+
+        self.assertEqual(reason, "signal")
+        pending.assert_called_once()
+
+
+class ScheduledJobExecutorTest(unittest.TestCase):
+    def make_executor(self, **kwargs):
+        executor = ScheduledJobExecutor(**kwargs)
+        self.addCleanup(executor.shutdown)
+        return executor
+
+    def test_a_running_job_is_not_started_twice(self):
+        executor = self.make_executor()
+        release = threading.Event()
+        job = Mock(side_effect=lambda: release.wait(5))
+
+        first = executor.submit("导入", job)
+        second = executor.submit("导入", job)
+        release.set()
+        first.result(timeout=5)
+        third = executor.submit("导入", job)
+        third.result(timeout=5)
+
+        self.assertIsNone(second)
+        self.assertEqual(job.call_count, 2)
+        self.assertEqual(executor.skipped_counts, {"导入": 1})
+
+    def test_pollers_do_not_wait_behind_a_slow_job(self):
+        executor = self.make_executor()
+        release = threading.Event()
+        self.addCleanup(release.set)
+        executor.submit("导入", lambda: release.wait(5))
+
+        poll = executor.submit("轮询", lambda: "polled")
+
+        self.assertEqual(poll.result(timeout=1), "polled")
+        self.assertIn("导入(", executor.describe())
+
+    def test_overrun_is_reported_once_per_run(self):
+        now = [0.0]
+        executor = self.make_executor(clock=lambda: now[0])
+        release = threading.Event()
+        self.addCleanup(release.set)
+        executor.submit("导入", lambda: release.wait(5), overrun_after=60)
+
+        with patch("builtins.print") as output:
+            now[0] = 30
+            executor.submit("导入", Mock())
+            now[0] = 61
+            executor.submit("导入", Mock())
+            now[0] = 62
+            executor.submit("导入", Mock())
+
+        output.assert_called_once()
+        self.assertIn("[调度任务超时] 导入", output.call_args.args[0])
+        self.assertEqual(executor.overrun_counts, {"导入": 1})
+        self.assertIn("超时=导入×1", executor.describe())
+
+    def test_overrun_of_a_job_that_is_not_triggered_again_is_reported(self):
+        now = [0.0]
+        executor = self.make_executor(clock=lambda: now[0])
+        release = threading.Event()
+        self.addCleanup(release.set)
+        executor.submit("续期", lambda: release.wait(5), overrun_after=60)
+
+        with patch("builtins.print") as output:
+            now[0] = 30
+            executor.check_overruns()
+            output.assert_not_called()
+            now[0] = 61
+            executor.check_overruns()
+            executor.check_overruns()
+
+        output.assert_called_once()
+        self.assertEqual(executor.overrun_counts, {"续期": 1})
+
+    def test_scheduler_loop_checks_overruns_every_tick(self):
+        now = [0.0]
+        stop_event = Mock()
+        stop_event.is_set.return_value = False
+        stop_event.wait.side_effect = lambda seconds: now.__setitem__(0, now[0] + seconds)
+        job_executor = Mock()
+
+        with patch("main.schedule.run_pending"):
+            run_scheduler_loop(
+                stop_event, max_runtime=3, clock=lambda: now[0], job_executor=job_executor
+            )
+
+        self.assertEqual(job_executor.check_overruns.call_count, 3)
+
+    def test_job_failure_is_raised_in_the_scheduler_thread(self):
+        executor = self.make_executor()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        future = executor.submit("失败任务", fail)
+        with self.assertRaises(RuntimeError):
+            future.result(timeout=5)
+
+        with self.assertRaisesRegex(RuntimeError, "boom"):
+            executor.raise_if_failed()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,153 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+from utils.phonetic_util import (
+    BaiduWordPageResult,
+    ConcurrentPhoneticFetcher,
+    close_phonetic_executor,
+    get_all_phonetic,
+    get_phonetic_executor,
+    query_word_explanation_video,
+)
+
+
+def slow_source(phonetic, delay):
+    def source(word):
+        time.sleep(delay)
+        return phonetic
+
+    return source
+
+
+class ConcurrentPhoneticFetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.addCleanup(self.executor.shutdown, wait=True)
+
+    def test_first_success_returns_the_fastest_non_empty_source(self):
+        fetcher = ConcurrentPhoneticFetcher(
+            {
+                "必应词典": slow_source("slow", 0.3),
+                "有道词典": slow_source(None, 0),
+                "百度词典": slow_source("fast", 0.05),
+            },
+            executor=self.executor,
+        )
+
+        self.assertEqual(fetcher.first_success("hello"), ("百度词典", "fast"))
+
+    def test_fallback_source_is_only_used_when_others_fail(self):
+        fetcher = ConcurrentPhoneticFetcher(
+            {
+                "金山词霸": slow_source("kk", 0),
+                "必应词典": slow_source("ipa", 0.05),
+            },
+            executor=self.executor,
+        )
+        self.assertEqual(fetcher.first_success("hello"), ("必应词典", "ipa"))
+
+        fetcher.sources["必应词典"] = slow_source(None, 0)
+        self.assertEqual(fetcher.first_success("hello"), ("金山词霸", "kk"))
+
+    def test_all_within_runs_sources_in_parallel_and_drops_late_ones(self):
+        barrier = threading.Barrier(2, timeout=1)
+
+        def waits_for_peer(phonetic):
+            def source(word):
+                barrier.wait()
+                return phonetic
+
+            return source
+
+        fetcher = ConcurrentPhoneticFetcher(
+            {
+                "必应词典": waits_for_peer("a"),
+                "有道词典": waits_for_peer("b"),
+                "金山词霸": slow_source("late", 0.5),
+            },
+            executor=self.executor,
+        )
+
+        with patch("builtins.print") as output:
+            result = fetcher.all_within("hello", deadline=0.3)
+
+        self.assertEqual(result.phonetics, {"必应词典": "a", "有道词典": "b"})
+        self.assertIn("金山词霸 超时", output.call_args.args[0])
+        self.assertFalse(result.is_complete(fetcher.sources))
+        self.assertTrue(result.is_complete(["必应词典", "有道词典"]))
+
+    def test_time_queued_behind_other_words_is_not_part_of_the_deadline(self):
+        busy_executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(busy_executor.shutdown, wait=True)
+        busy_executor.submit(time.sleep, 0.2)
+        fetcher = ConcurrentPhoneticFetcher(
+            {"必应词典": slow_source("a", 0.2)},
+            executor=busy_executor,
+        )
+
+        with patch("builtins.print"):
+            result = fetcher.all_within("hello", deadline=0.3)
+
+        self.assertEqual(result.phonetics, {"必应词典": "a"})
+
+    def test_source_that_never_starts_is_cancelled(self):
+        release = threading.Event()
+        busy_executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(busy_executor.shutdown, wait=True)
+        self.addCleanup(release.set)
+        busy_executor.submit(release.wait, 5)
+        source = Mock(return_value="a")
+        fetcher = ConcurrentPhoneticFetcher({"必应词典": source}, executor=busy_executor)
+
+        with patch("builtins.print"):
+            started_at = time.monotonic()
+            result = fetcher.all_within("hello", deadline=0.2)
+        elapsed = time.monotonic() - started_at
+        release.set()
+        busy_executor.shutdown(wait=True)
+
+        self.assertEqual(result.phonetics, {})
+        self.assertLess(elapsed, 1)
+        source.assert_not_called()
+
+    def test_shared_executor_is_created_lazily_and_replaced_after_close(self):
+        close_phonetic_executor()
+        executor = get_phonetic_executor()
+        self.assertIs(get_phonetic_executor(), executor)
+
+        close_phonetic_executor()
+
+        with self.assertRaises(RuntimeError):
+            executor.submit(print)
+        replacement = get_phonetic_executor()
+        self.addCleanup(close_phonetic_executor)
+        self.assertIsNot(replacement, executor)
+
+    def test_explanation_video_lookup_failure_returns_no_videos(self):
+        with (
+            patch("utils.phonetic_util.BaiduWordPage") as page,
+            patch("builtins.print"),
+        ):
+            page.return_value.fetch.side_effect = TimeoutError("page hung")
+
+            self.assertEqual(query_word_explanation_video("hello"), [])
+
+    def test_get_all_phonetic_reuses_the_prefetched_baidu_result(self):
+        with (
+            patch("utils.phonetic_util.get_phonetic_by_baidu") as baidu,
+            patch("utils.phonetic_util.get_phonetic_by_bing", return_value="bing"),
+            patch("utils.phonetic_util.get_phonetic_by_youdao", return_value=None),
+            patch("utils.phonetic_util.get_phonetic_by_ciba", return_value="ciba"),
+            patch("builtins.print"),
+        ):
+            result = get_all_phonetic("hello", baidu_page=BaiduWordPageResult(phonetic="baidu"))
+
+        baidu.assert_not_called()
+        self.assertEqual(result, "百度词典: /baidu/\n必应词典: /bing/\n金山词霸: /ciba/")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import json
 import tempfile
+import threading
 import unittest
 from copy import deepcopy
 from datetime import datetime
@@ -78,6 +79,12 @@ class FakeDida:
     def get_latest_data(self):
         self._refresh_active_tasks()
 
+    def find_task_by_id(self, task_id):
+        return next((task for task in self.active_tasks if task.id == task_id), None)
+
+    def find_tasks_by_title(self, title):
+        return [task for task in self.active_tasks if task.title == title]
+
     def get_task(self, task_id):
         task = self.tasks.get(task_id)
         return deepcopy(task) if task else None
@@ -549,6 +556,124 @@ class SentencePracticeServiceTest(unittest.TestCase):
             ).fetchone()
         self.assertEqual(interaction["status"], INTERACTION_STATUS_DONE)
 
+    def test_action_handlers_reuse_the_comment_list_from_the_scan(self):
+        self.reserve_active_practice()
+        self.dida.add_remote_comment(
+            "practice-1",
+            "source-1",
+            "The fragile satellite escaped its orbit.",
+        )
+        service = self.make_service(
+            ['{"action":"apply","updates":[{"group_id":1,"relevant_history":[{"role":"source","content":"The fragile satellite escaped its orbit."}],"feedback_markdown":"两个词都使用正确。"}]}']
+        )
+        list_comments = Mock(wraps=self.dida.get_task_comments)
+        self.dida.get_task_comments = list_comments
+
+        service.poll_and_process()
+
+        # 扫描一次，评论删除后回读确认一次。
+        self.assertEqual(list_comments.call_count, 2)
+        self.assertEqual(self.dida.deleted_comment_ids, ["source-1"])
+
+    def test_created_daily_task_is_read_back_and_its_etag_recorded(self):
+        candidates = [SimpleNamespace(id=f"word-{index}", title=f"word{index}") for index in range(3)]
+        service = self.make_service([], candidates)
+        get_task = Mock(wraps=self.dida.get_task)
+        self.dida.get_task = get_task
+
+        created = service.generate_daily_task()
+
+        # 创建前检查一次任务是否已存在；新建任务没有旧 etag 可比，创建后回读确认。
+        self.assertEqual(get_task.call_count, 2)
+        self.assertEqual(
+            self.store.get_task_by_id(created["task_id"])["last_etag"],
+            self.dida.tasks[created["task_id"]]["etag"],
+        )
+
+    def test_direct_answer_confirms_the_body_update_by_etag(self):
+        self.reserve_active_practice()
+        self.dida.add_remote_comment(
+            "practice-1",
+            "source-1",
+            "The fragile satellite escaped its orbit.",
+        )
+        service = self.make_service(
+            ['{"action":"apply","updates":[{"group_id":1,"relevant_history":[{"role":"source","content":"The fragile satellite escaped its orbit."}],"feedback_markdown":"两个词都使用正确。"}]}']
+        )
+        get_task = Mock(wraps=self.dida.get_task)
+        self.dida.get_task = get_task
+
+        service.poll_and_process()
+
+        # 写正文前读一次任务，AI 点评复用快照，正文写入由 etag 确认；
+        # 删评论后回读一次以记下删除后的 etag。
+        self.assertEqual(get_task.call_count, 2)
+        self.assertIn("两个词都使用正确。", self.dida.tasks["practice-1"]["content"])
+        self.assertEqual(self.dida.comments["practice-1"], [])
+        self.assertEqual(
+            self.store.get_task_by_id("practice-1")["last_etag"],
+            self.dida.tasks["practice-1"]["etag"],
+        )
+
+    def test_changed_practice_tasks_fetch_comments_concurrently(self):
+        groups = [{"group_id": 1, "words": ["orbit", "fragile"], "task_ids": ["w1", "w2"]}]
+        for index in range(3):
+            task_id = f"practice-{index}"
+            self.store.reserve_daily_task(
+                f"2026-08-1{index}", task_id, VOCAB_BOOK_PROJECT_ID, f"练习{index}", groups
+            )
+            self.store.update_task_observation(task_id, status=TASK_STATUS_ACTIVE)
+            self.dida.add_remote_task(
+                {
+                    "id": task_id,
+                    "projectId": VOCAB_BOOK_PROJECT_ID,
+                    "title": f"练习{index}",
+                    "content": "",
+                    "status": Task.STATUS_ACTIVE,
+                }
+            )
+        barrier = threading.Barrier(3, timeout=5)
+        original_get_task_comments = self.dida.get_task_comments
+
+        def get_task_comments(project_id, task_id):
+            barrier.wait()
+            return original_get_task_comments(project_id, task_id)
+
+        self.dida.get_task_comments = get_task_comments
+        service = self.make_service([])
+
+        service.poll_and_process()
+
+        self.assertTrue(service.has_recent_activity())
+        for index in range(3):
+            self.assertEqual(self.store.get_task_by_id(f"practice-{index}")["last_comment_count"], 0)
+        executor = service._comment_fetch_executor
+        service.poll_and_process()
+        self.assertIs(service._comment_fetch_executor, executor)
+        service.close()
+        self.assertIsNone(service._comment_fetch_executor)
+        self.assertFalse(
+            any(thread.name.startswith("practice-comments") for thread in threading.enumerate())
+        )
+
+    def test_activity_reflects_new_comments_and_then_goes_idle(self):
+        self.reserve_active_practice()
+        service = self.make_service(
+            ['{"action":"apply","updates":[{"group_id":1,"relevant_history":[{"role":"source","content":"The fragile satellite escaped its orbit."}],"feedback_markdown":"两个词都使用正确。"}]}']
+        )
+        service.poll_and_process()
+        service.poll_and_process()
+        self.assertFalse(service.has_recent_activity())
+
+        self.dida.add_remote_comment("practice-1", "source-1", "The fragile satellite escaped its orbit.")
+        service.poll_and_process()
+        self.assertTrue(service.has_recent_activity())
+
+        # 清理评论后的下一轮还会观察到评论数变化，之后才回到空闲。
+        service.poll_and_process()
+        service.poll_and_process()
+        self.assertFalse(service.has_recent_activity())
+
     def test_ai_failure_is_persisted_and_keeps_the_user_comment(self):
         self.reserve_active_practice()
         self.dida.add_remote_comment(
@@ -635,6 +760,7 @@ class DidaCommentApiContractTest(unittest.TestCase):
         from dida365_project.api.dida365 import Dida365
 
         client = Dida365.__new__(Dida365)
+        client._initialize_sync_state()
         client._initialize_http()
         client.session = Mock()
         return client
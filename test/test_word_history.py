@@ -0,0 +1,42 @@
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils.word_his_db import WordHistoryStore
+
+
+class WordHistoryStoreTest(unittest.TestCase):
+    def test_filter_unseen_keeps_order_and_drops_known_words(self):
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            store = WordHistoryStore(
+                Path(temporary_directory) / "runtime.sqlite3",
+                legacy_pickle_path=None,
+            )
+            store.add_words(["beta", "delta"])
+
+            self.assertEqual(
+                store.filter_unseen(["alpha", "beta", "gamma", "delta"]),
+                ["alpha", "gamma"],
+            )
+            self.assertTrue(store.contains("beta"))
+            self.assertFalse(store.contains("alpha"))
+
+    def test_legacy_pickle_is_migrated_once(self):
+        with tempfile.TemporaryDirectory() as temporary_directory:
+            directory = Path(temporary_directory)
+            legacy_path = directory / "word_his.db"
+            with open(legacy_path, "wb") as f:
+                pickle.dump({"hello", "world"}, f)
+
+            store = WordHistoryStore(directory / "runtime.sqlite3", legacy_pickle_path=legacy_path)
+            store.add_words(["later"])
+            reopened = WordHistoryStore(directory / "runtime.sqlite3", legacy_pickle_path=legacy_path)
+
+            self.assertFalse(legacy_path.exists())
+            self.assertTrue((directory / "word_his.db.migrated").exists())
+            self.assertEqual(reopened.filter_unseen(["hello", "world", "later", "new"]), ["new"])
+
+
+if __name__ == "__main__":
+    unittest.main()
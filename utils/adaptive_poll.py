@@ -0,0 +1,53 @@
+import time
+
+
+ADAPTIVE_POLL_MIN_SECONDS = 5
+ADAPTIVE_POLL_MAX_SECONDS = 5 * 60
+ADAPTIVE_POLL_BACKOFF_FACTOR = 2
+
+
+class AdaptivePoller:
+    """按活跃度调整间隔的轮询任务。
+
+    由 schedule 每秒调用一次 ``run_if_due``，到期才真正执行 job。有活动时间隔回到
+    最小值；连续空闲时按倍数退避，直到最大值。job 失败时保持当前间隔并继续抛出。
+    """
+
+    def __init__(
+        self,
+        name: str,
+        job,
+        is_active=None,
+        min_interval=ADAPTIVE_POLL_MIN_SECONDS,
+        max_interval=ADAPTIVE_POLL_MAX_SECONDS,
+        backoff_factor=ADAPTIVE_POLL_BACKOFF_FACTOR,
+        clock=time.monotonic,
+    ) -> None:
+        self.name = name
+        self.job = job
+        # 未提供活跃度判断时，以 job 返回值的真假作为是否有活动。
+        self.is_active = is_active
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.clock = clock
+        self.interval = min_interval
+        self._next_run_at = clock()
+
+    def run_if_due(self):
+        if self.clock() < self._next_run_at:
+            return None
+        try:
+            result = self.job()
+        finally:
+            self._next_run_at = self.clock() + self.interval
+        active = self.is_active() if self.is_active is not None else bool(result)
+        if active:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff_factor, self.max_interval)
+        self._next_run_at = self.clock() + self.interval
+        return result
+
+    def describe(self) -> str:
+        return f"{self.name}轮询间隔={self.interval:g}秒"
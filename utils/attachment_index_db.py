@@ -0,0 +1,105 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+from constants.db import RUNTIME_DB_FILE_PATH
+from utils.runtime_db import connect_runtime_db, prepare_runtime_db, utc_now_text
+
+
+@dataclass(frozen=True)
+class UploadedAttachment:
+    task_id: str
+    sha256: str
+    file_name: str
+    attachment_id: str
+    path: str | None
+    size_bytes: int
+
+
+class AttachmentIndexStore:
+    """已上传到滴答任务的附件内容索引，按 (任务, SHA-256) 记录附件 id 与路径。"""
+
+    def __init__(self, db_path=RUNTIME_DB_FILE_PATH) -> None:
+        self.db_path = Path(db_path)
+        self.initialize()
+
+    def _connect(self):
+        return connect_runtime_db(self.db_path)
+
+    def initialize(self):
+        with prepare_runtime_db(self.db_path) as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS dida_uploaded_attachments (
+                    task_id TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    file_name TEXT NOT NULL,
+                    attachment_id TEXT NOT NULL,
+                    path TEXT,
+                    size_bytes INTEGER NOT NULL,
+                    uploaded_at TEXT NOT NULL,
+                    skipped_count INTEGER NOT NULL DEFAULT 0,
+                    saved_bytes INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (task_id, sha256)
+                )
+                """
+            )
+
+    def get_uploaded_attachments(self, task_id: str) -> dict[str, UploadedAttachment]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                """
+                SELECT task_id, sha256, file_name, attachment_id, path, size_bytes
+                FROM dida_uploaded_attachments WHERE task_id = ?
+                """,
+                (task_id,),
+            ).fetchall()
+        return {row["sha256"]: UploadedAttachment(**dict(row)) for row in rows}
+
+    def save_uploaded_attachment(self, attachment: UploadedAttachment):
+        with self._connect() as connection:
+            # 同一内容重新上传时只更新附件信息，保留累计的节省统计。
+            connection.execute(
+                """
+                INSERT INTO dida_uploaded_attachments (
+                    task_id, sha256, file_name, attachment_id, path, size_bytes, uploaded_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (task_id, sha256) DO UPDATE SET
+                    file_name = excluded.file_name,
+                    attachment_id = excluded.attachment_id,
+                    path = excluded.path,
+                    size_bytes = excluded.size_bytes,
+                    uploaded_at = excluded.uploaded_at
+                """,
+                (
+                    attachment.task_id,
+                    attachment.sha256,
+                    attachment.file_name,
+                    attachment.attachment_id,
+                    attachment.path,
+                    attachment.size_bytes,
+                    utc_now_text(),
+                ),
+            )
+
+    def record_skipped_upload(self, task_id: str, sha256: str, size_bytes: int):
+        with self._connect() as connection:
+            connection.execute(
+                """
+                UPDATE dida_uploaded_attachments
+                SET skipped_count = skipped_count + 1, saved_bytes = saved_bytes + ?
+                WHERE task_id = ? AND sha256 = ?
+                """,
+                (size_bytes, task_id, sha256),
+            )
+
+    def get_saved_totals(self) -> tuple[int, int]:
+        """返回累计跳过的上传次数与节省的字节数。"""
+        with self._connect() as connection:
+            row = connection.execute(
+                """
+                SELECT COALESCE(SUM(skipped_count), 0) AS skipped,
+                       COALESCE(SUM(saved_bytes), 0) AS saved
+                FROM dida_uploaded_attachments
+                """
+            ).fetchone()
+        return row["skipped"], row["saved"]
@@ -0,0 +1,213 @@
+import asyncio
+import atexit
+import threading
+
+from playwright.async_api import async_playwright
+
+
+BROWSER_POOL_MAX_PAGES = 2
+BROWSER_POOL_PAGE_MAX_USES = 50
+# 单次导航与回调的时限，从拿到页面后开始计算，排队等待空闲页面的时间不计入。
+BROWSER_POOL_TASK_TIMEOUT_SECONDS = 180
+# 调用方等待的总上限（含排队），只用于池线程异常退出等无法返回结果的情况。
+BROWSER_POOL_WAIT_TIMEOUT_SECONDS = 15 * 60
+BROWSER_POOL_SHUTDOWN_TIMEOUT_SECONDS = 30
+
+
+class BrowserPoolClosedError(RuntimeError):
+    pass
+
+
+class _PooledPage:
+    def __init__(self, page) -> None:
+        self.page = page
+        self.uses = 0
+        self.broken = False
+
+
+class BrowserPool:
+    """常驻的 Chromium 页面池。
+
+    Playwright 对象只能在创建它的线程中使用，因此池在独立线程里运行一个
+    asyncio 事件循环，所有页面操作都提交到该循环执行；调用方可以来自任意线程。
+    页面对象在多次调用之间复用，但每次调用都会重新导航，保证拿到最新渲染。
+    """
+
+    def __init__(
+        self,
+        max_pages=BROWSER_POOL_MAX_PAGES,
+        max_uses_per_page=BROWSER_POOL_PAGE_MAX_USES,
+        headless=True,
+    ) -> None:
+        self.max_pages = max_pages
+        self.max_uses_per_page = max_uses_per_page
+        self.headless = headless
+        self._thread_lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._closed = False
+        self._playwright = None
+        self._browser = None
+        self._browser_lock = None
+        self._page_available = None
+        self._idle_pages: list[_PooledPage] = []
+        self._page_count = 0
+
+    def run(self, url, handler, *, wait_until="load", timeout=120000):
+        """在池中页面打开 url，并执行异步回调 handler(page)，返回其结果。"""
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(
+            self._run(url, handler, wait_until, timeout),
+            loop,
+        )
+        try:
+            return future.result(BROWSER_POOL_WAIT_TIMEOUT_SECONDS)
+        except BaseException:
+            # 调用方放弃等待时取消池中的协程，页面随之作废并归还。
+            future.cancel()
+            raise
+
+    def close(self):
+        with self._thread_lock:
+            if self._closed:
+                return
+            self._closed = True
+            loop, thread = self._loop, self._thread
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(
+                BROWSER_POOL_SHUTDOWN_TIMEOUT_SECONDS
+            )
+        except Exception as error:
+            print(f"关闭浏览器池时出错：{type(error).__name__}: {error}", flush=True)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(BROWSER_POOL_SHUTDOWN_TIMEOUT_SECONDS)
+
+    def _ensure_started(self):
+        with self._thread_lock:
+            if self._closed:
+                raise BrowserPoolClosedError("浏览器池已经关闭")
+            if self._loop is None:
+                loop_ready = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._thread_main,
+                    args=(loop_ready,),
+                    name="browser-pool",
+                    daemon=True,
+                )
+                self._thread.start()
+                loop_ready.wait()
+            return self._loop
+
+    def _thread_main(self, loop_ready):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._browser_lock = asyncio.Lock()
+        self._page_available = asyncio.Condition()
+        self._loop = loop
+        loop_ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _run(self, url, handler, wait_until, timeout):
+        pooled = await self._acquire_page()
+        try:
+            return await asyncio.wait_for(
+                self._open_and_handle(pooled.page, url, handler, wait_until, timeout),
+                BROWSER_POOL_TASK_TIMEOUT_SECONDS,
+            )
+        except BaseException:
+            # 出错、超时或被取消的页面状态不可信，归还时直接丢弃，下次重新创建。
+            pooled.broken = True
+            raise
+        finally:
+            await self._release_page(pooled)
+
+    @staticmethod
+    async def _open_and_handle(page, url, handler, wait_until, timeout):
+        await page.goto(url, wait_until=wait_until, timeout=timeout)
+        return await handler(page)
+
+    async def _acquire_page(self):
+        async with self._page_available:
+            while True:
+                if self._idle_pages:
+                    return self._idle_pages.pop(0)
+                if self._page_count < self.max_pages:
+                    self._page_count += 1
+                    break
+                await self._page_available.wait()
+        try:
+            browser = await self._ensure_browser()
+            return _PooledPage(await browser.new_page())
+        except BaseException:
+            async with self._page_available:
+                self._page_count -= 1
+                self._page_available.notify()
+            raise
+
+    async def _release_page(self, pooled):
+        pooled.uses += 1
+        retire = pooled.broken or pooled.uses >= self.max_uses_per_page
+        if retire:
+            try:
+                await pooled.page.close()
+            except Exception:
+                pass
+        async with self._page_available:
+            if retire:
+                self._page_count -= 1
+            else:
+                self._idle_pages.append(pooled)
+            self._page_available.notify()
+
+    async def _ensure_browser(self):
+        async with self._browser_lock:
+            if self._browser is not None and not self._browser.is_connected():
+                self._browser = None
+            if self._browser is None:
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            return self._browser
+
+    async def _shutdown(self):
+        async with self._page_available:
+            idle_pages, self._idle_pages = self._idle_pages, []
+            self._page_count -= len(idle_pages)
+        for pooled in idle_pages:
+            try:
+                await pooled.page.close()
+            except Exception:
+                pass
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_browser_pool() -> BrowserPool:
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = BrowserPool()
+            atexit.register(_default_pool.close)
+        return _default_pool
+
+
+def close_default_browser_pool():
+    global _default_pool
+    with _default_pool_lock:
+        pool, _default_pool = _default_pool, None
+    if pool is not None:
+        pool.close()
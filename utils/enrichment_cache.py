@@ -0,0 +1,272 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from constants.db import ENRICHMENT_CACHE_DIR, RUNTIME_DB_FILE_PATH
+from utils.runtime_db import connect_runtime_db, prepare_runtime_db
+
+
+ENRICHMENT_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60
+ENRICHMENT_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+# 新写入的媒体文件在登记到 SQLite 之前不能被并发的清理误删。
+ORPHAN_BLOB_GRACE_SECONDS = 10 * 60
+MEDIA_COPY_CHUNK_BYTES = 256 * 1024
+
+SOURCE_DOUBAO_EXPLANATION = "doubao_explanation"
+SOURCE_ALL_PHONETIC = "all_phonetic"
+SOURCE_BAIDU_WORD_PAGE = "baidu_word_page"
+SOURCE_DICTVOICE = "dictvoice"
+SOURCE_EXPLANATION_VIDEO = "explanation_video"
+
+
+class EnrichmentCache:
+    """按（单词, 来源）缓存单词加工结果。
+
+    文本结果直接存入 SQLite；媒体文件按 SHA-256 内容寻址存放在磁盘目录中，
+    SQLite 只记录文件名与哈希。过期（TTL）或总大小超限（按最近访问时间 LRU）
+    的条目会在写入时清理，失去引用的媒体文件随之删除。
+    """
+
+    def __init__(
+        self,
+        db_path=RUNTIME_DB_FILE_PATH,
+        media_dir=ENRICHMENT_CACHE_DIR,
+        ttl_seconds=ENRICHMENT_CACHE_TTL_SECONDS,
+        max_bytes=ENRICHMENT_CACHE_MAX_BYTES,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.media_dir = Path(media_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.initialize()
+
+    def _connect(self):
+        return connect_runtime_db(self.db_path)
+
+    def initialize(self):
+        self.media_dir.mkdir(parents=True, exist_ok=True)
+        with prepare_runtime_db(self.db_path) as connection:
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS enrichment_cache_entries (
+                    word TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    text_value TEXT,
+                    media_json TEXT,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access_at REAL NOT NULL,
+                    PRIMARY KEY (word, source)
+                );
+
+                CREATE INDEX IF NOT EXISTS idx_enrichment_cache_entries_last_access
+                    ON enrichment_cache_entries(last_access_at);
+                """
+            )
+
+    def _blob_path(self, sha256):
+        return self.media_dir / sha256[:2] / sha256
+
+    def _get_row(self, word, source, max_age=None):
+        now = time.time()
+        max_age = self.ttl_seconds if max_age is None else min(max_age, self.ttl_seconds)
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT * FROM enrichment_cache_entries WHERE word = ? AND source = ?",
+                (word, source),
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row["created_at"] > max_age:
+                connection.execute(
+                    "DELETE FROM enrichment_cache_entries WHERE word = ? AND source = ?",
+                    (word, source),
+                )
+                return None
+            connection.execute(
+                """
+                UPDATE enrichment_cache_entries SET last_access_at = ?
+                WHERE word = ? AND source = ?
+                """,
+                (now, word, source),
+            )
+        return dict(row)
+
+    def _put_row(self, word, source, *, text_value=None, media=None, size_bytes=0):
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO enrichment_cache_entries (
+                    word, source, text_value, media_json,
+                    size_bytes, created_at, last_access_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    word,
+                    source,
+                    text_value,
+                    json.dumps(media) if media is not None else None,
+                    size_bytes,
+                    now,
+                    now,
+                ),
+            )
+        self.evict()
+
+    def get_text(self, word, source, max_age=None):
+        row = self._get_row(word, source, max_age=max_age)
+        return row["text_value"] if row is not None else None
+
+    def put_text(self, word, source, value):
+        self._put_row(word, source, text_value=value, size_bytes=len(value.encode("utf-8")))
+
+    def get_or_create_text(self, word, source, factory, cacheable=bool):
+        value = self.get_text(word, source)
+        if value is not None:
+            return value
+        value = factory()
+        if cacheable(value):
+            self.put_text(word, source, value)
+        return value
+
+    def get_media(self, word, source) -> list[tuple[str, io.BytesIO]] | None:
+        row = self._get_row(word, source)
+        if row is None or row["media_json"] is None:
+            return None
+        files = []
+        for file_name, sha256 in json.loads(row["media_json"]):
+            try:
+                files.append((file_name, io.BytesIO(self._blob_path(sha256).read_bytes())))
+            except FileNotFoundError:
+                # 媒体文件被外部删除时视为未命中，下次重新生成。
+                self.delete(word, source)
+                return None
+        return files
+
+    def get_media_paths(self, word, source) -> list[tuple[str, Path]] | None:
+        """返回缓存媒体在磁盘上的路径，供大文件直接按路径使用而不读入内存。"""
+        row = self._get_row(word, source)
+        if row is None or row["media_json"] is None:
+            return None
+        files = []
+        for file_name, sha256 in json.loads(row["media_json"]):
+            blob_path = self._blob_path(sha256)
+            if not blob_path.exists():
+                self.delete(word, source)
+                return None
+            files.append((file_name, blob_path))
+        return files
+
+    def _store_blob(self, source_file) -> tuple[str, int]:
+        """分块计算 SHA-256 并写入临时文件，内容已存在时直接丢弃临时文件。"""
+        self.media_dir.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.media_dir / f"{os.getpid()}.{threading.get_ident()}.tmp"
+        digest = hashlib.sha256()
+        size_bytes = 0
+        try:
+            with open(temporary_path, "wb") as temporary_file:
+                while chunk := source_file.read(MEDIA_COPY_CHUNK_BYTES):
+                    digest.update(chunk)
+                    temporary_file.write(chunk)
+                    size_bytes += len(chunk)
+            sha256 = digest.hexdigest()
+            blob_path = self._blob_path(sha256)
+            if blob_path.exists():
+                temporary_path.unlink()
+            else:
+                blob_path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(temporary_path, blob_path)
+        except BaseException:
+            temporary_path.unlink(missing_ok=True)
+            raise
+        return sha256, size_bytes
+
+    def put_media(self, word, source, files: list[tuple[str, io.BytesIO | Path]]):
+        """文件可以是文件对象（读取后恢复原位置）或磁盘路径。"""
+        media = []
+        size_bytes = 0
+        for file_name, file in files:
+            if isinstance(file, (str, Path)):
+                with open(file, "rb") as source_file:
+                    sha256, file_size = self._store_blob(source_file)
+            else:
+                original_position = file.tell()
+                file.seek(0)
+                try:
+                    sha256, file_size = self._store_blob(file)
+                finally:
+                    file.seek(original_position)
+            media.append([file_name, sha256])
+            size_bytes += file_size
+        self._put_row(word, source, media=media, size_bytes=size_bytes)
+
+    def get_or_create_media(self, word, source, factory):
+        files = self.get_media(word, source)
+        if files is not None:
+            return files
+        files = factory()
+        if files:
+            self.put_media(word, source, files)
+        return files
+
+    def delete(self, word, source):
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM enrichment_cache_entries WHERE word = ? AND source = ?",
+                (word, source),
+            )
+        self._delete_unreferenced_blobs()
+
+    def evict(self):
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            expired = connection.execute(
+                "DELETE FROM enrichment_cache_entries WHERE created_at < ?",
+                (now - self.ttl_seconds,),
+            ).rowcount
+            total_bytes = connection.execute(
+                "SELECT COALESCE(SUM(size_bytes), 0) FROM enrichment_cache_entries"
+            ).fetchone()[0]
+            evicted = 0
+            if total_bytes > self.max_bytes:
+                rows = connection.execute(
+                    """
+                    SELECT word, source, size_bytes FROM enrichment_cache_entries
+                    ORDER BY last_access_at
+                    """
+                ).fetchall()
+                for row in rows:
+                    if total_bytes <= self.max_bytes:
+                        break
+                    connection.execute(
+                        "DELETE FROM enrichment_cache_entries WHERE word = ? AND source = ?",
+                        (row["word"], row["source"]),
+                    )
+                    total_bytes -= row["size_bytes"]
+                    evicted += 1
+        if expired or evicted:
+            self._delete_unreferenced_blobs()
+
+    def _delete_unreferenced_blobs(self):
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT media_json FROM enrichment_cache_entries WHERE media_json IS NOT NULL"
+            ).fetchall()
+        referenced = {
+            sha256
+            for row in rows
+            for _, sha256 in json.loads(row["media_json"])
+        }
+        cutoff = time.time() - ORPHAN_BLOB_GRACE_SECONDS
+        for blob_path in self.media_dir.glob("*/*"):
+            try:
+                if blob_path.name not in referenced and blob_path.stat().st_mtime < cutoff:
+                    blob_path.unlink(missing_ok=True)
+            except FileNotFoundError:
+                continue
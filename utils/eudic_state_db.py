@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from constants.db import RUNTIME_DB_FILE_PATH
+from utils.runtime_db import connect_runtime_db, prepare_runtime_db, utc_now_text
+
+
+@dataclass(frozen=True)
+class EudicPageCursor:
+    book_id: str
+    last_page: int
+    page_size: int
+    newest_add_time: str
+
+
+class EudicStateStore:
+    """欧路生词本轮询的持久化状态，与每日造句状态共用运行数据库。"""
+
+    def __init__(self, db_path=RUNTIME_DB_FILE_PATH) -> None:
+        self.db_path = Path(db_path)
+        self.initialize()
+
+    def _connect(self):
+        return connect_runtime_db(self.db_path)
+
+    def initialize(self):
+        with prepare_runtime_db(self.db_path) as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS eudic_page_cursors (
+                    book_id TEXT PRIMARY KEY,
+                    last_page INTEGER NOT NULL,
+                    page_size INTEGER NOT NULL,
+                    newest_add_time TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS eudic_default_books (
+                    account TEXT NOT NULL,
+                    book_name TEXT NOT NULL,
+                    book_id TEXT NOT NULL,
+                    resolved_at TEXT NOT NULL,
+                    PRIMARY KEY (account, book_name)
+                )
+                """
+            )
+
+    def get_page_cursor(self, book_id: str) -> EudicPageCursor | None:
+        with self._connect() as connection:
+            row = connection.execute(
+                """
+                SELECT book_id, last_page, page_size, newest_add_time
+                FROM eudic_page_cursors WHERE book_id = ?
+                """,
+                (book_id,),
+            ).fetchone()
+        return EudicPageCursor(**dict(row)) if row is not None else None
+
+    def save_page_cursor(self, cursor: EudicPageCursor):
+        with self._connect() as connection:
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO eudic_page_cursors (
+                    book_id, last_page, page_size, newest_add_time, updated_at
+                ) VALUES (?, ?, ?, ?, ?)
+                """,
+                (
+                    cursor.book_id,
+                    cursor.last_page,
+                    cursor.page_size,
+                    cursor.newest_add_time,
+                    utc_now_text(),
+                ),
+            )
+
+    def delete_page_cursor(self, book_id: str):
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM eudic_page_cursors WHERE book_id = ?",
+                (book_id,),
+            )
+
+    def get_default_book_id(self, account: str, book_name: str, max_age_seconds: float) -> str | None:
+        with self._connect() as connection:
+            row = connection.execute(
+                """
+                SELECT book_id, resolved_at FROM eudic_default_books
+                WHERE account = ? AND book_name = ?
+                """,
+                (account, book_name),
+            ).fetchone()
+        if row is None:
+            return None
+        resolved_at = datetime.fromisoformat(row["resolved_at"])
+        if datetime.now(timezone.utc) - resolved_at > timedelta(seconds=max_age_seconds):
+            return None
+        return row["book_id"]
+
+    def save_default_book_id(self, account: str, book_name: str, book_id: str):
+        with self._connect() as connection:
+            connection.execute(
+                """
+                INSERT OR REPLACE INTO eudic_default_books (
+                    account, book_name, book_id, resolved_at
+                ) VALUES (?, ?, ?, ?)
+                """,
+                (account, book_name, book_id, utc_now_text()),
+            )
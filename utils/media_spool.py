@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+
+MEDIA_SPOOL_MAX_BYTES = 100 * 1024 * 1024
+
+
+class MediaTooLargeError(RuntimeError):
+    pass
+
+
+class MediaSpool:
+    """下载中的媒体文件暂存目录。
+
+    文件按附件名直接写在临时目录中，上传时交给 ``uploadAttachment(file_path=...)``
+    流式读取；离开 with 代码块后整个目录被删除。
+    """
+
+    def __init__(self, max_bytes=MEDIA_SPOOL_MAX_BYTES, prefix="dida-media-") -> None:
+        self.max_bytes = max_bytes
+        self._directory = tempfile.TemporaryDirectory(prefix=prefix)
+        self.path = Path(self._directory.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cleanup()
+
+    def cleanup(self):
+        self._directory.cleanup()
+
+    def _target_path(self, file_name: str) -> Path:
+        target_path = self.path / file_name
+        if target_path.parent != self.path:
+            raise ValueError(f"非法的媒体文件名：{file_name}")
+        return target_path
+
+    def write_chunks(self, file_name: str, chunks) -> Path:
+        """逐块写入文件，超过 max_bytes 时删除半成品并抛出 MediaTooLargeError。"""
+        target_path = self._target_path(file_name)
+        size = 0
+        try:
+            with open(target_path, "wb") as file:
+                for chunk in chunks:
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise MediaTooLargeError(
+                            f"媒体文件 [{file_name}] 超过 {self.max_bytes // 1024 // 1024} MB 限制"
+                        )
+                    file.write(chunk)
+        except BaseException:
+            target_path.unlink(missing_ok=True)
+            raise
+        return target_path
+
+    def add_file(self, file_name: str, source_path: Path) -> Path:
+        """把已有文件放入暂存目录；同一文件系统时使用硬链接，避免复制。"""
+        target_path = self._target_path(file_name)
+        target_path.unlink(missing_ok=True)
+        try:
+            os.link(source_path, target_path)
+        except OSError:
+            shutil.copyfile(source_path, target_path)
+        return target_path
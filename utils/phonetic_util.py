@@ -1,9 +1,14 @@
 import hashlib
 import re
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 
 import requests
-from playwright.sync_api import expect, sync_playwright
+from playwright.async_api import expect
+
+from utils.browser_pool import get_default_browser_pool
 
 """
 此脚本复制于anki-api的同名脚本
@@ -36,31 +41,77 @@ def get_phonetic_by_bing(word):
     return None
 
 
-def get_phonetic_by_baidu(word):
-    url = f"https://fanyi.baidu.com/mtpe-individual/transText?lang=en2zh&query={word}"
+BAIDU_TRANS_TEXT_URL = "https://fanyi.baidu.com/mtpe-individual/transText?lang=en2zh&query={word}"
+
+
+@dataclass(frozen=True)
+class BaiduWordPageResult:
+    phonetic: str | None = None
+    video_urls: tuple[str, ...] = ()
+
+
+class BaiduWordPage:
+    """一次导航同时提取百度翻译页面中的美式音标和讲解视频。"""
+
+    PHONETIC_VISIBLE_TIMEOUT_MS = 5000
+
+    def __init__(self, word: str, browser_pool=None) -> None:
+        self.word = word
+        self.url = BAIDU_TRANS_TEXT_URL.format(word=word)
+        self.browser_pool = browser_pool
+
+    def fetch(self) -> BaiduWordPageResult:
+        # 视频元素在网络空闲后才会出现，因此统一等待 networkidle。
+        return (self.browser_pool or get_default_browser_pool()).run(
+            self.url,
+            self._extract,
+            wait_until="networkidle",
+        )
+
+    async def _extract(self, page) -> BaiduWordPageResult:
+        return BaiduWordPageResult(
+            phonetic=await self._extract_phonetic(page),
+            video_urls=await self._extract_video_urls(page),
+        )
+
+    async def _extract_phonetic(self, page) -> str | None:
+        phonetic_locator = page.get_by_text("美/")
+        try:
+            await expect(phonetic_locator).to_be_visible(timeout=self.PHONETIC_VISIBLE_TIMEOUT_MS)
+        except AssertionError:
+            return None
+        phonetic_content = await phonetic_locator.text_content()
+        if phonetic_content is None:
+            return None
+        phonetic_match = re.findall(r"美/(.*?)/", phonetic_content)
+        return phonetic_match[0] if phonetic_match else None
+
+    @staticmethod
+    async def _extract_video_urls(page) -> tuple[str, ...]:
+        video_urls = []
+        for video_element in await page.query_selector_all("video"):
+            src = await video_element.get_attribute("src")
+            if src:
+                video_urls.append(src)
+            else:
+                for source in await video_element.query_selector_all("source"):
+                    src = await source.get_attribute("src")
+                    if src:
+                        video_urls.append(src)
+        return tuple(dict.fromkeys(video_urls))
+
+
+def fetch_baidu_word_page(word: str) -> BaiduWordPageResult | None:
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            try:
-                page = browser.new_page()
-                page.goto(url, wait_until="load", timeout=120000)
-                phonetic_locator = page.get_by_text("美/")
-                expect(phonetic_locator).to_be_visible(timeout=5000)
-                phonetic_content = phonetic_locator.text_content()
-                if phonetic_content is None:
-                    return None
-                else:
-                    phonetic_match = re.findall(r"美/(.*?)/", phonetic_content)
-                    if phonetic_match:
-                        phonetic = phonetic_match[0]
-                    else:
-                        phonetic = None
-            finally:
-                browser.close()
+        return BaiduWordPage(word).fetch()
     except Exception as e:
-        print(f"使用playwright进行百度音标获取失败:\n {e}")
+        print(f"使用playwright读取百度翻译页面失败:\n {e}")
         return None
-    return phonetic
+
+
+def get_phonetic_by_baidu(word):
+    baidu_page = fetch_baidu_word_page(word)
+    return baidu_page.phonetic if baidu_page is not None else None
 
 
 def get_phonetic_by_ciba(word):
@@ -116,66 +167,186 @@ def get_phonetic_by_ciba(word):
     return None
 
 
+PHONETIC_FETCH_MAX_WORKERS = 8
+ALL_PHONETIC_DEADLINE_SECONDS = 20
+# 不推荐使用词霸，因为美式发音使用KK音标；只有其他来源都失败时才采用。
+PHONETIC_FALLBACK_SOURCES = ("金山词霸",)
+ALL_PHONETIC_EMPTY_RESULT = "通过Api获取音标皆返回为None..."
+
+_phonetic_executor = None
+_phonetic_executor_lock = threading.Lock()
+
+
+def get_phonetic_executor() -> ThreadPoolExecutor:
+    """音标查询共用的线程池，首次查询时才创建。"""
+    global _phonetic_executor
+    with _phonetic_executor_lock:
+        if _phonetic_executor is None:
+            _phonetic_executor = ThreadPoolExecutor(
+                max_workers=PHONETIC_FETCH_MAX_WORKERS,
+                thread_name_prefix="phonetic",
+            )
+        return _phonetic_executor
+
+
+def close_phonetic_executor():
+    global _phonetic_executor
+    with _phonetic_executor_lock:
+        executor, _phonetic_executor = _phonetic_executor, None
+    if executor is not None:
+        # 超时后仍在后台执行的来源不再等待，排队中的直接取消。
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _phonetic_sources():
+    # 每次调用时再取函数，测试替换单个来源时才能生效。
+    return {
+        "百度词典": get_phonetic_by_baidu,
+        "必应词典": get_phonetic_by_bing,
+        "有道词典": get_phonetic_by_youdao,
+        "金山词霸": get_phonetic_by_ciba,
+    }
+
+
+@dataclass
+class PhoneticFetchResult:
+    phonetics: dict[str, str | None] = field(default_factory=dict)
+    latencies: dict[str, float] = field(default_factory=dict)
+
+    def is_complete(self, source_names) -> bool:
+        """所有来源都在截止时间内返回时才算完整。"""
+        return all(name in self.latencies for name in source_names)
+
+    def describe_latencies(self, source_names) -> str:
+        return "，".join(
+            f"{name} {self.latencies[name]:.1f}s" if name in self.latencies else f"{name} 超时"
+            for name in source_names
+        )
+
+
+class ConcurrentPhoneticFetcher:
+    """并行查询各音标来源，总耗时取决于最慢（或最快成功）的来源而不是总和。"""
+
+    def __init__(self, sources: dict | None = None, executor: ThreadPoolExecutor | None = None) -> None:
+        self.sources = sources if sources is not None else _phonetic_sources()
+        self.executor = executor
+
+    @staticmethod
+    def _timed_call(source, word):
+        started_at = time.monotonic()
+        try:
+            phonetic = source(word)
+        except Exception as e:
+            print(f"音标来源查询异常: {type(e).__name__}: {e}")
+            phonetic = None
+        return phonetic, time.monotonic() - started_at
+
+    def _submit(self, word, executor):
+        return {
+            executor.submit(self._timed_call, source, word): name
+            for name, source in self.sources.items()
+        }
+
+    def first_success(self, word: str) -> tuple[str, str] | None:
+        """返回最先成功的 (来源, 音标)；备用来源只在其余来源全部失败后才采用。"""
+        pending = self._submit(word, self.executor or get_phonetic_executor())
+        fallback_results = {}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                phonetic, _ = future.result()
+                if not phonetic:
+                    continue
+                if name in PHONETIC_FALLBACK_SOURCES:
+                    fallback_results[name] = phonetic
+                else:
+                    return name, phonetic
+        for name in PHONETIC_FALLBACK_SOURCES:
+            if name in fallback_results:
+                return name, fallback_results[name]
+        return None
+
+    def _started_call(self, started_at, name, source, word):
+        started_at[name] = time.monotonic()
+        return self._timed_call(source, word)
+
+    def all_within(self, word: str, deadline: float = ALL_PHONETIC_DEADLINE_SECONDS) -> PhoneticFetchResult:
+        """收集各来源的结果；某来源开始执行后 deadline 秒仍未返回则记为缺失。
+
+        截止时间从来源真正开始执行时计算，在共享线程池中排在其他单词之后的时间不计入；
+        排队 deadline 秒仍未开始的来源直接取消。
+        """
+        executor = self.executor or get_phonetic_executor()
+        submitted_at = time.monotonic()
+        started_at = {}
+        pending = {
+            executor.submit(self._started_call, started_at, name, source, word): name
+            for name, source in self.sources.items()
+        }
+        result = PhoneticFetchResult()
+        while pending:
+            now = time.monotonic()
+            expires_at = {
+                future: started_at.get(name, submitted_at) + deadline
+                for future, name in pending.items()
+            }
+            for future, expiry in expires_at.items():
+                if expiry <= now:
+                    # 已在执行的来源留在后台自行结束，不阻塞本次返回。
+                    future.cancel()
+                    del pending[future]
+            if not pending:
+                break
+            done, _ = wait(
+                pending,
+                timeout=min(expires_at[future] for future in pending) - now,
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                name = pending.pop(future)
+                result.phonetics[name], result.latencies[name] = future.result()
+        print(f"[音标] {word} 各来源耗时：{result.describe_latencies(self.sources)}")
+        return result
+
+
 def get_phonetic(word):
     def _format(result):
         return f"美[{result}]"
 
-    if result := get_phonetic_by_bing(word):
-        print("通过必应词典获取音标成功...")
-        return _format(result)
-    if result := get_phonetic_by_youdao(word):
-        print("通过有道词典获取音标成功...")
-        return _format(result)
-    if result := get_phonetic_by_baidu(word):
-        print("通过百度翻译获取音标成功...")
-        return _format(result)
-    # 不推荐使用词霸，因为美式发音使用KK音标
-    if result := get_phonetic_by_ciba(word):
-        print("通过金山词霸获取音标成功...")
+    if success := ConcurrentPhoneticFetcher().first_success(word):
+        name, result = success
+        print(f"通过{name}获取音标成功...")
         return _format(result)
 
     return "空"
 
 
-def get_all_phonetic(word: str) -> str:
-    data = {
-        "百度词典": get_phonetic_by_baidu(word),
-        "必应词典": get_phonetic_by_bing(word),
-        "有道词典": get_phonetic_by_youdao(word),
-        "金山词霸": get_phonetic_by_ciba(word),
-    }
-    filtered_data = {k: v for k, v in data.items() if v is not None}
+def fetch_all_phonetic(word: str, baidu_page: BaiduWordPageResult | None = None) -> tuple[str, bool]:
+    """返回 (各来源音标文本, 是否所有来源都在截止时间内完成)。"""
+    sources = _phonetic_sources()
+    if baidu_page is not None:
+        # 调用方已经读过百度页面，直接使用其结果，不再重复导航。
+        sources["百度词典"] = lambda _: baidu_page.phonetic
+    fetch_result = ConcurrentPhoneticFetcher(sources).all_within(word)
+    data = fetch_result.phonetics
+    filtered_data = {k: data[k] for k in sources if data.get(k) is not None}
     result = "\n".join([f"{k}: /{v}/" for k, v in filtered_data.items()])
     if result == "":
-        return "通过Api获取音标皆返回为None..."
-    else:
-        return result
+        result = ALL_PHONETIC_EMPTY_RESULT
+    return result, fetch_result.is_complete(sources)
+
+
+def get_all_phonetic(word: str, baidu_page: BaiduWordPageResult | None = None) -> str:
+    return fetch_all_phonetic(word, baidu_page=baidu_page)[0]
 
 
 def query_word_explanation_video(word: str) -> list[str] | None:
-    url = f"https://fanyi.baidu.com/mtpe-individual/transText?query={word}&lang=en2zh"
-    video_urls = set()
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto(url, wait_until="networkidle", timeout=120000)
-
-        video_elements = page.query_selector_all("video")
-        for video_element in video_elements:
-            src = video_element.get_attribute("src")
-            if src:
-                video_urls.add(src)
-            else:
-                sources = video_element.query_selector_all("source")
-                for source in sources:
-                    src = source.get_attribute("src")
-                    if src:
-                        video_urls.add(src)
-        browser.close()
-    return list(video_urls)
+    page = fetch_baidu_word_page(word)
+    return list(page.video_urls) if page is not None else []
 
 
 if __name__ == "__main__":
     word = "all"
+    print(BaiduWordPage(word).fetch())
     print(get_all_phonetic(word))
-    print(query_word_explanation_video(word))
@@ -0,0 +1,39 @@
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+class _AutoClosingConnection(sqlite3.Connection):
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            return super().__exit__(exc_type, exc_value, traceback)
+        finally:
+            self.close()
+
+
+def utc_now_text() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def connect_runtime_db(db_path) -> sqlite3.Connection:
+    """打开运行数据库连接；作为 with 代码块使用时，退出即提交（或回滚）并关闭。"""
+    connection = sqlite3.connect(
+        db_path,
+        timeout=30,
+        factory=_AutoClosingConnection,
+    )
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA busy_timeout = 5000")
+    return connection
+
+
+def prepare_runtime_db(db_path) -> sqlite3.Connection:
+    """创建数据库目录并开启 WAL，返回用于建表的连接。
+
+    运行数据库由多个状态表共用，版本号（user_version）只由
+    SentencePracticeStateStore 管理；其他状态表只按需建表，不修改版本号。
+    """
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    connection = connect_runtime_db(db_path)
+    connection.execute("PRAGMA journal_mode = WAL")
+    return connection
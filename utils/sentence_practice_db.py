@@ -1,9 +1,9 @@
 import json
-import sqlite3
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 from constants.db import RUNTIME_DB_FILE_PATH
+from utils.runtime_db import connect_runtime_db, utc_now_text
 
 
 TASK_STATUS_CREATING = "creating"
@@ -30,18 +30,6 @@ SYSTEM_COMMENT_MARKER_PREFIX = "[[sentence-practice:clarification:"
 SCHEMA_VERSION = 2
 
 
-class _AutoClosingConnection(sqlite3.Connection):
-    def __exit__(self, exc_type, exc_value, traceback):
-        try:
-            return super().__exit__(exc_type, exc_value, traceback)
-        finally:
-            self.close()
-
-
-def utc_now_text() -> str:
-    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
-
-
 def _json_dump(value) -> str:
     return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
 
@@ -52,14 +40,8 @@ class SentencePracticeStateStore:
         self.initialize()
 
     def _connect(self):
-        connection = sqlite3.connect(
-            self.db_path,
-            timeout=30,
-            factory=_AutoClosingConnection,
-        )
-        connection.row_factory = sqlite3.Row
+        connection = connect_runtime_db(self.db_path)
         connection.execute("PRAGMA foreign_keys = ON")
-        connection.execute("PRAGMA busy_timeout = 5000")
         return connection
 
     def initialize(self):
@@ -560,3 +542,18 @@ class SentencePracticeStateStore:
                     interaction_id,
                 ),
             )
+
+    def count_open_interactions(self, updated_within_seconds):
+        """统计最近更新过、尚未完成的交互数量；长期无人回复的追问不计入。"""
+        updated_since = (
+            datetime.now(timezone.utc) - timedelta(seconds=updated_within_seconds)
+        ).isoformat(timespec="milliseconds")
+        with self._connect() as connection:
+            row = connection.execute(
+                """
+                SELECT COUNT(*) AS count FROM sentence_practice_interactions
+                WHERE status != ? AND updated_at >= ?
+                """,
+                (INTERACTION_STATUS_DONE, updated_since),
+            ).fetchone()
+        return row["count"]
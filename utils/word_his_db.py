@@ -1,26 +1,102 @@
+import os
 import pickle
+from pathlib import Path
 
-from constants.db import DB_FILE_PATH
+from constants.db import DB_FILE_PATH, RUNTIME_DB_FILE_PATH
+from utils.runtime_db import connect_runtime_db, prepare_runtime_db, utc_now_text
 
 
-def get_or_create_his_set():
-    try:
-        with open(DB_FILE_PATH, "rb") as f:
-            return pickle.load(f)
-    except FileNotFoundError:
-        data = set()
-        with open(DB_FILE_PATH, "wb") as f:
-            pickle.dump(data, f)
-        return data
+# SQLite 单条语句的参数个数上限在旧版本中是 999，批量查询时分块提交。
+FILTER_UNSEEN_CHUNK_SIZE = 500
+
+
+class WordHistoryStore:
+    def __init__(self, db_path=RUNTIME_DB_FILE_PATH, legacy_pickle_path=DB_FILE_PATH) -> None:
+        self.db_path = Path(db_path)
+        self.legacy_pickle_path = Path(legacy_pickle_path) if legacy_pickle_path else None
+        self.initialize()
+
+    def _connect(self):
+        return connect_runtime_db(self.db_path)
+
+    def initialize(self):
+        with prepare_runtime_db(self.db_path) as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS word_history (
+                    word TEXT PRIMARY KEY,
+                    created_at TEXT NOT NULL
+                )
+                """
+            )
+        self._migrate_legacy_pickle()
+
+    def _migrate_legacy_pickle(self):
+        """一次性导入旧版 word_his.db；成功后改名保留，避免再次导入。"""
+        if self.legacy_pickle_path is None or not self.legacy_pickle_path.exists():
+            return
+        with open(self.legacy_pickle_path, "rb") as f:
+            legacy_words = pickle.load(f)
+        self.add_words(legacy_words)
+        migrated_path = self.legacy_pickle_path.with_name(
+            f"{self.legacy_pickle_path.name}.migrated"
+        )
+        os.replace(self.legacy_pickle_path, migrated_path)
+        print(
+            f"历史单词库已迁移到 SQLite：{len(legacy_words)} 个单词，"
+            f"原文件保留为 {migrated_path.name}。",
+            flush=True,
+        )
+
+    def add_words(self, words):
+        now = utc_now_text()
+        with self._connect() as connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO word_history (word, created_at) VALUES (?, ?)",
+                [(word, now) for word in words],
+            )
+
+    def contains(self, word):
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT 1 FROM word_history WHERE word = ?",
+                (word,),
+            ).fetchone()
+        return row is not None
+
+    def filter_unseen(self, words):
+        """按原顺序返回尚未进入历史的单词，整批只打开一次连接。"""
+        words = list(words)
+        seen = set()
+        with self._connect() as connection:
+            for start in range(0, len(words), FILTER_UNSEEN_CHUNK_SIZE):
+                chunk = words[start : start + FILTER_UNSEEN_CHUNK_SIZE]
+                placeholders = ", ".join("?" for _ in chunk)
+                rows = connection.execute(
+                    f"SELECT word FROM word_history WHERE word IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                seen.update(row[0] for row in rows)
+        return [word for word in words if word not in seen]
+
+
+_default_store = None
+
+
+def get_word_history_store():
+    global _default_store
+    if _default_store is None:
+        _default_store = WordHistoryStore()
+    return _default_store
 
 
 def add_word_to_his_set(word):
-    his_set = get_or_create_his_set()
-    his_set.add(word)
-    with open(DB_FILE_PATH, "wb") as f:
-        pickle.dump(his_set, f)
+    get_word_history_store().add_words([word])
 
 
 def if_exists_in_his_set(word):
-    his_set = get_or_create_his_set()
-    return word in his_set
+    return get_word_history_store().contains(word)
+
+
+def filter_unseen(words):
+    return get_word_history_store().filter_unseen(words)